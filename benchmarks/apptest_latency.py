@@ -0,0 +1,208 @@
+"""End-to-end rerun latency of main_app.py driven headlessly through AppTest.
+
+Logs in through simple_login, replays a scripted sequence of sidebar filter
+changes, each submitted through the sidebar's "Apply filters" form the way
+a user applies it, and records the full script-run latency of every interaction plus
+the time spent in each show_*_tab function. Every measurement is appended
+as one JSON line to --output, so p50/p95 can be tracked across versions,
+engines and data sizes; a p50/p95 summary is printed at the end.
+
+    python -m benchmarks.apptest_latency --rows 1000000 --repeat 5 --output apptest_latency.jsonl
+
+A scenario file is JSON: {"name": ..., "steps": [step, ...]} where a step is
+{"name": ..., "widget": <sidebar label>} plus one of "value" (explicit
+selection or [start, end] dates), "keep" (first N current options),
+"all": true (every option) or "last_weeks" (range ending at the selected end date).
+"""
+import argparse
+import functools
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from benchmarks.utils import git_revision, latency_summary
+
+APP_PATH = "main_app.py"
+USERNAME = "admin"
+PASSWORD = "aliceadmin123"
+TAB_FUNCTIONS = {
+    "revenue": ("tabs.revenue_tab", "show_revenue_tab"),
+    "campaign": ("tabs.campaign_tab", "show_campaign_tab"),
+    "delivery": ("tabs.delivery_tab", "show_delivery_tab"),
+    "brand": ("tabs.brand_tab", "show_brand_tab"),
+    "explorer": ("tabs.explorer_tab", "show_explorer_tab"),
+    "media_mix": ("tabs.media_mix_tab", "show_media_mix_tab"),
+    "media_contribution": ("tabs.media_mix_tab", "show_contribution_tab"),
+    "download": ("tabs.download_tab", "show_download_tab"),
+}
+APPLY_LABEL = "Apply filters"
+
+DEFAULT_SCENARIO = {
+    "name": "analyst_drilldown",
+    "steps": [
+        {"name": "narrow_region", "widget": "Select Region", "keep": 2},
+        {"name": "narrow_tier", "widget": "Select Customer Tier", "keep": 1},
+        {"name": "last_year", "widget": "Select Date Range", "last_weeks": 52},
+        {"name": "narrow_delivery_mode", "widget": "Select Delivery Mode", "keep": 2},
+        {"name": "clear_region", "widget": "Select Region", "value": []},
+        {"name": "reset_region", "widget": "Select Region", "all": True},
+        {"name": "reset_tier", "widget": "Select Customer Tier", "all": True},
+        {"name": "reset_delivery_mode", "widget": "Select Delivery Mode", "all": True},
+    ],
+}
+
+
+# --- Per-tab timing ---
+# main_app.py imports the show_*_tab functions on every run, so wrapping the
+# module attributes is enough to time each tab without touching the app.
+TAB_TIMINGS = defaultdict(float)
+
+
+def _timed(tab, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            TAB_TIMINGS[tab] += time.perf_counter() - start
+    wrapper.timed_tab = tab
+    return wrapper
+
+
+def instrument_tabs():
+    import importlib
+
+    for tab, (module_name, func_name) in TAB_FUNCTIONS.items():
+        module = importlib.import_module(module_name)
+        func = getattr(module, func_name)
+        # Fragment tabs already carry __wrapped__, so the timing wrapper marks itself
+        if not hasattr(func, "timed_tab"):
+            setattr(module, func_name, _timed(tab, func))
+
+
+# --- Driving the app ---
+def _widget(at, label):
+    for widget in list(at.multiselect) + list(at.date_input):
+        if widget.label == label:
+            return widget
+    raise KeyError(f"No sidebar widget labelled '{label}'")
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else datetime.fromisoformat(value).date()
+
+
+def apply_step(at, step):
+    widget = _widget(at, step["widget"])
+    if widget in list(at.date_input):
+        if "last_weeks" in step:
+            end = _as_date(widget.value[1])
+            value = (end - timedelta(weeks=step["last_weeks"]), end)
+        else:
+            value = tuple(_as_date(v) for v in step["value"])
+        widget.set_value(value)
+    elif step.get("all"):
+        widget.set_value(list(widget.options))
+    elif "keep" in step:
+        widget.set_value(list(widget.options)[:step["keep"]])
+    else:
+        widget.set_value(list(step["value"]))
+    # With batched filters on (the default) the change only applies on submit
+    for button in at.button:
+        if button.label == APPLY_LABEL:
+            button.click()
+            break
+
+
+def timed_run(at, timeout):
+    TAB_TIMINGS.clear()
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"main_app.py raised: {at.exception[0].message}")
+    return elapsed, {tab: round(seconds, 6) for tab, seconds in TAB_TIMINGS.items()}
+
+
+def run_scenario(scenario, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run(timeout=timeout)
+    username, password = at.text_input[0], at.text_input[1]
+    username.input(USERNAME)
+    password.input(PASSWORD)
+    at.button[0].click()
+    elapsed, tabs = timed_run(at, timeout)
+    yield "login", elapsed, tabs
+    for step in scenario["steps"]:
+        apply_step(at, step)
+        elapsed, tabs = timed_run(at, timeout)
+        yield step["name"], elapsed, tabs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure main_app.py rerun latency with Streamlit AppTest.")
+    parser.add_argument("--scenario", help="JSON scenario file (default: built-in analyst drill-down)")
+    parser.add_argument("--engine", default=os.environ.get("DASHBOARD_ENGINE", "pandas"))
+    parser.add_argument("--data", help="CSV/Parquet file to serve (default: the bundled CSV)")
+    parser.add_argument("--rows", type=int, help="generate a synthetic dataset with this many rows instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", default="apptest_latency.jsonl", help="JSONL time series to append to")
+    args = parser.parse_args(argv)
+
+    scenario = DEFAULT_SCENARIO
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = args.data
+        if args.rows:
+            from shared.synthetic_data import write_dataset
+
+            data_path = write_dataset(os.path.join(directory, "apptest.parquet"), args.rows,
+                                      workers=os.cpu_count() or 1)
+        # Must be set before the app (and shared.data) is first imported
+        if data_path:
+            os.environ["DASHBOARD_DATA"] = data_path
+        os.environ["DASHBOARD_ENGINE"] = args.engine
+        instrument_tabs()
+
+        base = {
+            "run_id": uuid.uuid4().hex[:12],
+            "git_revision": git_revision(),
+            "engine": args.engine,
+            "data": data_path or "logistics_mmm_extended_data.csv",
+            "rows": args.rows,
+            "scenario": scenario["name"],
+        }
+        latencies = defaultdict(list)
+        with open(args.output, "a") as out:
+            for repeat in range(args.repeat):
+                for step_index, (step, elapsed, tabs) in enumerate(run_scenario(scenario, args.timeout)):
+                    record = dict(
+                        base,
+                        timestamp=datetime.now().isoformat(timespec="milliseconds"),
+                        repeat=repeat,
+                        step_index=step_index,
+                        step=step,
+                        rerun_s=round(elapsed, 6),
+                        tabs_s=tabs,
+                    )
+                    out.write(json.dumps(record) + "\n")
+                    latencies[step].append(elapsed)
+                    latencies["__all__"].append(elapsed)
+
+    summary = {step: latency_summary(values) for step, values in latencies.items()}
+    print(json.dumps({"run": base, "summary": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Headless benchmark of the dashboard data pipeline at scale.
+
+Generates synthetic data with shared.synthetic_data, then times every stage
+main_app.py and the tabs run on a rerun (load, derived metrics, filter, KPI,
+each chart aggregation, insights, correlation, CSV/PPT export) and writes
+wall time, peak RSS and Python/NumPy allocations per stage as JSON.
+
+    python -m benchmarks.pipeline_bench --rows 10000 1000000 10000000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import psutil
+
+from benchmarks.utils import git_revision
+from shared.data import SEGMENT_COLUMNS, add_derived_metrics
+from shared.default_view import default_filters
+from shared.filters import apply_filters, build_filters
+from shared.query_engine import ENGINES, as_selection, create_engine
+from shared.synthetic_data import write_dataset as write_synthetic_dataset
+from tabs.brand_tab import BRAND_AGGREGATES
+from tabs.campaign_tab import CAMPAIGN_AGGREGATES
+from tabs.delivery_tab import DELIVERY_AGGREGATES
+from tabs.download_tab import PPT_PREVIEW_ROWS, export_kpis, generate_ppt
+from tabs.revenue_tab import (
+    REVENUE_AGGREGATES, compute_correlation_matrix, compute_kpis_yoy, generate_auto_insights
+)
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+WEEKS = 156
+MB = 1024 * 1024
+
+TAB_AGGREGATES = {
+    "revenue": REVENUE_AGGREGATES,
+    "campaign": CAMPAIGN_AGGREGATES,
+    "delivery": DELIVERY_AGGREGATES,
+    "brand": BRAND_AGGREGATES,
+}
+
+
+# --- Peak RSS sampling ---
+class RSSSampler:
+    def __init__(self, interval=0.005):
+        self.process = psutil.Process()
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+class StageRecorder:
+    def __init__(self, track_allocations=True):
+        self.track_allocations = track_allocations
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, **extra):
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            alloc_before = tracemalloc.get_traced_memory()[0]
+        rss_before = psutil.Process().memory_info().rss
+        with RSSSampler() as sampler:
+            start = time.perf_counter()
+            yield
+            wall = time.perf_counter() - start
+        record = {
+            "stage": name,
+            "wall_s": round(wall, 6),
+            "rss_before_mb": round(rss_before / MB, 2),
+            "peak_rss_mb": round(sampler.peak / MB, 2),
+        }
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            record["alloc_peak_mb"] = round((peak - alloc_before) / MB, 2)
+            record["alloc_net_mb"] = round((current - alloc_before) / MB, 2)
+        record.update(extra)
+        self.stages.append(record)
+
+
+def write_dataset(rows, directory, fmt, seed):
+    path = os.path.join(directory, f"bench_{rows}.{fmt}")
+    write_synthetic_dataset(path, rows, weeks=WEEKS, seed=seed, workers=os.cpu_count() or 1)
+    return path, rows
+
+
+def run_pipeline(path, engine_name, recorder):
+    stage = recorder.stage
+    if engine_name == "pandas":
+        with stage("load"):
+            if path.endswith(".parquet"):
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_csv(path)
+            df['week'] = pd.to_datetime(df['week'])
+        with stage("derived_metrics"):
+            df = add_derived_metrics(df)
+        segments = {col: list(df[col].unique()) for col in SEGMENT_COLUMNS}
+        filters = build_filters([df['week'].min(), df['week'].max()], **segments)
+        with stage("filter"):
+            filtered_df = apply_filters(df, filters)
+        selection = as_selection(filtered_df)
+    else:
+        with stage("load"):
+            engine = create_engine(engine_name, path)
+        filters = default_filters(engine)
+        with stage("filter"):
+            selection = engine.select(filters)
+            selection.row_count
+    recorder.stages[-1]["rows_out"] = selection.row_count
+
+    with stage("kpi"):
+        compute_kpis_yoy(selection)
+    aggregates = {}
+    for tab, specs in TAB_AGGREGATES.items():
+        for name, spec in specs.items():
+            with stage(f"aggregate:{tab}.{name}"):
+                selection.aggregate(spec)
+        with stage(f"aggregate_many:{tab}"):
+            aggregates.update(selection.aggregate_many(specs))
+    with stage("insights"):
+        generate_auto_insights(aggregates)
+    with stage("correlation"):
+        compute_correlation_matrix(aggregates["segment_combos"])
+    # Exports only run on a download click; the CSV is the one stage that reads every row
+    with stage("export_csv"):
+        selection.to_pandas().to_csv(index=False).encode('utf-8')
+    with stage("export_ppt"):
+        generate_ppt(export_kpis(selection), selection.head(PPT_PREVIEW_ROWS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--engine", choices=ENGINES, default="pandas")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-allocations", action="store_true",
+                        help="skip tracemalloc, which slows every stage down")
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "engine": args.engine,
+            "format": args.format,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "cpu_count": os.cpu_count(),
+            "allocations_tracked": not args.no_allocations,
+        },
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            path, actual_rows = write_dataset(rows, directory, args.format, args.seed)
+            recorder = StageRecorder(track_allocations=not args.no_allocations)
+            if recorder.track_allocations:
+                tracemalloc.start()
+            try:
+                run_pipeline(path, args.engine, recorder)
+            finally:
+                if recorder.track_allocations:
+                    tracemalloc.stop()
+            report["runs"].append({
+                "rows": actual_rows,
+                "file_mb": round(os.path.getsize(path) / MB, 2),
+                "total_wall_s": round(sum(s["wall_s"] for s in recorder.stages), 6),
+                "stages": recorder.stages,
+            })
+            os.remove(path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark of the batched media transforms against naive per-week loops.
+
+Times shared.transforms (geometric and Weibull adstock, Hill and logistic
+saturation) on a (params x weeks x channels) grid and the same transforms
+written as Python loops over parameters, channels and weeks, checks that
+both agree, and writes the timings and speedups as JSON.
+
+    python -m benchmarks.transforms_bench --weeks 156 520 --params 40 200 --output transforms.json
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.utils import git_revision
+from shared.transforms import geometric_adstock, hill, logistic, weibull_adstock
+
+DEFAULT_WEEKS = [156, 520]
+DEFAULT_PARAMS = [40, 200]
+CHANNELS = 7
+WEIBULL_MAX_LAG = 12
+
+
+# --- Naive references ---
+def naive_geometric(spend, decays):
+    weeks, channels = spend.shape
+    out = np.zeros((len(decays), weeks, channels))
+    for p, decay in enumerate(decays):
+        for c in range(channels):
+            carry = 0.0
+            for t in range(weeks):
+                carry = spend[t, c] + decay * carry
+                out[p, t, c] = carry
+    return out
+
+
+def naive_weibull(spend, shapes, scales, max_lag):
+    weeks, channels = spend.shape
+    out = np.zeros((len(shapes), weeks, channels))
+    for p, (shape, scale) in enumerate(zip(shapes, scales)):
+        weights = [np.exp(-(lag / scale) ** shape) for lag in range(max_lag + 1)]
+        for c in range(channels):
+            for t in range(weeks):
+                out[p, t, c] = sum(weights[lag] * spend[t - lag, c] for lag in range(min(t, max_lag) + 1))
+    return out
+
+
+def naive_hill(x, halves, shapes):
+    out = np.zeros_like(x)
+    for p in range(x.shape[0]):
+        for t in range(x.shape[1]):
+            for c in range(x.shape[2]):
+                value = x[p, t, c] ** shapes[p]
+                out[p, t, c] = value / (value + halves[p] ** shapes[p])
+    return out
+
+
+def naive_logistic(x, lams):
+    out = np.zeros_like(x)
+    for p in range(x.shape[0]):
+        for t in range(x.shape[1]):
+            for c in range(x.shape[2]):
+                decay = np.exp(-lams[p] * x[p, t, c])
+                out[p, t, c] = (1 - decay) / (1 + decay)
+    return out
+
+
+# --- Timing ---
+REPEAT = 3
+
+
+def timed(func, *args):
+    # Best of REPEAT runs, so one-off warm-up (e.g. FFT planning) does not count
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def compare(name, vectorized, naive):
+    (fast, fast_s), (slow, slow_s) = vectorized, naive
+    return {
+        "transform": name,
+        "vectorized_s": round(fast_s, 6),
+        "naive_s": round(slow_s, 6),
+        "speedup": round(slow_s / fast_s, 1) if fast_s else None,
+        "max_abs_error": float(np.abs(fast - slow).max()),
+    }
+
+
+def run(weeks, params, seed):
+    rng = np.random.default_rng(seed)
+    spend = rng.uniform(0, 20, size=(weeks, CHANNELS))
+    decays = rng.uniform(0, 0.9, size=params)
+    shapes, scales = rng.uniform(0.5, 3, size=params), rng.uniform(1, 6, size=params)
+    x = rng.uniform(0, 50, size=(params, weeks, CHANNELS))
+    halves, hill_shapes, lams = rng.uniform(5, 40, size=params), rng.uniform(0.5, 3, size=params), rng.uniform(0.01, 0.2, size=params)
+    return [
+        compare("geometric_adstock", timed(geometric_adstock, spend, decays), timed(naive_geometric, spend, decays)),
+        compare(
+            "weibull_adstock",
+            timed(weibull_adstock, spend, shapes, scales, WEIBULL_MAX_LAG),
+            timed(naive_weibull, spend, shapes, scales, WEIBULL_MAX_LAG),
+        ),
+        compare(
+            "hill",
+            timed(hill, x, halves[:, None, None], hill_shapes[:, None, None]),
+            timed(naive_hill, x, halves, hill_shapes),
+        ),
+        compare("logistic", timed(logistic, x, lams[:, None, None]), timed(naive_logistic, x, lams)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=DEFAULT_WEEKS)
+    parser.add_argument("--params", type=int, nargs="+", default=DEFAULT_PARAMS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "channels": CHANNELS,
+        },
+        "runs": [],
+    }
+    for weeks in args.weeks:
+        for params in args.params:
+            report["runs"].append({"weeks": weeks, "params": params, "transforms": run(weeks, params, args.seed)})
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
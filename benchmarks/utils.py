@@ -0,0 +1,24 @@
+import subprocess
+
+import numpy as np
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_summary(values):
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "p50_s": round(float(np.percentile(values, 50)), 6),
+        "p95_s": round(float(np.percentile(values, 95)), 6),
+        "max_s": round(float(values.max()), 6),
+    }
@@ -1,28 +1,32 @@
+import functools
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 from PIL import Image
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # --- Compact filter summary with modern style ---
-def render_filter_summary(date_range, regions, customer_types, delivery_modes, package_weight_classes, service_channels, account_types, customer_tiers):
+SUMMARY_LABELS = {
+    "region": "Region",
+    "customer_type": "Customer Type",
+    "delivery_mode": "Delivery Mode",
+    "package_weight_class": "Weight Class",
+    "service_channel": "Service Channel",
+    "account_type": "Account Type",
+    "customer_tier": "Customer Tier",
+}
+
+def render_filter_summary(catalog, date_range, **segments):
+    # Only the dimensions narrowed from the catalog's full domain are listed
     summary_parts = []
-    if date_range:
+    if date_range and (date_range[0] > catalog.week_bounds[0].date() or date_range[1] < catalog.week_bounds[1].date()):
         summary_parts.append(f"Date: {date_range[0].strftime('%Y-%m-%d')} to {date_range[1].strftime('%Y-%m-%d')}")
-    if regions:
-        summary_parts.append(f"Region: {', '.join(regions)}")
-    if customer_types:
-        summary_parts.append(f"Customer Type: {', '.join(customer_types)}")
-    if delivery_modes:
-        summary_parts.append(f"Delivery Mode: {', '.join(delivery_modes)}")
-    if package_weight_classes:
-        summary_parts.append(f"Weight Class: {', '.join(package_weight_classes)}")
-    if service_channels:
-        summary_parts.append(f"Service Channel: {', '.join(service_channels)}")
-    if account_types:
-        summary_parts.append(f"Account Type: {', '.join(account_types)}")
-    if customer_tiers:
-        summary_parts.append(f"Customer Tier: {', '.join(customer_tiers)}")
+    for col, label in SUMMARY_LABELS.items():
+        values = segments.get(col, [])
+        if not catalog.is_complete(col, values):
+            summary_parts.append(f"{label}: {', '.join(map(str, values)) or 'none'} ({len(values)} of {catalog.cardinality(col)})")
     if summary_parts:
         summary_text = " | ".join(summary_parts)
     else:
@@ -55,6 +59,7 @@ def simple_login():
         if st.button("Login"):
             if username in credentials and password == credentials[username]:
                 st.session_state["authenticated"] = True
+                st.session_state["username"] = username
                 st.success(f"Welcome, {username}!")
                 st.rerun()
             else:
@@ -64,25 +69,126 @@ def simple_login():
 simple_login()
 
 # --- Main_app.py content starts here ---
-from tabs.revenue_tab import show_revenue_tab, show_kpi_cards_with_yoy
-from tabs.campaign_tab import show_campaign_tab
-from tabs.delivery_tab import show_delivery_tab
-from tabs.brand_tab import show_brand_tab
+from tabs.revenue_tab import REVENUE_AGGREGATES, show_revenue_tab, show_kpi_cards_with_yoy
+from tabs.campaign_tab import CAMPAIGN_AGGREGATES, show_campaign_tab
+from tabs.delivery_tab import DELIVERY_AGGREGATES, show_delivery_tab
+from tabs.brand_tab import BRAND_AGGREGATES, show_brand_tab
 from tabs.download_tab import show_download_tab
+from tabs.explorer_tab import show_explorer_tab
+from tabs.media_mix_tab import show_contribution_tab, show_media_mix_tab
+from shared.catalog import refresh_catalog
+from shared.comparison import COMPARISONS, DEFAULT_COMPARISON, build_comparison
+from shared.contribution import load_contributions
+from shared.cube import write_cube
+from shared.data import DATA_PATH, SEGMENT_COLUMNS, data_version
+from shared.default_view import materialize_default_view
+from shared.executor import background, prefetch_changed
+from shared.filters import build_filters, filter_hash
+from shared.mmm import load_media_mix
+from shared.metrics import (
+    cache_lookup, record_cache_miss, record_filters, record_first_paint, record_rerun, record_session,
+    start_metrics_server
+)
+from shared.prefix_sums import build_prefix_sums
+from shared.profiling import profile_stage, render_profile, start_profiling
+from shared.query_engine import DEFAULT_ENGINE, ENGINES, create_engine
+from shared.tracing import export_rerun
 
 st.set_page_config(page_title="Logistics Dashboard", layout="wide")
 
+# --- Profiling mode (sidebar toggle or ?profile=1) ---
+profiler = start_profiling(st.session_state.get("profiling_mode", st.query_params.get("profile") == "1"))
+
+# --- Prometheus metrics (local scrape endpoint) ---
+start_metrics_server()
+ctx = get_script_run_ctx()
+if ctx is not None:
+    record_session(ctx.session_id)
+
 # --- Load Data ---
-df = pd.read_csv("logistics_mmm_extended_data.csv")
-df['week'] = pd.to_datetime(df['week'])
+# Query engine (pandas, or duckdb for SQL over the data file) is picked with
+# ?engine=... or the DASHBOARD_ENGINE env var and shared across sessions.
+# Everything cached below is keyed by the data file version, so replacing
+# the file refreshes the engine and the materialized views on the next rerun.
+@st.cache_resource
+def _load_engine(name, path, version):
+    record_cache_miss("engine")
+    return create_engine(name, path)
+
+# ?engine= comes from the URL: an unknown name falls back to the default engine
+engine_name = str(st.query_params.get("engine", os.environ.get("DASHBOARD_ENGINE", DEFAULT_ENGINE))).lower()
+if engine_name not in ENGINES:
+    st.warning(f"Unknown query engine `{engine_name[:40]}`, using {DEFAULT_ENGINE}. Available engines: {', '.join(ENGINES)}.")
+    engine_name = DEFAULT_ENGINE
+
+with profile_stage("load") as stage, cache_lookup("engine") as lookup:
+    version = data_version(DATA_PATH)
+    engine = _load_engine(engine_name, DATA_PATH, version)
+stage["attributes"].update(engine=engine.name, cache_hit=lookup["hit"], data_version=version)
+
+# Week prefix sums per segment combination, built once per engine, back the
+# KPI cards: date range changes resolve by lookup instead of a row scan.
+@st.cache_resource
+def _load_prefix_sums(name, path, version):
+    record_cache_miss("prefix_sums")
+    return build_prefix_sums(_load_engine(name, path, version))
+
+with profile_stage("prefix_sums") as stage, cache_lookup("prefix_sums") as lookup:
+    prefix_sums = _load_prefix_sums(engine.name, DATA_PATH, version)
+stage["attributes"].update(cache_hit=lookup["hit"], nbytes=prefix_sums.nbytes)
+
+# Domains, cardinalities and row counts of the filter dimensions, read by the
+# sidebar widgets and the filter summary
+@st.cache_resource
+def _load_catalog(name, path, version):
+    record_cache_miss("catalog")
+    return refresh_catalog(_load_engine(name, path, version), path)
+
+with profile_stage("catalog") as stage, cache_lookup("catalog") as lookup:
+    catalog = _load_catalog(engine.name, DATA_PATH, version)
+stage["attributes"].update(cache_hit=lookup["hit"], rows=catalog.row_count)
+
+# Compact week x segment cube for the browser-side cross-filter explorer
+@st.cache_resource
+def _load_cube(name, path, version):
+    record_cache_miss("cube")
+    return write_cube(_load_prefix_sums(name, path, version), path, version)
+
+with profile_stage("cube") as stage, cache_lookup("cube") as lookup:
+    cube = _load_cube(engine.name, DATA_PATH, version)
+stage["attributes"].update(cache_hit=lookup["hit"], bytes=cube["bytes"] if cube else None)
+
+# Media mix model, fitted in the process pool once per data version; the
+# script goes on while it runs and only the Media Mix tab waits for it. A
+# failed fit is evicted by the tab that shows the error and retried next rerun.
+@st.cache_resource
+def _load_media_mix(name, path, version):
+    record_cache_miss("media_mix")
+    return background(load_media_mix, _load_engine(name, path, version), path, version)
+
+media_mix = _load_media_mix(engine.name, DATA_PATH, version)
+
+# Base + per-channel weekly revenue of that model, saved once per data version
+@st.cache_resource
+def _load_contributions(name, path, version):
+    record_cache_miss("media_contributions")
+    return background(
+        load_contributions, _load_engine(name, path, version), path, version, _load_media_mix(name, path, version)
+    )
+
+contributions = _load_contributions(engine.name, DATA_PATH, version)
+
+TAB_AGGREGATES = {**REVENUE_AGGREGATES, **CAMPAIGN_AGGREGATES, **DELIVERY_AGGREGATES, **BRAND_AGGREGATES}
+
+# The login view (every filter at "all") fully computed once per data version
+@st.cache_resource
+def _load_default_view(name, path, version):
+    record_cache_miss("default_view")
+    return materialize_default_view(_load_engine(name, path, version), TAB_AGGREGATES)
 
-# --- Derived Metrics ---
-df["profit"] = (df["revenue_total"] * df["profit_margin"] / 100).round(2)
-df["revenue_per_order"] = (df["revenue_total"] / df["order_count"]).round(2)
-df["profit_per_order"] = (df["profit"] / df["order_count"]).round(2)
-df["cpc"] = (df["campaign_cost"] / df["leads_generated"]).round(2)
-df["roas"] = ((df["conversions"] * df["avg_transaction_value"]) / df["campaign_cost"]).round(2)
-df["conversion_rate"] = (df["conversions"] / df["leads_generated"]).round(3)
+with profile_stage("default_view") as stage, cache_lookup("default_view") as lookup:
+    default_view = _load_default_view(engine.name, DATA_PATH, version)
+stage["attributes"].update(cache_hit=lookup["hit"])
 
 # --- Sidebar Branding and Executive Filters ---
 logo = Image.open("mindmetric_logo.png")
@@ -96,34 +202,134 @@ st.sidebar.markdown(
 )
 st.sidebar.markdown("---")
 
+# --- Facet counts ---
+# Every option shows the rows and revenue it would keep under the other
+# active filters, read from the prefix sums in one pass over the segment
+# combinations. Counts follow the applied filters (in batched mode, pending
+# edits update them on Apply).
+def format_money(value):
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= divisor:
+            return f"${value / divisor:,.1f}{suffix}"
+    return f"${value:,.0f}"
+
+def applied_filter_state():
+    date_range = st.session_state.get("filter_week", catalog.week_bounds)
+    if len(date_range) != 2:
+        date_range = catalog.week_bounds
+    segments = {col: st.session_state.get(f"filter_{col}", catalog.domain(col)) for col in SEGMENT_COLUMNS}
+    return build_filters(date_range, **segments)
+
+def facet_multiselect(label, col):
+    counts = facets[col]
+
+    def format_option(value):
+        if value not in counts.index:
+            return str(value)
+        return f"{value} · {counts.at[value, 'rows']:,.0f} rows · {format_money(counts.at[value, 'revenue_total'])}"
+
+    key = f"filter_{col}"
+    domain = catalog.domain(col)
+    if key not in st.session_state:
+        return st.multiselect(label, domain, default=domain, format_func=format_option, key=key)
+    # New counts change the option labels and so the widget's identity: carry the selection over
+    st.session_state[key] = [value for value in st.session_state[key] if value in domain]
+    return st.multiselect(label, domain, format_func=format_option, key=key)
+
+with profile_stage("facets"):
+    facets = prefix_sums.facets(applied_filter_state())
+
+# Batched mode: the filters sit in a form, so edits stay in the browser and
+# the dashboard reruns once, on Apply
 with st.sidebar.expander("Filter Options", expanded=True):
-    date_range = st.date_input(
-        "Select Date Range",
-        [df['week'].min(), df['week'].max()],
-        help="Filter data by date range"
+    batch_filters = st.toggle("Apply filters in one step", value=True, key="batch_filters")
+    filter_panel = st.form("filter_form", border=False) if batch_filters else st.container()
+    with filter_panel:
+        date_range = st.date_input(
+            "Select Date Range",
+            list(catalog.week_bounds),
+            help="Filter data by date range",
+            key="filter_week"
+        )
+        regions = facet_multiselect("Select Region", "region")
+        customer_types = facet_multiselect("Select Customer Type", "customer_type")
+        delivery_modes = facet_multiselect("Select Delivery Mode", "delivery_mode")
+        package_weight_classes = facet_multiselect("Select Package Weight Class", "package_weight_class")
+        service_channels = facet_multiselect("Select Service Channel", "service_channel")
+        account_types = facet_multiselect("Select Account Type", "account_type")
+        customer_tiers = facet_multiselect("Select Customer Tier", "customer_tier")
+        if batch_filters:
+            st.form_submit_button("Apply filters", type="primary", use_container_width=True)
+
+with st.sidebar.expander("KPI Comparison", expanded=False):
+    comparison_mode = st.selectbox(
+        "Compare KPIs to", list(COMPARISONS), index=list(COMPARISONS).index(DEFAULT_COMPARISON),
+        format_func=COMPARISONS.get, key="comparison_mode"
     )
-    regions = st.multiselect("Select Region", df['region'].unique(), default=list(df['region'].unique()))
-    customer_types = st.multiselect("Select Customer Type", df['customer_type'].unique(), default=list(df['customer_type'].unique()))
-    delivery_modes = st.multiselect("Select Delivery Mode", df['delivery_mode'].unique(), default=list(df['delivery_mode'].unique()))
-    package_weight_classes = st.multiselect("Select Package Weight Class", df['package_weight_class'].unique(), default=list(df['package_weight_class'].unique()))
-    service_channels = st.multiselect("Select Service Channel", df['service_channel'].unique(), default=list(df['service_channel'].unique()))
-    account_types = st.multiselect("Select Account Type", df['account_type'].unique(), default=list(df['account_type'].unique()))
-    customer_tiers = st.multiselect("Select Customer Tier", df['customer_tier'].unique(), default=list(df['customer_tier'].unique()))
+    iso_weeks = st.toggle("Align years by ISO week", value=True, key="comparison_iso_weeks")
+    baseline_range = None
+    if comparison_mode == "custom":
+        baseline_range = st.date_input("Baseline Date Range", list(catalog.week_bounds), key="comparison_baseline")
+
+st.sidebar.toggle("⏱️ Profiling mode", value=profiler.enabled, key="profiling_mode")
 
 # --- Filter Data ---
-start_date = pd.to_datetime(date_range[0])
-end_date = pd.to_datetime(date_range[1])
-filtered_df = df[
-    (df['week'] >= start_date) &
-    (df['week'] <= end_date) &
-    (df['region'].isin(regions)) &
-    (df['customer_type'].isin(customer_types)) &
-    (df['delivery_mode'].isin(delivery_modes)) &
-    (df['package_weight_class'].isin(package_weight_classes)) &
-    (df['service_channel'].isin(service_channels)) &
-    (df['account_type'].isin(account_types)) &
-    (df['customer_tier'].isin(customer_tiers))
-]
+# The last applied filters of this session, with their selection and
+# aggregates: reruns that keep the filters (tab interactions, comparison
+# settings) skip the filter pass, and filter changes recompute only the
+# aggregates they affect.
+applied = st.session_state.get("_applied_filters")
+if applied is not None and applied["data_key"] != (engine.name, version):
+    applied = None
+
+with profile_stage("filter") as stage:
+    filters = build_filters(
+        date_range,
+        region=regions,
+        customer_type=customer_types,
+        delivery_mode=delivery_modes,
+        package_weight_class=package_weight_classes,
+        service_channel=service_channels,
+        account_type=account_types,
+        customer_tier=customer_tiers
+    )
+    stage["attributes"]["filter_hash"] = filter_hash(filters)
+    is_default_view = default_view.matches(filters)
+    stage["attributes"]["default_view"] = is_default_view
+    unchanged = applied is not None and applied["filter_hash"] == filter_hash(filters)
+    if is_default_view:
+        selection = default_view.selection
+    elif unchanged:
+        selection = applied["selection"]
+    else:
+        selection = engine.select(filters)
+    stage["attributes"]["unchanged"] = unchanged
+    stage["rows_out"] = selection.row_count
+filtered = selection
+record_filters(filters, selection.row_count)
+
+# --- Aggregations, computed in parallel while the page renders ---
+# The default view is served from the materialized results. Rows are never
+# pulled into the script: insights and the correlation heatmap read
+# aggregates, and exports fetch rows only when their button is clicked.
+with profile_stage("submit_aggregations") as stage:
+    if is_default_view:
+        selection = default_view.prefetched()
+    else:
+        previous = (applied["filters"], applied["prefetched"]) if applied is not None else None
+        selection, plan = prefetch_changed(selection, TAB_AGGREGATES, filters, previous)
+        stage["attributes"].update({name: len(names) for name, names in plan.items()})
+st.session_state["_applied_filters"] = {
+    "data_key": (engine.name, version),
+    "filter_hash": filter_hash(filters),
+    "filters": filters,
+    "selection": filtered,
+    "prefetched": selection,
+}
+
+with profile_stage("comparison"):
+    comparison = build_comparison(prefix_sums, filters, comparison_mode, iso_weeks, baseline_range)
+kpi_cards = functools.partial(show_kpi_cards_with_yoy, comparison=comparison)
 
 # --- Color Palettes ---
 QUALITATIVE_DARK = px.colors.qualitative.Dark24
@@ -133,14 +339,15 @@ palettes = (QUALITATIVE_DARK, QUALITATIVE_BOLD, SEQ_VIRIDIS)
 
 # --- Show Filter Summary Indicator ---
 render_filter_summary(
+    catalog,
     date_range=date_range,
-    regions=regions,
-    customer_types=customer_types,
-    delivery_modes=delivery_modes,
-    package_weight_classes=package_weight_classes,
-    service_channels=service_channels,
-    account_types=account_types,
-    customer_tiers=customer_tiers
+    region=regions,
+    customer_type=customer_types,
+    delivery_mode=delivery_modes,
+    package_weight_class=package_weight_classes,
+    service_channel=service_channels,
+    account_type=account_types,
+    customer_tier=customer_tiers
 )
 
 tabs = st.tabs([
@@ -148,20 +355,51 @@ tabs = st.tabs([
     "🎯 Campaign Performance",
     "🚚 Delivery & Service",
     "📣 Brand & Incidents",
+    "🔎 Explorer",
+    "📺 Media Mix",
+    "🧩 Media Contribution",
     "📤 Download Data"
 ])
 
-with tabs[0]:
-    show_revenue_tab(filtered_df, palettes, show_kpi_cards_with_yoy)
+with tabs[0], profile_stage("tab:revenue", rows_in=selection.row_count):
+    show_revenue_tab(selection, palettes, kpi_cards, comparison=comparison, prefix_sums=prefix_sums, filters=filters)
+
+with tabs[1], profile_stage("tab:campaign", rows_in=selection.row_count):
+    show_campaign_tab(selection, palettes, kpi_cards)
 
-with tabs[1]:
-    show_campaign_tab(filtered_df, palettes, show_kpi_cards_with_yoy)
+with tabs[2], profile_stage("tab:delivery", rows_in=selection.row_count):
+    show_delivery_tab(selection, palettes, kpi_cards)
 
-with tabs[2]:
-    show_delivery_tab(filtered_df, palettes, show_kpi_cards_with_yoy)
+with tabs[3], profile_stage("tab:brand", rows_in=selection.row_count):
+    show_brand_tab(selection, palettes, kpi_cards)
+
+with tabs[4], profile_stage("tab:explorer"):
+    show_explorer_tab(engine, cube, catalog, filters)
+
+with tabs[5], profile_stage("tab:media_mix"):
+    show_media_mix_tab(media_mix, palettes, functools.partial(_load_media_mix.clear, engine.name, DATA_PATH, version))
+
+with tabs[6], profile_stage("tab:media_contribution"):
+    show_contribution_tab(
+        contributions, filters, palettes, functools.partial(_load_contributions.clear, engine.name, DATA_PATH, version)
+    )
 
-with tabs[3]:
-    show_brand_tab(filtered_df, palettes, show_kpi_cards_with_yoy)
+with tabs[7], profile_stage("tab:download", rows_in=selection.row_count):
+    show_download_tab(selection, prefix_sums, filters)
 
-with tabs[4]:
-    show_download_tab(filtered_df)
+render_profile(profiler)
+record_rerun(engine.name, profiler.total_ms / 1000)
+first_paint = not st.session_state.get("_first_paint_recorded")
+if first_paint:
+    st.session_state["_first_paint_recorded"] = True
+    record_first_paint("default" if is_default_view else "filtered", profiler.total_ms / 1000)
+export_rerun(profiler, {
+    "engine": engine.name,
+    "filter_hash": filter_hash(filters),
+    "rows": selection.row_count,
+    "session.id": ctx.session_id if ctx is not None else None,
+    "user": st.session_state.get("username"),
+    "profiling": profiler.enabled,
+    "default_view": is_default_view,
+    "first_paint": first_paint,
+})
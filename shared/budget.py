@@ -0,0 +1,119 @@
+import functools
+
+import numpy as np
+
+from shared.transforms import hill
+
+# --- Budget optimizer ---
+# Weekly spend per channel is allocated to maximize the media revenue the
+# fitted model predicts, under a total budget and per-channel bounds. Each
+# channel's response curve is its steady-state weekly revenue at a constant
+# weekly spend (adstock s / (1 - decay), then Hill), tabulated once per
+# model on a dense grid of spend units shared by every channel. Allocations
+# are whole units, so the budget is met exactly; a solver start moves the
+# best block of units from one channel to another until no transfer pays
+# off. Hill curves can be S-shaped, where such moves stall early, so many
+# starts run at once, batched in NumPy on the calling thread (a slider move
+# never waits on a shared pool), and the best end point wins.
+CURVE_POINTS = 3001
+# The grid covers this multiple of the current total weekly spend
+BUDGET_SPAN = 3.0
+SOLVER_STARTS = 64
+MAX_ITERATIONS = 2000
+
+
+def steady_state_response(model, spend):
+    """Weekly revenue of each channel at a constant weekly spend (..., channels)."""
+    return model.media_coef * hill(np.asarray(spend) / (1 - model.decay), model.half_saturation, model.shape)
+
+
+class ResponseCurves:
+    def __init__(self, model, points=CURVE_POINTS):
+        self.channels = model.channels
+        self.current = model.spend.mean(axis=0)
+        self.max_budget = BUDGET_SPAN * float(self.current.sum())
+        self.step = self.max_budget / (points - 1)
+        self.spend = np.arange(points) * self.step
+        self.revenue = steady_state_response(model, self.spend[:, None]).T  # channels x points
+        self.marginal_roi = np.gradient(self.revenue, self.step, axis=1)
+        self.current_revenue = steady_state_response(model, self.current)
+
+    def units(self, spend, rounding=np.rint):
+        return np.clip(rounding(np.asarray(spend) / self.step), 0, len(self.spend) - 1).astype(int)
+
+
+@functools.lru_cache(maxsize=4)
+def response_curves(model):
+    # One set of curves per fitted model (models hash by identity)
+    return ResponseCurves(model)
+
+
+def _random_starts(lower, upper, total, count, rng):
+    # Feasible unit allocations: lower bounds plus the rest spread at random, filled up to the upper bounds
+    weights = rng.dirichlet(np.ones(len(lower)), size=count)
+    alloc = np.minimum(lower + np.floor(weights * (total - lower.sum())).astype(int), upper)
+    order = np.argsort(rng.random((count, len(lower))), axis=1)
+    capacity = np.take_along_axis(upper - alloc, order, axis=1)
+    left = (total - alloc.sum(axis=1))[:, None]
+    before = np.cumsum(capacity, axis=1) - capacity
+    fill = np.clip(left - before, 0, capacity)
+    np.put_along_axis(alloc, order, np.take_along_axis(alloc, order, axis=1) + fill, axis=1)
+    return alloc
+
+
+def _climb(revenue, alloc, lower, upper):
+    # Best transfer of 2^k units between two channels per start and iteration, until none gains
+    channels = np.arange(revenue.shape[0])
+    steps = 1 << np.arange(int(revenue.shape[1]).bit_length())
+    alloc = alloc.copy()
+    active = np.ones(len(alloc), dtype=bool)
+    tolerance = 1e-9 * max(float(np.abs(revenue).max()), 1.0)
+    for _ in range(MAX_ITERATIONS):
+        a = alloc[active][:, None, :]  # starts x 1 x channels
+        up, down = a + steps[:, None], a - steps[:, None]  # starts x steps x channels
+        current = revenue[channels, a]
+        gain = np.where(up <= upper, revenue[channels, np.minimum(up, upper)] - current, -np.inf)
+        loss = np.where(down >= lower, current - revenue[channels, np.maximum(down, lower)], np.inf)
+        net = gain[:, :, None, :] - loss[:, :, :, None]  # starts x steps x from x to
+        net[:, :, channels, channels] = -np.inf
+        flat = net.reshape(len(a), -1)
+        best = flat.argmax(axis=1)
+        improving = flat[np.arange(len(a)), best] > tolerance
+        if not improving.any():
+            break
+        step_index, source, target = np.unravel_index(best[improving], net.shape[1:])
+        rows = np.flatnonzero(active)[improving]
+        alloc[rows, source] -= steps[step_index]
+        alloc[rows, target] += steps[step_index]
+        active[np.flatnonzero(active)[~improving]] = False
+    return alloc
+
+
+def optimize_budget(curves, budget, lower, upper, starts=SOLVER_STARTS, seed=0):
+    """Weekly spend per channel maximizing predicted revenue; ValueError when the bounds cannot meet the budget.
+
+    lower and upper are per-channel spend bounds; returns spend, revenue
+    (both per channel) and the total predicted revenue.
+    """
+    total = int(curves.units(budget))
+    lower = curves.units(lower, np.ceil)
+    upper = curves.units(upper, np.floor)
+    if lower.sum() > total or upper.sum() < total or (lower > upper).any():
+        raise ValueError("The channel bounds cannot add up to this budget.")
+    rng = np.random.default_rng(seed)
+    # The first start keeps the current channel mix, scaled to the budget
+    mix = np.clip(np.floor(lower + (total - lower.sum()) * curves.current / curves.current.sum()).astype(int), lower, upper)
+    if mix.sum() > total:
+        mix = lower
+    alloc = np.vstack([
+        _random_starts(mix, upper, total, 1, rng),
+        _random_starts(lower, upper, total, starts - 1, rng),
+    ])
+    alloc = _climb(curves.revenue, alloc, lower, upper)
+    revenue = curves.revenue[np.arange(len(upper)), alloc]
+    best = revenue.sum(axis=1).argmax()
+    return {
+        "spend": alloc[best] * curves.step,
+        "revenue": revenue[best],
+        "total_revenue": float(revenue[best].sum()),
+    }
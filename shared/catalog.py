@@ -0,0 +1,102 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS
+from shared.query_engine import Aggregate
+
+# --- Dimension catalog ---
+# The sidebar widgets and the filter summary read the filter dimensions from
+# a catalog built once per engine and data version: the sorted domain of
+# every segment column with the row count of each value, the total row count
+# and the week bounds. When rows were only appended to the CSV file, the next
+# version's catalog is the previous one plus counts of the appended rows.
+CATALOG_SPECS = {col: Aggregate(col, {"rows": (col, "count")}) for col in SEGMENT_COLUMNS}
+
+# Bytes before the previous end of file that must be unchanged for an append
+APPEND_FINGERPRINT_BYTES = 64 * 1024
+
+
+class DimensionCatalog:
+    def __init__(self, counts, row_count, week_bounds):
+        # counts: segment column -> Series of row counts indexed by the sorted values
+        self.counts = counts
+        self.row_count = row_count
+        self.week_bounds = week_bounds
+
+    def domain(self, col):
+        return list(self.counts[col].index)
+
+    def cardinality(self, col):
+        return len(self.counts[col])
+
+    def is_complete(self, col, values):
+        # Every value of the column selected
+        return set(self.counts[col].index) <= set(values)
+
+    def extend(self, frame):
+        """Catalog of the current data plus the rows of `frame`."""
+        counts = {
+            col: self.counts[col].add(frame[col].value_counts(), fill_value=0).astype(int).sort_index()
+            for col in SEGMENT_COLUMNS
+        }
+        weeks = pd.to_datetime(frame["week"])
+        week_bounds = self.week_bounds
+        if len(weeks.dropna()):
+            week_bounds = (min(week_bounds[0], weeks.min()), max(week_bounds[1], weeks.max()))
+        return DimensionCatalog(counts, self.row_count + len(frame), week_bounds)
+
+
+def build_catalog(engine):
+    # No restricted dimension: one unfiltered pass per column in the engine
+    everything = {"week": tuple(engine.date_bounds())}
+    everything.update({col: engine.distinct(col) for col in SEGMENT_COLUMNS})
+    selection = engine.select(everything)
+    aggregates = selection.aggregate_many(CATALOG_SPECS)
+    counts = {
+        col: aggregates[col].set_index(col)["rows"].astype(int).sort_index()
+        for col in SEGMENT_COLUMNS
+    }
+    return DimensionCatalog(counts, selection.row_count, tuple(engine.date_bounds()))
+
+
+# --- Incremental refresh ---
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _fingerprint(path, end):
+    with open(path, "rb") as f:
+        f.seek(max(0, end - APPEND_FINGERPRINT_BYTES))
+        return hashlib.sha1(f.read(end - f.tell())).hexdigest()
+
+
+def _appended_rows(path, start):
+    # Rows written after byte `start` of a CSV file, or None unless `start` is a line boundary
+    columns = pd.read_csv(path, nrows=0).columns
+    with open(path, "rb") as f:
+        f.seek(start - 1)
+        if f.read(1) != b"\n":
+            return None
+        return pd.read_csv(f, header=None, names=columns, usecols=["week", *SEGMENT_COLUMNS])
+
+
+def refresh_catalog(engine, path):
+    """Catalog of path's current contents, extended from the previous version when rows were only appended."""
+    size = os.path.getsize(path)
+    with _catalogs_lock:
+        previous = _catalogs.get(path)
+    catalog = None
+    if previous is not None and not str(path).endswith(".parquet"):
+        prev_size, prev_fingerprint, prev_catalog = previous
+        if size > prev_size and _fingerprint(path, prev_size) == prev_fingerprint:
+            appended = _appended_rows(path, prev_size)
+            if appended is not None:
+                catalog = prev_catalog.extend(appended)
+    if catalog is None:
+        catalog = build_catalog(engine)
+    with _catalogs_lock:
+        _catalogs[path] = (size, _fingerprint(path, size), catalog)
+    return catalog
@@ -0,0 +1,127 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from shared.prefix_sums import PREFIX_COLUMNS, week_values
+
+# --- Period comparison ---
+# KPI cards and insights compare the selected window against a baseline
+# window. Both are resolved on the per-region prefix sums of the selected
+# segments (shared.prefix_sums): a binary search on the sorted week offsets
+# and a subtraction, so baselines outside the selected dates are available
+# and changing the window or the comparison mode never rescans rows.
+COMPARISONS = {
+    "yoy": "Year over year",
+    "prior_period": "Prior period",
+    "same_period_last_year": "Same period last year",
+    "custom": "Custom baseline",
+}
+DEFAULT_COMPARISON = "yoy"
+
+# KPI -> (numerator, denominator or None): sums, and row-weighted means as sum / count
+KPI_TOTALS = {
+    "revenue_total": ("revenue_total", None),
+    "profit": ("profit", None),
+    "conversions": ("conversions", None),
+    "campaign_cost": ("campaign_cost", None),
+    "repeat_purchase_flag": ("repeat_purchase_flag_sum", "repeat_purchase_flag_count"),
+    "roas": ("roas_sum", "roas_count"),
+}
+
+
+def shift_year(value, iso_weeks=True):
+    # Same day one year earlier; with iso_weeks the same ISO week and weekday
+    value = pd.Timestamp(value)
+    if not iso_weeks:
+        return value - pd.DateOffset(years=1)
+    year, week, weekday = value.isocalendar()
+    last_week = date(year - 1, 12, 28).isocalendar()[1]
+    shifted = date.fromisocalendar(year - 1, min(week, last_week), weekday)
+    return pd.Timestamp(shifted) + (value - value.normalize())
+
+
+def year_start(value, iso_weeks=True):
+    value = pd.Timestamp(value)
+    if iso_weeks:
+        return pd.Timestamp(date.fromisocalendar(value.isocalendar()[0], 1, 1))
+    return pd.Timestamp(value.year, 1, 1)
+
+
+class PeriodComparison:
+    def __init__(self, weeks, regions, prefix, selected, mode=DEFAULT_COMPARISON, iso_weeks=True, baseline=None):
+        # prefix: (region, week + 1, PREFIX_COLUMNS) cumulative sums over the sorted weeks
+        self.mode = mode
+        self.iso_weeks = iso_weeks
+        self.weeks = weeks
+        self.regions = dict(zip(regions, prefix))
+        self.totals = prefix.sum(axis=0) if len(prefix) else np.zeros((len(weeks) + 1, len(PREFIX_COLUMNS)))
+        self.current, self.baseline = self.windows(selected, baseline)
+
+    # --- Windows ---
+    def bounds(self, start, end):
+        # Index range [lo, hi) of the weeks within start..end
+        lo = np.searchsorted(self.weeks, week_values(start), side="left")
+        hi = np.searchsorted(self.weeks, week_values(end), side="right")
+        return lo, max(lo, hi)
+
+    def windows(self, selected, baseline=None):
+        if selected is None:
+            return None, None
+        start, end = (pd.Timestamp(value) for value in selected)
+        if self.mode == "yoy":
+            start = max(start, year_start(end, self.iso_weeks))
+            return (start, end), (shift_year(start, self.iso_weeks), shift_year(end, self.iso_weeks))
+        if self.mode == "same_period_last_year":
+            return (start, end), (shift_year(start, self.iso_weeks), shift_year(end, self.iso_weeks))
+        if self.mode == "prior_period":
+            # The same number of weeks immediately before the selection
+            lo, hi = self.bounds(start, end)
+            if lo == 0 or hi == lo:
+                return (start, end), None
+            prior = self.weeks[max(0, lo - (hi - lo)):lo]
+            return (start, end), (pd.Timestamp(prior[0]), pd.Timestamp(prior[-1]))
+        if self.mode == "custom":
+            if baseline is None or len(baseline) != 2:
+                return (start, end), None
+            return (start, end), tuple(pd.Timestamp(value) for value in baseline)
+        raise ValueError(f"Unknown comparison '{self.mode}'. Choose from: {', '.join(COMPARISONS)}")
+
+    # --- KPIs ---
+    def _kpis(self, prefix, window):
+        if window is None:
+            return pd.Series(np.nan, index=list(KPI_TOTALS))
+        lo, hi = self.bounds(*window)
+        sums = dict(zip(PREFIX_COLUMNS, prefix[hi] - prefix[lo]))
+        values = {}
+        for kpi, (numerator, denominator) in KPI_TOTALS.items():
+            if denominator is None:
+                values[kpi] = sums[numerator]
+            else:
+                values[kpi] = sums[numerator] / sums[denominator] if sums[denominator] else np.nan
+        return pd.Series(values)
+
+    def kpis(self, region=None):
+        """Current-window KPIs and their % change vs the baseline window."""
+        prefix = self.totals if region is None else self.regions.get(region)
+        if prefix is None:
+            empty = pd.Series(np.nan, index=list(KPI_TOTALS))
+            return empty, empty
+        curr_vals = self._kpis(prefix, self.current)
+        prev_vals = self._kpis(prefix, self.baseline)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (curr_vals - prev_vals) / prev_vals * 100
+        return curr_vals, change.replace([np.inf, -np.inf], np.nan)
+
+    @property
+    def label(self):
+        if self.baseline is None:
+            return f"{COMPARISONS[self.mode]}: no baseline data"
+        start, end = self.baseline
+        return f"{COMPARISONS[self.mode]} ({start:%Y-%m-%d} to {end:%Y-%m-%d})"
+
+
+def build_comparison(prefix_sums, filters, mode=DEFAULT_COMPARISON, iso_weeks=True, baseline=None):
+    # Segment filters only: baselines usually fall outside the selected dates
+    regions, prefix = prefix_sums.collapse(filters, by="region")
+    return PeriodComparison(prefix_sums.weeks, regions, prefix, filters["week"], mode, iso_weeks, baseline)
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from shared.budget import response_curves
+from shared.data import SEGMENT_COLUMNS, dataset_key, prune_versions
+from shared.mmm import MODEL_DIR, MODEL_REVISION
+from shared.query_engine import Aggregate
+
+# --- Media contributions ---
+# Weekly revenue decomposed into base (intercept, controls and whatever the
+# model leaves unexplained) plus one contribution per channel, computed once
+# per model revision and data version and saved as float32 arrays:
+#   values [week][region][base, channel...], response curves [channel][spend]
+# The model is national, so each week's parts are split across regions by
+# the region's share of that week's revenue. The sidebar date range and
+# regions then only slice and sum the saved arrays; nothing is re-predicted.
+REGION_WEEKS = Aggregate(("week", "region"), {"revenue_total": ("revenue_total", "sum")})
+
+# Response curve points kept on disk (every n-th point of the optimizer's grid)
+CURVE_STRIDE = 10
+
+
+class MediaContributions:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.weeks = arrays["weeks"]
+        self.regions = [str(region) for region in arrays["regions"]]
+        self.parts = ["base"] + [str(col) for col in arrays["channels"]]
+
+    def _mask(self, filters):
+        start_date, end_date = filters["week"]
+        weeks = (self.weeks >= np.datetime64(start_date)) & (self.weeks <= np.datetime64(end_date))
+        regions = np.isin(self.regions, [str(region) for region in filters["region"]])
+        return weeks, regions
+
+    def weekly(self, filters):
+        """Base and channel contributions per week of the filters' date range and regions."""
+        weeks, regions = self._mask(filters)
+        values = self.arrays["values"][weeks][:, regions].sum(axis=1, dtype=float)
+        frame = pd.DataFrame(values, columns=self.parts)
+        frame.insert(0, "week", pd.to_datetime(self.weeks[weeks]))
+        return frame
+
+    def revenue_share(self, filters):
+        # Selected regions' share of the revenue of the selected weeks, for scaling the national weekly curves
+        weeks, regions = self._mask(filters)
+        values = self.arrays["values"][weeks]
+        total = values.sum(dtype=float)
+        return float(values[:, regions].sum(dtype=float) / total) if total else 0.0
+
+    def curves(self, filters):
+        """Weekly response per channel at a constant weekly spend, scaled to the selected regions' revenue share."""
+        share = self.revenue_share(filters)
+        spend = self.arrays["curve_spend"].astype(float)
+        return pd.DataFrame({
+            "channel": np.repeat(self.parts[1:], len(spend)),
+            "weekly_spend": np.tile(spend, len(self.parts) - 1),
+            "weekly_revenue": (self.arrays["curve_revenue"] * share).ravel(),
+        })
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, **self.arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+
+def build_contributions(engine, model):
+    everything = {"week": tuple(engine.date_bounds())}
+    everything.update({col: engine.distinct(col) for col in SEGMENT_COLUMNS})
+    region_weeks = engine.select(everything).aggregate(REGION_WEEKS)
+    revenue = region_weeks.pivot_table(
+        index="week", columns="region", values="revenue_total", aggfunc="sum", fill_value=0
+    )
+    weeks = pd.to_datetime(model.weeks)
+    revenue.index = pd.to_datetime(revenue.index)
+    revenue = revenue.reindex(weeks, fill_value=0)
+    share = revenue.to_numpy(dtype=float)
+    totals = share.sum(axis=1, keepdims=True)
+    share = np.divide(share, totals, out=np.zeros_like(share), where=totals > 0)
+
+    media = model.contributions(model.spend)  # weeks x channels
+    parts = np.column_stack([model.revenue - media.sum(axis=1), media])
+    curves = response_curves(model)
+    return MediaContributions({
+        "weeks": weeks.to_numpy(dtype="datetime64[D]"),
+        "regions": np.array([str(region) for region in revenue.columns]),
+        "channels": np.array(model.channels),
+        "values": (share[:, :, None] * parts[:, None, :]).astype(np.float32),
+        "curve_spend": curves.spend[::CURVE_STRIDE].astype(np.float32),
+        "curve_revenue": curves.revenue[:, ::CURVE_STRIDE].astype(np.float32),
+        "current_spend": curves.current.astype(np.float32),
+    })
+
+
+def contributions_path(data_path, version):
+    return os.path.join(MODEL_DIR, f"contributions-{dataset_key(data_path)}-r{MODEL_REVISION}-{version}.npz")
+
+
+def load_contributions(engine, data_path, version, media_mix):
+    """Contributions of a data file's version: read from disk, or built from the model once media_mix (its future) resolves."""
+    path = contributions_path(data_path, version)
+    if os.path.exists(path):
+        return MediaContributions.load(path)
+    model, _ = media_mix.result()
+    contributions = build_contributions(engine, model)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    contributions.save(path)
+    prune_versions(os.path.join(MODEL_DIR, f"contributions-{dataset_key(data_path)}-*.npz"), path)
+    return contributions
@@ -0,0 +1,69 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS
+from shared.prefix_sums import PREFIX_COLUMNS
+
+# --- Click-to-cross-filter ---
+# A value clicked in one chart (e.g. a region bar) narrows every other chart
+# to it, without going back to the raw rows. Revenue breakdowns are sliced
+# from the prefix sums, where the extra value only drops segment
+# combinations. Other charts add the clicked values to their Aggregate's
+# where and ask the selection's engine again (the pandas backend keeps one
+# bitmap per clicked value, see shared.query_engine.value_bitmap).
+REVENUE_SUM = {"revenue_total": ("revenue_total", "sum")}
+
+
+def _from_prefix_sums(spec):
+    # Revenue by one segment column, optionally per week
+    if spec.metrics != REVENUE_SUM or spec.where:
+        return False
+    keys = [col for col in spec.group_by if col != "week"]
+    return len(keys) == 1 and keys[0] in SEGMENT_COLUMNS and len(spec.group_by) <= 2
+
+
+def prefix_sums_aggregate(prefix_sums, filters, spec):
+    by = next(col for col in spec.group_by if col != "week")
+    groups, collapsed = prefix_sums.collapse(filters, by=by)
+    lo, hi = prefix_sums.bounds(*filters["week"])
+    rows, revenue = PREFIX_COLUMNS.index("rows"), PREFIX_COLUMNS.index("revenue_total")
+    if "week" not in spec.group_by:
+        kept = collapsed[:, hi, rows] > collapsed[:, lo, rows]
+        result = pd.DataFrame({
+            by: np.array(groups, dtype=object)[kept],
+            "revenue_total": (collapsed[:, hi, revenue] - collapsed[:, lo, revenue])[kept],
+        })
+    else:
+        weekly = np.diff(collapsed[:, lo:hi + 1], axis=1)
+        group_index, week_index = np.nonzero(weekly[:, :, rows])
+        result = pd.DataFrame({
+            "week": pd.to_datetime(prefix_sums.weeks[lo + week_index]),
+            by: np.array(groups, dtype=object)[group_index],
+            "revenue_total": weekly[group_index, week_index, revenue],
+        }).sort_values(list(spec.group_by), ignore_index=True)
+    if spec.sort_by:
+        result = result.sort_values(spec.sort_by, ascending=spec.ascending, ignore_index=True)
+    return result[list(spec.group_by) + ["revenue_total"]]
+
+
+def cross_filter_aggregates(aggregates, specs, cross, selection, prefix_sums=None, filters=None):
+    """Aggregates with the clicked values of `cross` (column -> value) applied.
+
+    A chart breaking down a clicked column keeps showing all its values, so
+    the click stays visible where it was made.
+    """
+    results = dict(aggregates)
+    for name, spec in specs.items():
+        applied = {col: value for col, value in cross.items() if spec.group_by != (col,)}
+        if not applied:
+            continue
+        if prefix_sums is not None and _from_prefix_sums(spec):
+            narrowed = dict(filters)
+            for col, value in applied.items():
+                narrowed[col] = [value] if value in filters[col] else []
+            results[name] = prefix_sums_aggregate(prefix_sums, narrowed, spec)
+        else:
+            results[name] = selection.aggregate(dataclasses.replace(spec, where={**spec.where, **applied}))
+    return results
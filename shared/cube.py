@@ -0,0 +1,55 @@
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS, dataset_key, prune_versions
+from shared.prefix_sums import PREFIX_COLUMNS
+
+# --- Aggregate cube for the browser ---
+# The cross-filter explorer (tabs/explorer_tab.py) filters, cross-highlights
+# and recomputes KPIs client-side from the non-empty week x segment
+# combination cells of the prefix sums. The cells go to one binary file per
+# data file and version, zlib-compressed, laid out as whole columns:
+#   float64 metrics [metric][cell], uint16 week index [cell],
+#   uint16 value code per segment column [column][cell]
+# The file sits in the component's directory, which Streamlit serves as
+# static content, so the browser downloads it once and caches it.
+CUBE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "components", "cross_filter", "cubes")
+
+# Larger cubes are not shipped; the explorer asks to narrow the data instead
+MAX_CUBE_CELLS = 250_000
+
+
+def cube_cells(prefix_sums):
+    # Per-week totals of every combination, keeping the non-empty cells
+    values = np.diff(prefix_sums.prefix, axis=1)
+    combo_index, week_index = np.nonzero(values[:, :, PREFIX_COLUMNS.index("rows")])
+    return combo_index, week_index, values[combo_index, week_index]
+
+
+def write_cube(prefix_sums, data_path, version):
+    """Write the cube file of a data file's version; returns its metadata for the component, or None when too large."""
+    combo_index, week_index, metrics = cube_cells(prefix_sums)
+    if len(combo_index) > MAX_CUBE_CELLS:
+        return None
+    parts = [np.ascontiguousarray(metrics.T, dtype="<f8").tobytes(), week_index.astype("<u2").tobytes()]
+    parts += [prefix_sums.combo_codes[col][combo_index].astype("<u2").tobytes() for col in SEGMENT_COLUMNS]
+    file_name = f"cube-{dataset_key(data_path)}-{version}.bin"
+    os.makedirs(CUBE_DIR, exist_ok=True)
+    path = os.path.join(CUBE_DIR, file_name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(b"".join(parts), 6))
+        os.replace(tmp_path, path)
+    prune_versions(os.path.join(CUBE_DIR, f"cube-{dataset_key(data_path)}-*.bin"), path)
+    return {
+        "file": f"cubes/{file_name}",
+        "cells": int(len(combo_index)),
+        "bytes": os.path.getsize(path),
+        "weeks": [pd.Timestamp(week).strftime("%Y-%m-%d") for week in prefix_sums.weeks],
+        "metrics": PREFIX_COLUMNS,
+        "dimensions": {col: [str(value) for value in prefix_sums.domains[col]] for col in SEGMENT_COLUMNS},
+    }
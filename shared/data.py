@@ -0,0 +1,63 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+# DASHBOARD_DATA points the app at another CSV/Parquet file (e.g. generated test data)
+DATA_PATH = os.environ.get("DASHBOARD_DATA", "logistics_mmm_extended_data.csv")
+
+# Segment columns driving the sidebar multiselects and the correlation heatmap
+SEGMENT_COLUMNS = [
+    'region', 'customer_type', 'delivery_mode', 'package_weight_class',
+    'service_channel', 'account_type', 'customer_tier'
+]
+
+def data_version(path=DATA_PATH):
+    # Changes whenever the data file is replaced, so cached engines and views refresh
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+# --- Files derived from a data version ---
+# Cubes and models are saved per data version in directories shared by every
+# app running from this checkout, whatever DASHBOARD_DATA points at. Their
+# names carry the data file's key, and pruning only touches the same file's
+# older versions, keeping the newest of those for sessions still using them.
+KEEP_STALE_VERSIONS = 1
+
+def dataset_key(path=DATA_PATH):
+    return hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+def prune_versions(pattern, current):
+    """Remove the files matching `pattern` (one data file's versions) but `current` and the newest stale ones."""
+    stale = sorted((path for path in glob.glob(pattern) if path != current), key=_mtime, reverse=True)
+    for path in stale[KEEP_STALE_VERSIONS:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# --- Load Data ---
+def load_data(path=DATA_PATH):
+    if str(path).endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df['week'] = pd.to_datetime(df['week'])
+    return add_derived_metrics(df)
+
+# --- Derived Metrics ---
+def add_derived_metrics(df):
+    df["profit"] = (df["revenue_total"] * df["profit_margin"] / 100).round(2)
+    df["revenue_per_order"] = (df["revenue_total"] / df["order_count"]).round(2)
+    df["profit_per_order"] = (df["profit"] / df["order_count"]).round(2)
+    df["cpc"] = (df["campaign_cost"] / df["leads_generated"]).round(2)
+    df["roas"] = ((df["conversions"] * df["avg_transaction_value"]) / df["campaign_cost"]).round(2)
+    df["conversion_rate"] = (df["conversions"] / df["leads_generated"]).round(3)
+    return df
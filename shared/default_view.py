@@ -0,0 +1,40 @@
+from shared.data import SEGMENT_COLUMNS
+from shared.executor import PrefetchedSelection, completed, prefetch
+from shared.filters import build_filters, filter_hash
+
+# --- Materialized default view ---
+# Every session lands on the same state after login: full date range and
+# every value of every multiselect, which is also the most expensive one to
+# compute. Its aggregates (charts, insights, correlation) are computed once
+# per engine and data version and served to every session that has not
+# narrowed the filters. Exports are built on request, like any other view.
+def default_filters(engine):
+    segments = {col: list(engine.distinct(col)) for col in SEGMENT_COLUMNS}
+    return build_filters(list(engine.date_bounds()), **segments)
+
+
+class DefaultView:
+    def __init__(self, filters, selection, specs, results):
+        self.filters = filters
+        self.filter_hash = filter_hash(filters)
+        self.selection = selection
+        self.specs = specs
+        self.results = results
+
+    def matches(self, filters):
+        return filter_hash(filters) == self.filter_hash
+
+    def prefetched(self):
+        # A fresh wrapper per rerun around the shared, already-computed results
+        view = PrefetchedSelection(self.selection)
+        for name, spec in self.specs.items():
+            view.attach_aggregate(name, spec, completed(self.results[name]))
+        return view
+
+
+def materialize_default_view(engine, specs):
+    filters = default_filters(engine)
+    selection = engine.select(filters)
+    prefetched = prefetch(selection, specs)
+    results = {name: future.result()[0] for name, (_, future) in prefetched.submitted_aggregates()}
+    return DefaultView(filters, selection, specs, results)
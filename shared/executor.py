@@ -0,0 +1,238 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import spawn
+
+from shared.filters import filter_changes
+from shared.profiling import profile_stage
+
+# --- Parallel chart aggregation ---
+# As soon as the filtered selection exists, main_app.py submits every chart
+# aggregation of every tab to one thread pool shared by all sessions. pandas/NumPy, DuckDB and Polars release the GIL
+# for most of that work, so the jobs run on several cores while the script
+# thread renders; the tabs then read the finished results through the
+# usual selection.aggregate_many(...) call.
+AGGREGATION_THREADS = int(os.environ.get("DASHBOARD_AGGREGATION_THREADS", os.cpu_count() or 1))
+
+_thread_pool = ThreadPoolExecutor(max_workers=AGGREGATION_THREADS, thread_name_prefix="aggregate")
+
+# Slow jobs that mostly wait (model fits, exports waiting on the process
+# pool) get threads of their own, so chart aggregations never queue behind them
+BACKGROUND_THREADS = int(os.environ.get("DASHBOARD_BACKGROUND_THREADS", 4))
+
+_background_pool = ThreadPoolExecutor(max_workers=BACKGROUND_THREADS, thread_name_prefix="background")
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - start) * 1000, 3)
+
+
+class PrefetchedSelection:
+    """A selection whose aggregates are already being computed in the thread pool.
+
+    Behaves like the wrapped selection; aggregate_many returns the submitted
+    results for specs it knows and computes anything else inline.
+    """
+
+    def __init__(self, selection):
+        self.selection = selection
+        self._aggregates = {}
+
+    def __getattr__(self, name):
+        return getattr(self.selection, name)
+
+    @property
+    def row_count(self):
+        return self.selection.row_count
+
+    def to_pandas(self, columns=None):
+        return self.selection.to_pandas(columns)
+
+    def submit_aggregates(self, specs):
+        for name, spec in specs.items():
+            future = _thread_pool.submit(_timed, self.selection.aggregate, spec)
+            self._aggregates[name] = (spec, future)
+
+    def attach_aggregate(self, name, spec, future):
+        self._aggregates[name] = (spec, future)
+
+    def submitted_aggregates(self):
+        return list(self._aggregates.items())
+
+    def _wait(self, name, future):
+        with profile_stage(f"aggregate:{name}", rows_in=self.row_count) as stage:
+            result, compute_ms = future.result()
+            stage["attributes"].update(prefetched=True, compute_ms=compute_ms)
+            if hasattr(result, "__len__"):
+                stage["rows_out"] = len(result)
+        return result
+
+    def aggregate(self, spec):
+        return self.selection.aggregate(spec)
+
+    def aggregate_many(self, specs):
+        results = {}
+        missing = {}
+        for name, spec in specs.items():
+            submitted = self._aggregates.get(name)
+            if submitted is not None and submitted[0] == spec:
+                results[name] = self._wait(name, submitted[1])
+            else:
+                missing[name] = spec
+        if missing:
+            results.update(self.selection.aggregate_many(missing))
+        return {name: results[name] for name in specs}
+
+
+def completed(result):
+    # An already-resolved job, for results materialized ahead of time
+    future = Future()
+    future.set_result((result, 0.0))
+    return future
+
+
+def prefetch(selection, specs):
+    """Submit `specs` (name -> Aggregate) to the thread pool."""
+    prefetched = PrefetchedSelection(selection)
+    prefetched.submit_aggregates(specs)
+    return prefetched
+
+
+def background(func, *args):
+    # A job that outlives the rerun (e.g. a model fit); resolves to (result, compute_ms)
+    return _background_pool.submit(_timed, func, *args)
+
+
+# --- Incremental recompute ---
+# Applying new filters only recomputes the aggregates the change can affect.
+# With unchanged filters the previous rerun's results are reused as they are.
+# When every changed dimension was narrowed and is a group key of the chart,
+# the previous result is cut down to the remaining groups instead of going
+# back to the rows. Everything else is recomputed from the selection.
+def restrict_groups(result, filters, dims):
+    mask = None
+    for dim in dims:
+        if dim == "week":
+            start_date, end_date = filters["week"]
+            week = result["week"].astype("datetime64[ns]")
+            dim_mask = (week >= start_date) & (week <= end_date)
+        else:
+            dim_mask = result[dim].isin(filters[dim])
+        mask = dim_mask if mask is None else mask & dim_mask
+    return result if mask is None else result[mask].reset_index(drop=True)
+
+
+def _restricted(future, filters, dims):
+    result, _ = future.result()
+    return restrict_groups(result, filters, dims)
+
+
+def prefetch_changed(selection, specs, filters, previous=None):
+    """prefetch(selection, specs) reusing what it can of `previous`.
+
+    previous is (filters, PrefetchedSelection) of the last applied filters.
+    Returns the PrefetchedSelection and {"reused"|"restricted"|"computed": [names]}.
+    """
+    prefetched = PrefetchedSelection(selection)
+    plan = {"reused": [], "restricted": [], "computed": []}
+    changes, submitted = None, {}
+    if previous is not None:
+        changes = filter_changes(previous[0], filters)
+        submitted = dict(previous[1].submitted_aggregates())
+    for name, spec in specs.items():
+        prev_spec, future = submitted.get(name, (None, None))
+        usable = prev_spec == spec and not (future.done() and future.exception() is not None)
+        if usable and not changes:
+            prefetched.attach_aggregate(name, spec, future)
+            plan["reused"].append(name)
+        elif usable and all(kind == "narrowed" and dim in spec.group_by for dim, kind in changes.items()):
+            # Earlier submission: this waits on a job ahead of it in the pool queue
+            restricted = _thread_pool.submit(_timed, _restricted, future, filters, list(changes))
+            prefetched.attach_aggregate(name, spec, restricted)
+            plan["restricted"].append(name)
+        else:
+            prefetched.submit_aggregates({name: spec})
+            plan["computed"].append(name)
+    return prefetched, plan
+
+
+# --- Process pool for CPU-heavy jobs ---
+# The media mix fit and PowerPoint generation hold the GIL, so they run in a
+# small pool of worker processes instead. Their inputs are small (weekly
+# totals, KPI figures and a few preview rows) and are pickled to the worker.
+PROCESS_WORKERS = int(os.environ.get("DASHBOARD_PROCESS_WORKERS", min(4, os.cpu_count() or 1)))
+
+# spawn: forking the threaded Streamlit server is not safe. A spawned process
+# re-runs the parent's __main__ on startup, which under Streamlit is the page
+# script; the pool's workers only need the importable modules their jobs live
+# in, so they are started without it.
+WORKER_NAME = "dashboard-worker"
+
+
+class _WorkerProcess(multiprocessing.context.SpawnProcess):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = f"{WORKER_NAME}-{self.name}"
+
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    Process = _WorkerProcess
+
+
+_preparation_data = spawn.get_preparation_data
+
+
+def _worker_preparation_data(name):
+    data = _preparation_data(name)
+    if name.startswith(WORKER_NAME):
+        data.pop("init_main_from_path", None)
+        data.pop("init_main_from_name", None)
+    return data
+
+
+spawn.get_preparation_data = _worker_preparation_data
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS, mp_context=_WorkerContext())
+            # Each submit with no idle worker starts one more: start them all now
+            for _ in range(PROCESS_WORKERS):
+                pool.submit(os.getpid)
+            _process_pool = pool
+    return _process_pool
+
+
+def _discard_process_pool(pool):
+    # A worker died (killed, out of memory): the executor refuses every later
+    # submit, so the next process_pool() call starts a fresh one
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_process(func, *args):
+    """Submit func(*args) to the process pool for small, picklable arguments; resolves to (result, compute_ms).
+
+    It holds no thread while the worker runs, so background() jobs can wait on it.
+    A job running when a worker dies fails with BrokenProcessPool; the next call
+    gets a new pool.
+    """
+    pool = process_pool()
+    try:
+        return pool.submit(_timed, func, *args)
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        return process_pool().submit(_timed, func, *args)
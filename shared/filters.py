@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS
+
+# --- Sidebar filter state ---
+# Filters are a plain dict: "week" holds the (start, end) timestamps and every
+# segment column holds the list of selected values.
+def build_filters(date_range, **segments):
+    filters = {"week": (pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]))}
+    for col in SEGMENT_COLUMNS:
+        filters[col] = list(segments.get(col, []))
+    return filters
+
+def restricted_filters(filters, domains, date_bounds):
+    # Drop the dimensions that keep every row: a date range covering the data
+    # and segments with every value of their (null-free) domain selected
+    restricted = {}
+    start_date, end_date = filters["week"]
+    if start_date > date_bounds[0] or end_date < date_bounds[1]:
+        restricted["week"] = filters["week"]
+    for col in SEGMENT_COLUMNS:
+        domain = domains.get(col)
+        if domain is None or not set(domain) <= set(filters[col]):
+            restricted[col] = filters[col]
+    return restricted
+
+def apply_filters(df, filters):
+    # Dimensions missing from filters are unrestricted; with none left the
+    # full frame itself is returned, without a mask or a copy
+    mask = None
+    if "week" in filters:
+        start_date, end_date = filters["week"]
+        mask = (df['week'] >= start_date) & (df['week'] <= end_date)
+    for col in SEGMENT_COLUMNS:
+        if col in filters:
+            col_mask = df[col].isin(filters[col])
+            mask = col_mask if mask is None else mask & col_mask
+    if mask is None:
+        return df
+    return df[mask]
+
+def filter_changes(previous, filters):
+    """Dimension -> "narrowed" or "changed" for every dimension that differs.
+
+    "narrowed" means the new selection keeps a subset of the previous rows
+    along that dimension (a date range inside the previous one, or fewer
+    segment values).
+    """
+    changes = {}
+    (prev_start, prev_end), (start_date, end_date) = previous["week"], filters["week"]
+    if (prev_start, prev_end) != (start_date, end_date):
+        narrowed = start_date >= prev_start and end_date <= prev_end
+        changes["week"] = "narrowed" if narrowed else "changed"
+    for col in SEGMENT_COLUMNS:
+        prev_values, values = set(previous[col]), set(filters[col])
+        if prev_values != values:
+            changes[col] = "narrowed" if values <= prev_values else "changed"
+    return changes
+
+def filter_hash(filters):
+    # Stable short id of a filter state (same selections in any order -> same hash)
+    start_date, end_date = filters["week"]
+    canonical = {"week": [start_date.isoformat(), end_date.isoformat()]}
+    for col in SEGMENT_COLUMNS:
+        canonical[col] = sorted(str(v) for v in filters[col])
+    return hashlib.sha1(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()[:16]
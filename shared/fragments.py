@@ -0,0 +1,39 @@
+import functools
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from shared.profiling import current_profiler, profile_stage, start_profiling
+from shared.tracing import export_rerun
+
+# --- Partial reruns ---
+# Chart panels with controls of their own (e.g. the revenue time grain) run
+# as st.fragment: changing such a control reruns only that panel, with the
+# arguments of the last full run, instead of load, filter and every tab.
+# A partial rerun gets a profiler of its own and is traced like a full
+# rerun, with a "fragment" attribute naming the panel.
+def partial_rerun():
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def fragment(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if not partial_rerun():
+                with profile_stage(f"fragment:{name}"):
+                    return func(*args, **kwargs)
+            profiler = start_profiling(current_profiler().enabled)
+            with profiler.stage(f"fragment:{name}"):
+                result = func(*args, **kwargs)
+            ctx = get_script_run_ctx()
+            export_rerun(profiler, {
+                "fragment": name,
+                "session.id": ctx.session_id,
+                "user": st.session_state.get("username"),
+                "profiling": profiler.enabled,
+            })
+            return result
+        return st.fragment(run)
+    return decorate
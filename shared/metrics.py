@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from shared.data import SEGMENT_COLUMNS
+from shared.profiling import add_stage_listener
+
+# Local scrape endpoint; DASHBOARD_METRICS_PORT=0 turns it off
+METRICS_PORT = int(os.environ.get("DASHBOARD_METRICS_PORT", "9108"))
+SESSION_WINDOW_SECONDS = 300
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60)
+
+RERUN_SECONDS = Histogram(
+    "dashboard_rerun_duration_seconds", "Full main_app.py script run time", ["engine"],
+    buckets=LATENCY_BUCKETS
+)
+TAB_SECONDS = Histogram(
+    "dashboard_tab_render_seconds", "Time spent rendering each dashboard tab", ["tab"],
+    buckets=LATENCY_BUCKETS
+)
+EXPORT_SECONDS = Histogram(
+    "dashboard_export_duration_seconds", "Time spent building CSV/PPT exports", ["format"],
+    buckets=LATENCY_BUCKETS
+)
+FILTER_ROWS = Histogram(
+    "dashboard_filter_rows", "Rows left after the sidebar filter",
+    buckets=(0, 10, 100, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+)
+FILTER_VALUES = Histogram(
+    "dashboard_filter_selected_values", "Number of values selected per filter dimension", ["dimension"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21)
+)
+FIRST_PAINT_SECONDS = Histogram(
+    "dashboard_first_paint_seconds", "First full dashboard render of a session after login", ["view"],
+    buckets=LATENCY_BUCKETS
+)
+CACHE_REQUESTS = Counter("dashboard_cache_requests_total", "Cache lookups", ["cache"])
+CACHE_MISSES = Counter("dashboard_cache_misses_total", "Cache lookups that had to compute", ["cache"])
+ACTIVE_SESSIONS = Gauge(
+    "dashboard_active_sessions", f"Sessions with a rerun in the last {SESSION_WINDOW_SECONDS}s"
+)
+
+_server_lock = threading.Lock()
+_server_started = False
+_session_last_seen = {}
+_cache_state = threading.local()
+
+
+def start_metrics_server(port=METRICS_PORT):
+    global _server_started
+    with _server_lock:
+        if _server_started or not port:
+            return
+        _server_started = True
+        try:
+            start_http_server(port)
+        except OSError:
+            # Another dashboard process on this host already serves the port
+            pass
+
+
+# --- Recording helpers ---
+# Wrap a call to a cached function in cache_lookup(...) and call
+# record_cache_miss(...) inside the cached body: the yielded dict tells the
+# caller whether the call was served from cache.
+@contextmanager
+def cache_lookup(cache):
+    CACHE_REQUESTS.labels(cache).inc()
+    previous = getattr(_cache_state, "missed", False)
+    _cache_state.missed = False
+    lookup = {"cache": cache, "hit": None}
+    try:
+        yield lookup
+        lookup["hit"] = not _cache_state.missed
+    finally:
+        _cache_state.missed = previous
+
+
+def record_cache_miss(cache):
+    CACHE_MISSES.labels(cache).inc()
+    _cache_state.missed = True
+
+
+def record_filters(filters, rows):
+    FILTER_ROWS.observe(rows)
+    for col in SEGMENT_COLUMNS:
+        FILTER_VALUES.labels(col).observe(len(filters[col]))
+
+
+def record_rerun(engine_name, seconds):
+    RERUN_SECONDS.labels(engine_name).observe(seconds)
+
+
+def record_first_paint(view, seconds):
+    FIRST_PAINT_SECONDS.labels(view).observe(seconds)
+
+
+def record_export(kind, seconds):
+    # Called where an export's bytes are built, once per file the user asked for
+    EXPORT_SECONDS.labels(kind).observe(seconds)
+
+
+def record_session(session_id):
+    now = time.time()
+    _session_last_seen[session_id] = now
+    for sid, seen in list(_session_last_seen.items()):
+        if now - seen > SESSION_WINDOW_SECONDS:
+            _session_last_seen.pop(sid, None)
+    ACTIVE_SESSIONS.set(len(_session_last_seen))
+
+
+def _observe_stage(record):
+    name = record["stage"]
+    seconds = record["duration_ms"] / 1000
+    if name.startswith("tab:"):
+        TAB_SECONDS.labels(name[len("tab:"):]).observe(seconds)
+
+
+add_stage_listener(_observe_stage)
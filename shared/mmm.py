@@ -0,0 +1,223 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS, dataset_key, prune_versions
+from shared.executor import run_in_process
+from shared.query_engine import Aggregate
+from shared.transforms import geometric_adstock, hill
+
+# --- Media mix model ---
+# Weekly revenue_total regressed on the paid media spend columns, each
+# carried over by geometric adstock and saturated by a Hill curve, plus the
+# week-level controls. Every channel is transformed for the whole parameter
+# grid at once as one (params x weeks x channels) array; the parameters of
+# each channel are then picked by coordinate search on a holdout of the last
+# weeks, with ridge fits batched over the grid and the penalties.
+MEDIA_CHANNELS = [
+    'tv_spend', 'meta_spend', 'youtube_spend', 'google_search_spend',
+    'affiliate_spend', 'influencer_spend', 'app_install_campaign_spend'
+]
+CONTROL_COLUMNS = [
+    'fuel_price_index', 'rainfall_index', 'holiday_flag', 'covid_wave_dummy',
+    'price_discount_index', 'competitor_spend_index'
+]
+
+# Spend and controls repeat on every row of a week, so their weekly value is the mean
+WEEKLY_SPEC = Aggregate("week", {
+    "revenue_total": ("revenue_total", "sum"),
+    **{col: (col, "mean") for col in MEDIA_CHANNELS + CONTROL_COLUMNS},
+}, sort_by="week")
+
+DECAYS = (0.0, 0.2, 0.4, 0.6, 0.8)
+# Half-saturation points relative to the channel's mean adstocked spend
+HALF_SATURATIONS = (0.5, 1.0, 2.0, 4.0)
+HILL_SHAPES = (1.0, 2.0)
+PARAM_GRID = np.array(list(itertools.product(DECAYS, HALF_SATURATIONS, HILL_SHAPES)))
+# Ridge penalties on standardized columns
+ALPHAS = np.array([0.3, 3.0, 30.0])
+HOLDOUT_SHARE = 0.2
+SEARCH_SWEEPS = 2
+
+# Bumped whenever the model or its grid changes, so saved models are refitted
+MODEL_REVISION = 2
+MODEL_DIR = os.environ.get(
+    "DASHBOARD_MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+)
+
+
+# --- Transforms ---
+def transform_grid(spend, grid=PARAM_GRID):
+    # Adstock once per distinct decay, then saturate for every grid point
+    decays, decay_index = np.unique(grid[:, 0], return_inverse=True)
+    adstocked = geometric_adstock(spend, decays)[decay_index]
+    scale = adstocked.mean(axis=1, keepdims=True)
+    half = grid[:, 1, None, None] * np.where(scale > 0, scale, 1)
+    return hill(adstocked, half, grid[:, 2, None, None]), half[:, 0, :]
+
+
+# --- Ridge regression, batched over leading axes ---
+def ridge(X, y, alphas):
+    """Coefficients and intercepts of y ~ X for every alpha and every leading index of X.
+
+    X is (..., weeks, k); returns (alphas, ..., k) and (alphas, ...) on the original scale.
+    """
+    x_mean = X.mean(axis=-2, keepdims=True)
+    x_std = X.std(axis=-2, keepdims=True)
+    x_std = np.where(x_std > 0, x_std, 1)
+    Z = (X - x_mean) / x_std
+    y_mean = y.mean()
+    gram = np.swapaxes(Z, -1, -2) @ Z
+    rhs = np.swapaxes(Z, -1, -2) @ (y - y_mean)
+    eye = np.eye(X.shape[-1])
+    gram = gram[None] + np.asarray(alphas)[(slice(None),) + (None,) * gram.ndim] * eye
+    beta = np.linalg.solve(gram, np.broadcast_to(rhs, gram.shape[:-1])[..., None])[..., 0]
+    beta = beta / x_std[..., 0, :]
+    intercept = y_mean - (beta * x_mean[..., 0, :]).sum(axis=-1)
+    return beta, intercept
+
+
+def _design(media, controls):
+    # media: (..., weeks, channels); controls broadcast alongside
+    controls = np.broadcast_to(controls, media.shape[:-1] + controls.shape[-1:])
+    return np.concatenate([media, controls], axis=-1)
+
+
+class MediaMixModel:
+    def __init__(self, arrays):
+        # Plain arrays only: the model pickles back from the process pool and saves as .npz
+        self.arrays = arrays
+        self.channels = [str(col) for col in arrays["channels"]]
+        self.controls = [str(col) for col in arrays["controls"]]
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["arrays"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def media_features(self, spend):
+        adstocked = geometric_adstock(spend, self.decay[None])[0]
+        return hill(adstocked, self.half_saturation, self.shape)
+
+    def contributions(self, spend):
+        """Revenue attributed to each channel per week (weeks x channels)."""
+        return self.media_features(spend) * self.media_coef
+
+    def predict(self, spend, controls):
+        return self.intercept + self.contributions(spend).sum(axis=1) + controls @ self.control_coef
+
+    def channel_summary(self):
+        spend = self.spend.sum(axis=0)
+        contribution = self.contributions(self.spend).sum(axis=0)
+        return pd.DataFrame({
+            "channel": self.channels,
+            "spend": spend,
+            "contribution": contribution,
+            "roi": np.divide(contribution, spend, out=np.zeros_like(spend), where=spend > 0),
+            "decay": self.decay,
+            "half_saturation": self.half_saturation,
+            "shape": self.shape,
+        })
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        # Dtypes rebuilt from their type strings: unpickled datetime64 dtypes carry (empty) metadata
+        np.savez_compressed(tmp_path, **{name: np.asarray(array, dtype=array.dtype.str) for name, array in self.arrays.items()})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+
+# --- Fitting ---
+def weekly_frame(engine):
+    everything = {"week": tuple(engine.date_bounds())}
+    everything.update({col: engine.distinct(col) for col in SEGMENT_COLUMNS})
+    weekly = engine.select(everything).aggregate(WEEKLY_SPEC)
+    return weekly.fillna(0).reset_index(drop=True)
+
+
+def _holdout_error(features, y, train, alphas):
+    # Mean squared holdout error of every (alpha, *leading) fit
+    beta, intercept = ridge(features[..., train, :], y[train], alphas)
+    predicted = np.einsum("...tk,a...k->a...t", features[..., ~train, :], beta) + intercept[..., None]
+    return ((predicted - y[~train]) ** 2).mean(axis=-1)
+
+
+def fit_media_mix(weekly):
+    weekly = weekly.sort_values("week", ignore_index=True)
+    y = weekly["revenue_total"].to_numpy(dtype=float)
+    spend = weekly[MEDIA_CHANNELS].to_numpy(dtype=float)
+    controls = weekly[CONTROL_COLUMNS].to_numpy(dtype=float)
+    weeks, channels = spend.shape
+    train = np.arange(weeks) < int(round(weeks * (1 - HOLDOUT_SHARE)))
+
+    features, half = transform_grid(spend)  # params x weeks x channels
+    chosen = np.full(channels, len(PARAM_GRID) // 2)
+    alpha = ALPHAS[len(ALPHAS) // 2]
+    for _ in range(SEARCH_SWEEPS):
+        for c in range(channels):
+            # Every grid point of channel c, the others at their current choice
+            media = np.broadcast_to(features[chosen, :, np.arange(channels)].T, features.shape).copy()
+            media[:, :, c] = features[:, :, c]
+            errors = _holdout_error(_design(media, controls), y, train, ALPHAS)
+            best_alpha, chosen[c] = np.unravel_index(np.argmin(errors), errors.shape)
+            alpha = ALPHAS[best_alpha]
+    holdout_mse = float(errors.min())
+
+    # Refit on every week; channels with a negative effect are dropped from the model
+    media = features[chosen, :, np.arange(channels)].T
+    active = np.ones(channels, dtype=bool)
+    while True:
+        X = _design(media[:, active], controls)
+        beta, intercept = ridge(X, y, [alpha])
+        beta, intercept = beta[0], float(intercept[0])
+        media_coef = np.zeros(channels)
+        media_coef[active] = beta[:active.sum()]
+        if (media_coef >= 0).all():
+            break
+        active &= media_coef > 0
+    fitted = intercept + X @ beta
+    residual = y - fitted
+    return MediaMixModel({
+        "channels": np.array(MEDIA_CHANNELS),
+        "controls": np.array(CONTROL_COLUMNS),
+        "weeks": weekly["week"].to_numpy(dtype="datetime64[ns]"),
+        "spend": spend,
+        "control_values": controls,
+        "revenue": y,
+        "fitted": fitted,
+        "decay": PARAM_GRID[chosen, 0],
+        "half_saturation": half[chosen, np.arange(channels)],
+        "shape": PARAM_GRID[chosen, 2],
+        "media_coef": media_coef,
+        "control_coef": beta[active.sum():],
+        "intercept": np.array(intercept),
+        "alpha": np.array(alpha),
+        "r2": np.array(1 - (residual ** 2).sum() / ((y - y.mean()) ** 2).sum()),
+        "mape": np.array(np.mean(np.abs(residual) / np.where(y != 0, np.abs(y), 1))),
+        "holdout_rmse": np.array(np.sqrt(holdout_mse)),
+    })
+
+
+# --- Cached per data file and version ---
+def model_path(data_path, version):
+    return os.path.join(MODEL_DIR, f"mmm-{dataset_key(data_path)}-r{MODEL_REVISION}-{version}.npz")
+
+
+def load_media_mix(engine, data_path, version):
+    """The media mix model of a data file's version: read from disk, or fitted in the process pool and saved."""
+    path = model_path(data_path, version)
+    if os.path.exists(path):
+        return MediaMixModel.load(path)
+    # One row per week: small enough to pickle to the worker as it is
+    model, _ = run_in_process(fit_media_mix, weekly_frame(engine)).result()
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    model.save(path)
+    prune_versions(os.path.join(MODEL_DIR, f"mmm-{dataset_key(data_path)}-*.npz"), path)
+    return model
@@ -0,0 +1,153 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from shared.data import SEGMENT_COLUMNS
+from shared.query_engine import Aggregate
+
+# --- Prefix sums over weeks ---
+# The data is reduced once to week x segment-combination totals and kept as
+# cumulative sums along the sorted weeks: prefix[c, i] holds the totals of
+# combination c over the first i weeks. Any date range is then two
+# searchsorted lookups and a subtraction per combination. Segment filters
+# only pick which combinations to add up, and that collapse is cached per
+# segment selection, so dragging the date range never touches rows.
+PREFIX_COLUMNS = [
+    "rows", "revenue_total", "profit", "conversions", "campaign_cost",
+    "repeat_purchase_flag_sum", "repeat_purchase_flag_count",
+    "roas_sum", "roas_count",
+]
+
+SEGMENT_TOTALS = Aggregate(("week", *SEGMENT_COLUMNS), {
+    "rows": ("week", "count"),
+    "revenue_total": ("revenue_total", "sum"),
+    "profit": ("profit", "sum"),
+    "conversions": ("conversions", "sum"),
+    "campaign_cost": ("campaign_cost", "sum"),
+    "repeat_purchase_flag_sum": ("repeat_purchase_flag", "sum"),
+    "repeat_purchase_flag_count": ("repeat_purchase_flag", "count"),
+    "roas_sum": ("roas", "sum"),
+    "roas_count": ("roas", "count"),
+})
+
+MAX_CACHED_SELECTIONS = 64
+
+
+def week_values(value):
+    return pd.Timestamp(value).to_datetime64().astype("datetime64[ns]").astype(np.int64)
+
+
+class PrefixSums:
+    def __init__(self, totals):
+        week = totals["week"].astype("datetime64[ns]")
+        self.weeks, week_index = np.unique(week.to_numpy().astype(np.int64), return_inverse=True)
+        # Mixed-radix id of each row's segment combination
+        combo_ids = np.zeros(len(totals), dtype=np.int64)
+        radices = []
+        self.domains = {}
+        for col in SEGMENT_COLUMNS:
+            col_codes, uniques = pd.factorize(totals[col], sort=True)
+            combo_ids = combo_ids * len(uniques) + col_codes
+            radices.append(len(uniques))
+            self.domains[col] = list(uniques)
+        combos, combo_index = np.unique(combo_ids, return_inverse=True)
+        prefix = np.zeros((len(combos), len(self.weeks) + 1, len(PREFIX_COLUMNS)))
+        # combination -> code of its value in each segment column
+        self.combo_codes = {}
+        for col, radix in zip(reversed(SEGMENT_COLUMNS), reversed(radices)):
+            combos, self.combo_codes[col] = np.divmod(combos, radix)
+        values = totals[PREFIX_COLUMNS].to_numpy(dtype=float, na_value=0.0)
+        # The totals are grouped by week and combination, so every cell is set once
+        prefix[combo_index, week_index + 1] = values
+        self.prefix = np.cumsum(prefix, axis=1, out=prefix)
+        self._collapsed = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self.prefix.nbytes
+
+    def bounds(self, start, end):
+        # Prefix positions: weeks lo..hi-1 fall within start..end
+        lo = np.searchsorted(self.weeks, week_values(start), side="left")
+        hi = np.searchsorted(self.weeks, week_values(end), side="right")
+        return lo, max(lo, hi)
+
+    def selected_combos(self, col, values):
+        # Whether each combination's value of col is among values
+        domain = self.domains[col]
+        selected = np.isin(np.arange(len(domain)), [domain.index(v) for v in values if v in domain])
+        return selected[self.combo_codes[col]]
+
+    def combo_mask(self, filters):
+        mask = np.ones(len(self.prefix), dtype=bool)
+        if filters is None:
+            return mask
+        for col in SEGMENT_COLUMNS:
+            mask &= self.selected_combos(col, filters[col])
+        return mask
+
+    def collapse(self, filters=None, by="region"):
+        """Prefix sums of the selected combinations, summed per value of `by`.
+
+        Returns (values of `by`, array of shape (len(values), weeks + 1, metrics)).
+        """
+        key = (by, None if filters is None else tuple(tuple(sorted(map(str, filters[col]))) for col in SEGMENT_COLUMNS))
+        with self._lock:
+            cached = self._collapsed.get(key)
+        if cached is not None:
+            return cached
+        mask = self.combo_mask(filters)
+        codes = self.combo_codes[by]
+        groups, collapsed = [], []
+        for code, group in enumerate(self.domains[by]):
+            selected = mask & (codes == code)
+            if selected.any():
+                groups.append(group)
+                collapsed.append(self.prefix[selected].sum(axis=0))
+        shape = (len(groups),) + self.prefix.shape[1:]
+        result = (groups, np.array(collapsed).reshape(shape))
+        with self._lock:
+            if len(self._collapsed) >= MAX_CACHED_SELECTIONS:
+                self._collapsed.pop(next(iter(self._collapsed)))
+            self._collapsed[key] = result
+        return result
+
+    def range_sums(self, filters=None):
+        """Totals of PREFIX_COLUMNS over the filters' date range and segments (everything without filters)."""
+        _, collapsed = self.collapse(filters)
+        lo, hi = (0, len(self.weeks)) if filters is None else self.bounds(*filters["week"])
+        return pd.Series((collapsed[:, hi] - collapsed[:, lo]).sum(axis=0), index=PREFIX_COLUMNS)
+
+    def facets(self, filters, columns=("rows", "revenue_total")):
+        """Faceted totals: per value of each segment column, the totals it keeps
+        under the date range and the other columns' filters.
+
+        Returns column -> DataFrame indexed by the column's values. One range
+        sum per combination, then one weighted bincount per column.
+        """
+        lo, hi = self.bounds(*filters["week"])
+        metrics = [PREFIX_COLUMNS.index(col) for col in columns]
+        totals = self.prefix[:, hi][:, metrics] - self.prefix[:, lo][:, metrics]
+        excluded = {col: ~self.selected_combos(col, filters[col]) for col in SEGMENT_COLUMNS}
+        # Filters failed per combination; a combination counts for col's facet
+        # when col is the only filter it fails, or none
+        failed = sum(excluded.values())
+        facets = {}
+        for col in SEGMENT_COLUMNS:
+            kept = failed == excluded[col]
+            codes = self.combo_codes[col][kept]
+            counts = np.column_stack([
+                np.bincount(codes, weights=totals[kept, i], minlength=len(self.domains[col]))
+                for i in range(len(metrics))
+            ])
+            facets[col] = pd.DataFrame(counts, index=self.domains[col], columns=list(columns))
+        return facets
+
+
+def build_prefix_sums(engine):
+    # All dates and every segment value: the raw totals of the whole dataset
+    everything = {"week": tuple(engine.date_bounds())}
+    everything.update({col: engine.distinct(col) for col in SEGMENT_COLUMNS})
+    return PrefixSums(engine.select(everything).aggregate(SEGMENT_TOTALS))
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# --- Per-rerun profiling ---
+# main_app.py starts a Profiler on every rerun (enabled from the sidebar
+# toggle or ?profile=1). Code anywhere in the app wraps its work in
+# profile_stage(...) and charts go through plotly_chart(...), which are
+# no-ops apart from the timing when profiling is off. Stages are always
+# recorded with span/parent ids so stage listeners (metrics) and the rerun
+# trace see them either way; `enabled` only controls the overlay and the
+# chart payload measurement.
+STAGE_LISTENERS = []
+
+
+def add_stage_listener(listener):
+    if listener not in STAGE_LISTENERS:
+        STAGE_LISTENERS.append(listener)
+
+
+def new_span_id():
+    return os.urandom(8).hex()
+
+
+class Profiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.started_unix_ns = time.time_ns()
+        self.span_id = new_span_id()
+        self.stages = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = {
+            "stage": name,
+            "depth": len(self._stack),
+            "start_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "duration_ms": None,
+            "rows_in": rows_in,
+            "rows_out": None,
+            "payload_bytes": None,
+            "span_id": new_span_id(),
+            "parent_id": self._stack[-1] if self._stack else self.span_id,
+            "status": "OK",
+            "attributes": {},
+        }
+        self.stages.append(record)
+        self._stack.append(record["span_id"])
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record["status"] = "ERROR"
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._stack.pop()
+            for listener in STAGE_LISTENERS:
+                listener(record)
+
+    @property
+    def total_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def to_json(self):
+        return json.dumps({"total_ms": self.total_ms, "stages": self.stages}, indent=2, default=str)
+
+
+def start_profiling(enabled):
+    profiler = Profiler(enabled)
+    st.session_state["_profiler"] = profiler
+    return profiler
+
+
+def current_profiler():
+    # Outside a Streamlit run (benchmarks, scripts) stages are simply timed and dropped
+    if get_script_run_ctx() is None:
+        return Profiler(enabled=False)
+    return st.session_state.get("_profiler") or Profiler(enabled=False)
+
+
+def profile_stage(name, rows_in=None):
+    return current_profiler().stage(name, rows_in=rows_in)
+
+
+def plotly_chart(fig, name, **kwargs):
+    profiler = current_profiler()
+    with profiler.stage(f"chart:{name}") as stage:
+        if profiler.enabled:
+            stage["payload_bytes"] = len(fig.to_json())
+        return st.plotly_chart(fig, **kwargs)
+
+
+# --- Timing waterfall ---
+def render_profile(profiler):
+    if not profiler.enabled or not profiler.stages:
+        return
+    stages = pd.DataFrame(profiler.stages).drop(columns=["span_id", "parent_id", "attributes"])
+    with st.expander(f"⏱️ Profiling: rerun took {profiler.total_ms:,.0f} ms", expanded=False):
+        labels = [" " * depth + name for depth, name in zip(stages["depth"], stages["stage"])]
+        fig = go.Figure(go.Bar(
+            y=labels,
+            x=stages["duration_ms"],
+            base=stages["start_ms"],
+            orientation="h",
+            marker_color="#5478a6",
+            hovertemplate="%{y}<br>start %{base:.1f} ms<br>%{x:.1f} ms<extra></extra>",
+        ))
+        fig.update_layout(
+            template="plotly_white",
+            height=max(300, 22 * len(stages)),
+            xaxis_title="ms since rerun start",
+            yaxis=dict(autorange="reversed"),
+            margin=dict(l=10, r=10, t=10, b=40),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(stages, use_container_width=True)
+        st.download_button(
+            "📥 Download timings (JSON)",
+            data=profiler.to_json(),
+            file_name="dashboard_profile.json",
+            mime="application/json",
+            key="download-profile"
+        )
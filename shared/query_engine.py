@@ -0,0 +1,441 @@
+import os
+import weakref
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from shared.data import DATA_PATH, SEGMENT_COLUMNS, load_data
+from shared.filters import apply_filters, restricted_filters
+from shared.profiling import profile_stage
+
+# Backends selectable via ?engine=... or the DASHBOARD_ENGINE env var
+ENGINES = ("pandas", "duckdb", "polars")
+DEFAULT_ENGINE = "pandas"
+
+SQL_FUNCTIONS = {"sum": "sum", "mean": "avg", "count": "count"}
+
+
+# --- Aggregate specs ---
+# Tabs describe each chart's breakdown as an Aggregate and let the selected
+# backend compute it. metrics maps output column -> (source column, function)
+# with function one of "sum", "mean", "count"; where holds equality
+# predicates applied on top of the sidebar filters.
+@dataclass(frozen=True)
+class Aggregate:
+    group_by: tuple
+    metrics: dict
+    where: dict = field(default_factory=dict)
+    sort_by: str = None
+    ascending: bool = True
+
+    def __post_init__(self):
+        if isinstance(self.group_by, str):
+            object.__setattr__(self, "group_by", (self.group_by,))
+
+
+def as_selection(data):
+    # Tabs accept either a filtered DataFrame or a backend selection
+    if isinstance(data, pd.DataFrame):
+        return PandasSelection(data)
+    return data
+
+
+# --- pandas backend ---
+# Equality masks of `where` predicates (e.g. cross-filter clicks) are kept
+# per frame, for as long as that frame lives
+_bitmaps = {}
+
+
+def value_bitmap(frame, col, value):
+    # Keyed by the frame's id and dropped with the frame (DataFrames are not hashable)
+    bitmaps = _bitmaps.get(id(frame))
+    if bitmaps is None:
+        bitmaps = _bitmaps[id(frame)] = {}
+        weakref.finalize(frame, _bitmaps.pop, id(frame), None)
+    if (col, value) not in bitmaps:
+        bitmaps[(col, value)] = (frame[col] == value).to_numpy()
+    return bitmaps[(col, value)]
+
+
+def aggregate_frame(df, spec):
+    if spec.where:
+        mask = np.ones(len(df), dtype=bool)
+        for col, value in spec.where.items():
+            mask &= value_bitmap(df, col, value)
+        df = df[mask]
+    named = {out: (col, func) for out, (col, func) in spec.metrics.items()}
+    result = df.groupby(list(spec.group_by)).agg(**named).reset_index()
+    if spec.sort_by:
+        result = result.sort_values(spec.sort_by, ascending=spec.ascending, ignore_index=True)
+    return result
+
+
+def _aggregate_each(selection, specs):
+    # One trace span per chart aggregation
+    results = {}
+    for name, spec in specs.items():
+        with profile_stage(f"aggregate:{name}", rows_in=selection.row_count) as stage:
+            results[name] = selection.aggregate(spec)
+            stage["rows_out"] = len(results[name])
+    return results
+
+
+class PandasSelection:
+    def __init__(self, df):
+        self.df = df
+
+    @property
+    def row_count(self):
+        return len(self.df)
+
+    def to_pandas(self, columns=None):
+        return self.df if columns is None else self.df[columns]
+
+    def head(self, n):
+        return self.df.head(n)
+
+    def aggregate(self, spec):
+        return aggregate_frame(self.df, spec)
+
+    def aggregate_many(self, specs):
+        return _aggregate_each(self, specs)
+
+
+class PandasEngine:
+    name = "pandas"
+
+    def __init__(self, path=DATA_PATH):
+        self.df = load_data(path)
+        self._distinct = {}
+        self._date_bounds = None
+        self._domains = None
+
+    def distinct(self, col):
+        # Sorted and without nulls, like the SQL and Polars backends
+        if col not in self._distinct:
+            self._distinct[col] = sorted(self.df[col].dropna().unique())
+        return self._distinct[col]
+
+    def date_bounds(self):
+        if self._date_bounds is None:
+            self._date_bounds = self.df['week'].min(), self.df['week'].max()
+        return self._date_bounds
+
+    def domains(self):
+        # Segment values that make a dimension unrestricted when all are selected
+        if self._domains is None:
+            self._domains = {
+                col: self.distinct(col) for col in SEGMENT_COLUMNS if not self.df[col].hasnans
+            }
+        return self._domains
+
+    def select(self, filters):
+        # Shares the engine's frame when nothing is restricted: treat selections as read-only
+        filters = restricted_filters(filters, self.domains(), self.date_bounds())
+        return PandasSelection(apply_filters(self.df, filters))
+
+
+# --- DuckDB backend ---
+# Runs the filter and aggregations as SQL: scans are multi-threaded, the
+# sidebar predicates are pushed into the scan and large group-bys spill to
+# temp_directory instead of exhausting RAM. A CSV file is parsed once into an
+# in-memory table (engines are cached per data version); Parquet is columnar
+# already and is queried in place.
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _source_sql(path):
+    path_literal = "'" + str(path).replace("'", "''") + "'"
+    if str(path).endswith(".parquet"):
+        return f"read_parquet({path_literal})"
+    return f"read_csv_auto({path_literal})"
+
+
+def _round(expr, decimals):
+    # Mirror numpy's round (scale, round half-to-even, unscale) so values match pandas exactly
+    scale = f"{10 ** decimals}.0"
+    return f"round_even(({expr}) * {scale}, 0) / {scale}"
+
+
+class DuckDBSelection:
+    def __init__(self, engine, filters):
+        self.engine = engine
+        self.where, self.params = engine.where_clause(filters)
+        self._row_count = None
+
+    def _query(self, sql, params):
+        return self.engine.execute(sql, params).df()
+
+    @property
+    def row_count(self):
+        if self._row_count is None:
+            sql = f"SELECT count(*) FROM dashboard WHERE {self.where}"
+            self._row_count = self.engine.execute(sql, self.params).fetchone()[0]
+        return self._row_count
+
+    def to_pandas(self, columns=None):
+        # Every row of the selection: for exports only, nothing keeps the frame
+        select_list = "*" if columns is None else ", ".join(_quote(col) for col in columns)
+        return self._query(f"SELECT {select_list} FROM dashboard WHERE {self.where}", self.params)
+
+    def head(self, n):
+        return self._query(f"SELECT * FROM dashboard WHERE {self.where} LIMIT {int(n)}", self.params)
+
+    def aggregate(self, spec):
+        keys = [_quote(col) for col in spec.group_by]
+        select_list = keys + [
+            f"{SQL_FUNCTIONS[func]}({_quote(col)}) AS {_quote(out)}"
+            for out, (col, func) in spec.metrics.items()
+        ]
+        clauses = [self.where] + [f"{key} IS NOT NULL" for key in keys]
+        params = list(self.params)
+        for col, value in spec.where.items():
+            clauses.append(f"{_quote(col)} = ?")
+            params.append(value)
+        if spec.sort_by:
+            order_by = f"{_quote(spec.sort_by)} {'ASC' if spec.ascending else 'DESC'}"
+        else:
+            order_by = ", ".join(keys)
+        sql = (
+            f"SELECT {', '.join(select_list)} FROM dashboard "
+            f"WHERE {' AND '.join(clauses)} "
+            f"GROUP BY {', '.join(keys)} ORDER BY {order_by}"
+        )
+        return self._query(sql, params)
+
+    def aggregate_many(self, specs):
+        return _aggregate_each(self, specs)
+
+
+class DuckDBEngine:
+    name = "duckdb"
+
+    def __init__(self, path=DATA_PATH, threads=None, memory_limit=None, temp_directory=None):
+        import duckdb
+
+        # Settings go in as connection config, never spliced into SQL
+        config = {
+            "threads": int(threads or os.cpu_count() or 1),
+            "temp_directory": str(temp_directory or os.environ.get("DUCKDB_TEMP_DIRECTORY", ".duckdb_tmp")),
+        }
+        memory_limit = memory_limit or os.environ.get("DUCKDB_MEMORY_LIMIT")
+        if memory_limit:
+            config["memory_limit"] = str(memory_limit)
+        self.conn = duckdb.connect(config=config)
+        # Same derived metrics as shared.data.add_derived_metrics
+        relation = "VIEW" if str(path).endswith(".parquet") else "TABLE"
+        self.conn.execute(f"""
+            CREATE {relation} dashboard AS
+            WITH src AS (
+                SELECT *, {_round('revenue_total * profit_margin / 100', 2)} AS profit
+                FROM {_source_sql(path)}
+            )
+            SELECT * REPLACE (
+                    CAST(week AS TIMESTAMP) AS week,
+                    {_round('conversions / leads_generated', 3)} AS conversion_rate
+                ),
+                {_round('revenue_total / order_count', 2)} AS revenue_per_order,
+                {_round('profit / order_count', 2)} AS profit_per_order,
+                {_round('campaign_cost / leads_generated', 2)} AS cpc,
+                {_round('(conversions * avg_transaction_value) / campaign_cost', 2)} AS roas
+            FROM src
+        """)
+        self._distinct = {}
+        self._date_bounds = None
+        self._domains = None
+
+    def execute(self, sql, params=()):
+        # A cursor per query: the connection is shared by every session thread
+        return self.conn.cursor().execute(sql, params)
+
+    def distinct(self, col):
+        if col not in self._distinct:
+            sql = f"SELECT DISTINCT {_quote(col)} FROM dashboard WHERE {_quote(col)} IS NOT NULL ORDER BY 1"
+            self._distinct[col] = [row[0] for row in self.execute(sql).fetchall()]
+        return self._distinct[col]
+
+    def date_bounds(self):
+        if self._date_bounds is None:
+            start, end = self.execute("SELECT min(week), max(week) FROM dashboard").fetchone()
+            self._date_bounds = pd.Timestamp(start), pd.Timestamp(end)
+        return self._date_bounds
+
+    def domains(self):
+        # DISTINCT drops NULLs, so only null-free columns count as fully selectable
+        if self._domains is None:
+            null_counts = ", ".join(f"count(*) - count({_quote(col)})" for col in SEGMENT_COLUMNS)
+            nulls = self.execute(f"SELECT {null_counts} FROM dashboard").fetchone()
+            self._domains = {
+                col: self.distinct(col) for col, null_count in zip(SEGMENT_COLUMNS, nulls) if not null_count
+            }
+        return self._domains
+
+    def where_clause(self, filters):
+        filters = restricted_filters(filters, self.domains(), self.date_bounds())
+        clauses = []
+        params = []
+        if "week" in filters:
+            start_date, end_date = filters["week"]
+            clauses.append("week BETWEEN ? AND ?")
+            params += [start_date.to_pydatetime(), end_date.to_pydatetime()]
+        for col in SEGMENT_COLUMNS:
+            if col not in filters:
+                continue
+            values = list(filters[col])
+            if not values:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{_quote(col)} IN ({', '.join(['?'] * len(values))})")
+            params.extend(values)
+        return " AND ".join(clauses) or "TRUE", params
+
+    def select(self, filters):
+        return DuckDBSelection(self, filters)
+
+
+# --- Polars backend ---
+# Every breakdown of a tab becomes a lazy query over the same filtered scan;
+# aggregate_many collects them together with pl.collect_all so the common
+# scan/filter subplan is executed once, multi-threaded, and the results are
+# handed to plotly as Arrow-backed pandas frames without copying buffers.
+POLARS_FUNCTIONS = {"sum": "sum", "mean": "mean", "count": "count"}
+
+
+class PolarsSelection:
+    def __init__(self, engine, filters):
+        import polars as pl
+
+        self.pl = pl
+        predicate = engine.predicate(filters)
+        self.lazy = engine.lazy if predicate is None else engine.lazy.filter(predicate)
+        self._row_count = None
+
+    def _to_pandas(self, frame):
+        # Aggregates feed plotly directly, so keep their Arrow buffers
+        return frame.to_pandas(use_pyarrow_extension_array=True)
+
+    @property
+    def row_count(self):
+        if self._row_count is None:
+            self._row_count = self.lazy.select(self.pl.len()).collect().item()
+        return self._row_count
+
+    def to_pandas(self, columns=None):
+        # Every row of the selection: for exports only, nothing keeps the frame
+        lazy = self.lazy if columns is None else self.lazy.select(columns)
+        return lazy.collect().to_pandas()
+
+    def head(self, n):
+        return self.lazy.head(n).collect().to_pandas()
+
+    def plan(self, spec):
+        pl = self.pl
+        lazy = self.lazy
+        keys = list(spec.group_by)
+        predicates = [pl.col(col).is_not_null() for col in keys]
+        predicates += [pl.col(col) == value for col, value in spec.where.items()]
+        lazy = lazy.filter(pl.all_horizontal(predicates))
+        lazy = lazy.group_by(keys).agg([
+            getattr(pl.col(col), POLARS_FUNCTIONS[func])().alias(out)
+            for out, (col, func) in spec.metrics.items()
+        ])
+        if spec.sort_by:
+            return lazy.sort(spec.sort_by, descending=not spec.ascending)
+        return lazy.sort(keys)
+
+    def aggregate(self, spec):
+        return self._to_pandas(self.plan(spec).collect())
+
+    def aggregate_many(self, specs):
+        names = list(specs)
+        plans = [self.plan(specs[name]) for name in names]
+        if self._row_count is None:
+            plans.append(self.lazy.select(self.pl.len()))
+        with profile_stage("aggregate:collect_all") as stage:
+            frames = self.pl.collect_all(plans)
+            if self._row_count is None:
+                self._row_count = frames.pop().item()
+            stage["rows_in"] = self._row_count
+            stage["attributes"]["queries"] = names
+            return {name: self._to_pandas(frame) for name, frame in zip(names, frames)}
+
+
+class PolarsEngine:
+    name = "polars"
+
+    def __init__(self, path=DATA_PATH):
+        import polars as pl
+
+        self.pl = pl
+        if str(path).endswith(".parquet"):
+            lazy = pl.scan_parquet(path)
+        else:
+            lazy = pl.scan_csv(path, try_parse_dates=True)
+        # Same derived metrics as shared.data.add_derived_metrics
+        self.lazy = lazy.with_columns(
+            pl.col("week").cast(pl.Datetime("ns")),
+            (pl.col("revenue_total") * pl.col("profit_margin") / 100).round(2).alias("profit"),
+        ).with_columns(
+            (pl.col("revenue_total") / pl.col("order_count")).round(2).alias("revenue_per_order"),
+            (pl.col("profit") / pl.col("order_count")).round(2).alias("profit_per_order"),
+            (pl.col("campaign_cost") / pl.col("leads_generated")).round(2).alias("cpc"),
+            ((pl.col("conversions") * pl.col("avg_transaction_value")) / pl.col("campaign_cost")).round(2).alias("roas"),
+            (pl.col("conversions") / pl.col("leads_generated")).round(3).alias("conversion_rate"),
+        )
+        self._distinct = {}
+        self._date_bounds = None
+        self._domains = None
+
+    def distinct(self, col):
+        if col not in self._distinct:
+            values = self.lazy.select(self.pl.col(col).drop_nulls().unique().sort()).collect()
+            self._distinct[col] = values[col].to_list()
+        return self._distinct[col]
+
+    def date_bounds(self):
+        if self._date_bounds is None:
+            bounds = self.lazy.select(
+                self.pl.col("week").min().alias("start"), self.pl.col("week").max().alias("end")
+            ).collect()
+            self._date_bounds = pd.Timestamp(bounds["start"][0]), pd.Timestamp(bounds["end"][0])
+        return self._date_bounds
+
+    def domains(self):
+        # distinct() drops nulls, so only null-free columns count as fully selectable
+        if self._domains is None:
+            nulls = self.lazy.select(self.pl.col(SEGMENT_COLUMNS).null_count()).collect().row(0)
+            self._domains = {
+                col: self.distinct(col) for col, null_count in zip(SEGMENT_COLUMNS, nulls) if not null_count
+            }
+        return self._domains
+
+    def predicate(self, filters):
+        # None when no dimension is restricted
+        pl = self.pl
+        filters = restricted_filters(filters, self.domains(), self.date_bounds())
+        predicates = []
+        if "week" in filters:
+            start_date, end_date = filters["week"]
+            predicates.append(pl.col("week").is_between(start_date.to_pydatetime(), end_date.to_pydatetime()))
+        for col in SEGMENT_COLUMNS:
+            if col in filters:
+                predicates.append(pl.col(col).is_in(list(filters[col])))
+        if not predicates:
+            return None
+        return pl.all_horizontal(predicates)
+
+    def select(self, filters):
+        return PolarsSelection(self, filters)
+
+
+def create_engine(name=None, path=DATA_PATH):
+    name = (name or os.environ.get("DASHBOARD_ENGINE") or DEFAULT_ENGINE).lower()
+    if name == "pandas":
+        return PandasEngine(path)
+    if name == "duckdb":
+        return DuckDBEngine(path)
+    if name == "polars":
+        return PolarsEngine(path)
+    raise ValueError(f"Unknown query engine '{name}', expected one of {', '.join(ENGINES)}")
@@ -0,0 +1,57 @@
+import pandas as pd
+
+# --- Time rollups ---
+# Trend charts aggregate the selection once at week grain (sums plus counts
+# for averaged metrics) and roll that small frame up to month, quarter or
+# year here, so switching grain never goes back to the query engine.
+GRAINS = {
+    "week": None,
+    "month": "M",
+    "quarter": "Q",
+    "year": "Y",
+}
+GRAIN_LABELS = {"week": "Weekly", "month": "Monthly", "quarter": "Quarterly", "year": "Yearly"}
+
+# Coarsest grain that still gives at least this many points is picked automatically
+MIN_POINTS = 20
+
+
+def period_count(start, end, grain):
+    if grain == "week":
+        return (pd.Timestamp(end) - pd.Timestamp(start)).days // 7 + 1
+    return len(pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq=GRAINS[grain]))
+
+
+def auto_grain(start, end, min_points=MIN_POINTS):
+    for grain in reversed(list(GRAINS)):
+        if period_count(start, end, grain) >= min_points:
+            return grain
+    return "week"
+
+
+def period_start(weeks, grain):
+    # Arrow-backed aggregates (polars engine) carry timestamp[pyarrow] weeks
+    weeks = weeks.astype("datetime64[ns]")
+    if grain == "week":
+        return weeks
+    return weeks.dt.to_period(GRAINS[grain]).dt.start_time
+
+
+def rollup(frame, grain, by=(), sums=(), means=None):
+    """Roll a week-grain aggregate up to `grain`.
+
+    `sums` are summed per period; `means` maps output column ->
+    (sum column, count column) and is recomputed from the rolled-up totals,
+    so averages stay row-weighted at every grain.
+    """
+    means = means or {}
+    totals = list(sums) + [col for pair in means.values() for col in pair]
+    keys = ["week", *by]
+    rolled = (
+        frame.assign(week=period_start(frame["week"], grain))
+        .groupby(keys, as_index=False, sort=True)[totals]
+        .sum()
+    )
+    for out, (total, count) in means.items():
+        rolled[out] = rolled[total] / rolled[count]
+    return rolled
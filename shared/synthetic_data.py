@@ -0,0 +1,368 @@
+"""Vectorized synthetic generator for the logistics MMM dataset.
+
+Produces the same columns as logistics_mmm_extended_data.csv for any row
+count: rows are spread evenly over `weeks` weekly periods, segments are
+drawn per row and revenue, orders, delivery outcomes and satisfaction are
+correlated with the segments, seasonality and (adstocked) media spend.
+
+Chunks are generated independently from (seed, chunk index), so output is
+reproducible for a given seed and chunk size whatever the worker count, and
+is streamed to CSV/Parquet with at most 2 * workers chunks in memory.
+
+    python -m shared.synthetic_data --rows 100000000 --workers 8 --output big.parquet
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WEEKS = 156
+DEFAULT_START = '2022-01-01'
+DEFAULT_CHUNK_SIZE = 500_000
+
+COLUMNS = [
+    'week', 'app_downloads', 'weekly_transactions', 'revenue_total', 'repeat_transactions',
+    'intercity_shipments', 'parcel_deliveries', 'avg_transaction_value', 'tv_spend', 'tv_grp',
+    'meta_spend', 'meta_impressions', 'youtube_spend', 'youtube_views', 'google_search_spend',
+    'google_clicks', 'affiliate_spend', 'affiliate_clicks', 'influencer_spend', 'influencer_reach',
+    'app_install_campaign_spend', 'app_install_clicks', 'push_notifications_sent', 'email_sent',
+    'sms_sent', 'website_visits', 'blog_articles_published', 'social_posts', 'price_discount_index',
+    'competitor_spend_index', 'fuel_price_index', 'rainfall_index', 'holiday_flag', 'covid_wave_dummy',
+    'city_expansion_count', 'new_app_version_flag', 'region', 'customer_type', 'order_count',
+    'profit_margin', 'repeat_purchase_flag', 'campaign_id', 'campaign_channel', 'leads_generated',
+    'conversions', 'conversion_rate', 'campaign_cost', 'roi', 'customer_acquisition_cost',
+    'delivery_status', 'actual_delivery_time_hrs', 'estimated_delivery_time_hrs', 'delay_reason',
+    'courier_partner', 'competitor_name', 'market_share_estimate', 'pricing_index',
+    'customer_churn_rate', 'customer_feedback_score', 'complaint_id', 'complaint_type',
+    'resolution_time_hrs', 'customer_satisfaction_score', 'media_channel', 'mentions_count',
+    'sentiment_score', 'engagement_rate', 'incident_id', 'incident_type', 'impact_duration_hrs',
+    'shipment_affected_count', 'delivery_mode', 'package_weight_class', 'service_channel',
+    'account_type', 'customer_tier'
+]
+
+# --- Categorical domains and sampling probabilities ---
+CATEGORIES = {
+    'region': (['North', 'South', 'East', 'West', 'Central'], [0.24, 0.2, 0.2, 0.22, 0.14]),
+    'customer_type': (['B2B', 'B2C'], [0.4, 0.6]),
+    'campaign_channel': (['Digital', 'Print', 'Referral', 'Social', 'Affiliate'], [0.3, 0.1, 0.15, 0.3, 0.15]),
+    'courier_partner': (['Partner_A', 'Partner_B', 'Partner_C'], [0.45, 0.35, 0.2]),
+    'competitor_name': (['Competitor_X', 'Competitor_Y', 'Competitor_Z'], [0.4, 0.35, 0.25]),
+    'complaint_type': (['Delay', 'Lost Parcel', 'Damaged Goods', 'Other'], [0.5, 0.2, 0.2, 0.1]),
+    'media_channel': (['Social Media', 'News', 'Blogs', 'Forums'], [0.4, 0.25, 0.2, 0.15]),
+    'incident_type': (['Connectivity', 'Regulatory', 'Compliance', 'Other'], [0.3, 0.2, 0.2, 0.3]),
+    'delivery_mode': (['Standard', 'Express', 'Same-day', 'Pickup'], [0.45, 0.25, 0.15, 0.15]),
+    'package_weight_class': (['Light', 'Medium', 'Heavy', 'Oversized'], [0.4, 0.3, 0.2, 0.1]),
+    'service_channel': (['App', 'Website', 'Call Center', 'Partner API'], [0.4, 0.3, 0.15, 0.15]),
+    'customer_tier': (['Bronze', 'Silver', 'Gold', 'Platinum'], [0.4, 0.3, 0.2, 0.1]),
+}
+ACCOUNT_TYPES = ['Individual', 'Corporate', 'Government', 'SME']
+# Account type conditioned on customer type (rows: B2B, B2C)
+ACCOUNT_TYPE_GIVEN_CUSTOMER = np.array([
+    [0.05, 0.45, 0.15, 0.35],
+    [0.85, 0.02, 0.01, 0.12],
+])
+DELIVERY_STATUSES = ['On-Time', 'Delayed', 'Failed']
+DELAY_REASONS = ['Traffic', 'Weather', 'Operational', 'Other']
+
+# --- Segment effects on revenue and behaviour (indexed by category code) ---
+REGION_REVENUE = np.array([1.05, 0.95, 1.0, 1.1, 0.85])
+CUSTOMER_TYPE_REVENUE = np.array([1.25, 0.85])
+TIER_REVENUE = np.array([0.85, 1.0, 1.15, 1.35])
+TIER_REPEAT_RATE = np.array([0.3, 0.4, 0.5, 0.62])
+TIER_CHURN = np.array([0.07, 0.05, 0.035, 0.02])
+WEIGHT_TICKET = np.array([0.85, 1.0, 1.2, 1.4])
+MODE_DELAY_RATE = np.array([0.2, 0.12, 0.15, 0.08])
+MODE_HOURS = np.array([[24, 72], [12, 30], [4, 12], [12, 48]])
+CHANNEL_CONVERSION = np.array([0.35, 0.2, 0.5, 0.3, 0.4])
+CHANNEL_COST_PER_LEAD = np.array([30.0, 45.0, 20.0, 28.0, 25.0])
+
+# Weekly paid media: (spend low, spend high, revenue lift per unit of adstocked spend, adstock decay)
+MEDIA = {
+    'tv_spend': (5, 25, 0.004, 0.6),
+    'meta_spend': (3, 15, 0.006, 0.3),
+    'youtube_spend': (2, 12, 0.005, 0.4),
+    'google_search_spend': (4, 20, 0.007, 0.1),
+    'affiliate_spend': (1, 10, 0.004, 0.2),
+    'influencer_spend': (0.5, 5, 0.008, 0.3),
+    'app_install_campaign_spend': (2, 10, 0.003, 0.2),
+}
+# Engagement metric for each spend column: (column, low, high multiplier per unit spend)
+MEDIA_ENGAGEMENT = {
+    'tv_spend': ('tv_grp', 1.5, 3.0),
+    'meta_spend': ('meta_impressions', 100000, 300000),
+    'youtube_spend': ('youtube_views', 80000, 250000),
+    'google_search_spend': ('google_clicks', 5000, 15000),
+    'affiliate_spend': ('affiliate_clicks', 2000, 8000),
+    'influencer_spend': ('influencer_reach', 10000, 50000),
+    'app_install_campaign_spend': ('app_install_clicks', 3000, 10000),
+}
+
+
+def _sample_codes(rng, probabilities, size):
+    return np.searchsorted(np.cumsum(probabilities), rng.random(size), side='right').clip(max=len(probabilities) - 1)
+
+
+def _sample_conditional(rng, table, parent_codes):
+    # One draw per row from the probability row selected by its parent code
+    cdf = np.cumsum(table, axis=1)[parent_codes]
+    return (rng.random(len(parent_codes))[:, None] >= cdf).sum(axis=1).clip(max=table.shape[1] - 1)
+
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _adstock(spend, decay):
+    # Geometric carry-over as a convolution with the decay kernel (no loop over weeks)
+    kernel = decay ** np.arange(len(spend))
+    return np.convolve(spend, kernel)[:len(spend)]
+
+
+# --- Week-level drivers (shared by every row of a week) ---
+def week_drivers(weeks=DEFAULT_WEEKS, seed=42, start=DEFAULT_START):
+    rng = np.random.default_rng([seed, 0])
+    dates = pd.date_range(start=start, periods=weeks, freq='W-SUN')
+    phase = 2 * np.pi * dates.isocalendar().week.to_numpy(dtype=float) / 52
+    drivers = {
+        'week': dates.values,
+        'holiday_flag': (rng.random(weeks) < 0.2).astype(np.int64),
+        'covid_wave_dummy': (rng.random(weeks) < 0.05).astype(np.int64),
+        'city_expansion_count': rng.integers(0, 3, size=weeks),
+        'new_app_version_flag': (rng.random(weeks) < 0.1).astype(np.int64),
+        'price_discount_index': rng.uniform(5, 20, size=weeks).round(2),
+        'competitor_spend_index': rng.uniform(50, 100, size=weeks).round(2),
+        'fuel_price_index': np.clip(105 + np.cumsum(rng.normal(0, 1.5, size=weeks)), 90, 120).round(2),
+        'rainfall_index': np.clip(50 + 35 * np.sin(phase) + rng.normal(0, 12, size=weeks), 0, 100).round(2),
+        'push_notifications_sent': rng.integers(200000, 400000, size=weeks),
+        'email_sent': rng.integers(100000, 300000, size=weeks),
+        'sms_sent': rng.integers(50000, 150000, size=weeks),
+        'website_visits': rng.integers(100000, 500000, size=weeks),
+        'blog_articles_published': rng.integers(0, 5, size=weeks),
+        'social_posts': rng.integers(5, 20, size=weeks),
+    }
+    low, high, lift, decay = (np.array(v, dtype=float) for v in zip(*MEDIA.values()))
+    # Heavier flighting around holidays
+    spend = rng.uniform(low, high, size=(weeks, len(MEDIA))) * (1 + 0.2 * drivers['holiday_flag'])[:, None]
+    spend = spend.round(2)
+    media_lift = np.zeros(weeks)
+    for i, col in enumerate(MEDIA):
+        drivers[col] = spend[:, i]
+        media_lift += lift[i] * _adstock(spend[:, i], decay[i])
+        engagement_col, eng_low, eng_high = MEDIA_ENGAGEMENT[col]
+        engagement = spend[:, i] * rng.uniform(eng_low, eng_high, size=weeks)
+        drivers[engagement_col] = engagement.round(2) if engagement_col == 'tv_grp' else engagement.astype(np.int64)
+    drivers['revenue_index'] = (
+        (1 + 0.12 * np.sin(phase))
+        * (1 + 0.06 * np.arange(weeks) / 52)
+        * (1 + 0.1 * drivers['holiday_flag'])
+        * (1 - 0.15 * drivers['covid_wave_dummy'])
+        * (1 - 0.004 * (drivers['price_discount_index'] - 12))
+        * (1 + media_lift)
+    )
+    return drivers
+
+
+# --- Row-level generation ---
+def generate_chunk(rows, start_row, stop_row, weeks=DEFAULT_WEEKS, seed=42, start=DEFAULT_START, chunk_index=0):
+    n = stop_row - start_row
+    rng = np.random.default_rng([seed, 1, chunk_index])
+    drivers = week_drivers(weeks, seed, start)
+    # Rows are ordered by week and spread evenly across all weeks
+    week_idx = (np.arange(start_row, stop_row, dtype=np.int64) * weeks) // rows
+
+    codes = {col: _sample_codes(rng, p, n) for col, (_, p) in CATEGORIES.items()}
+    account_codes = _sample_conditional(rng, ACCOUNT_TYPE_GIVEN_CUSTOMER, codes['customer_type'])
+    rainfall = drivers['rainfall_index'][week_idx]
+
+    # Revenue: segment mix x seasonality/trend/media x lognormal noise (mean ~8.5 Mn)
+    revenue = (
+        5_800_000
+        * REGION_REVENUE[codes['region']]
+        * CUSTOMER_TYPE_REVENUE[codes['customer_type']]
+        * TIER_REVENUE[codes['customer_tier']]
+        * drivers['revenue_index'][week_idx]
+        * rng.lognormal(-0.01, 0.15, size=n)
+    ).round(2)
+    aov = (300 * WEIGHT_TICKET[codes['package_weight_class']] * rng.uniform(0.8, 1.2, size=n)).round(2)
+    order_count = np.maximum(revenue / (aov * 10), 1).astype(np.int64)
+    weekly_transactions = (order_count * rng.uniform(8, 12, size=n)).astype(np.int64)
+    repeat_rate = TIER_REPEAT_RATE[codes['customer_tier']]
+
+    leads = rng.integers(500, 3000, size=n)
+    conversion = np.clip(CHANNEL_CONVERSION[codes['campaign_channel']] * rng.lognormal(0, 0.25, size=n), 0.02, 0.95)
+    conversions = np.maximum((leads * conversion).astype(np.int64), 1)
+    campaign_cost = (leads * CHANNEL_COST_PER_LEAD[codes['campaign_channel']] * rng.uniform(0.7, 1.3, size=n)).round(2)
+
+    # Delivery outcomes depend on mode and rainfall; delays drive satisfaction down
+    p_delay = MODE_DELAY_RATE[codes['delivery_mode']] + 0.1 * rainfall / 100
+    u = rng.random(n)
+    status_codes = np.where(u < 0.04, 2, np.where(u < 0.04 + p_delay, 1, 0))
+    delayed = status_codes == 1
+    weather_bias = np.where(rainfall[:, None] > 60, [0.2, 0.5, 0.2, 0.1], [0.4, 0.15, 0.3, 0.15])
+    reason_codes = (rng.random(n)[:, None] >= np.cumsum(weather_bias, axis=1)).sum(axis=1).clip(max=3)
+    reason_codes = np.where(delayed, reason_codes, -1)
+    hours = MODE_HOURS[codes['delivery_mode']]
+    estimated = rng.uniform(hours[:, 0], hours[:, 1])
+    actual = (estimated + np.where(delayed, rng.uniform(4, 24, size=n), rng.uniform(-3, 1, size=n))).round(1)
+    satisfaction = np.clip(
+        4.1 - 1.2 * delayed - 2.0 * (status_codes == 2) + rng.normal(0, 0.6, size=n), 1, 5
+    ).round(2)
+
+    columns = {
+        'week': drivers['week'][week_idx],
+        'app_downloads': (8000 + 500 * drivers['app_install_campaign_spend'][week_idx]
+                          + rng.integers(0, 2000, size=n)).astype(np.int64),
+        'weekly_transactions': weekly_transactions,
+        'revenue_total': revenue,
+        'repeat_transactions': (weekly_transactions * repeat_rate * rng.uniform(0.8, 1.2, size=n)).astype(np.int64),
+        'intercity_shipments': (order_count * rng.uniform(0.8, 2.0, size=n)).astype(np.int64),
+        'parcel_deliveries': (order_count * rng.uniform(4, 7, size=n)).astype(np.int64),
+        'avg_transaction_value': aov,
+        'region': _categorical(codes['region'], CATEGORIES['region'][0]),
+        'customer_type': _categorical(codes['customer_type'], CATEGORIES['customer_type'][0]),
+        'order_count': order_count,
+        'profit_margin': np.clip(
+            12 + 2.5 * (codes['customer_type'] == 0) + 1.5 * codes['customer_tier']
+            - 0.2 * (drivers['price_discount_index'][week_idx] - 12)
+            - 0.1 * (drivers['fuel_price_index'][week_idx] - 105)
+            + rng.normal(0, 2.5, size=n), 2, 25
+        ).round(2),
+        'repeat_purchase_flag': (rng.random(n) < repeat_rate).astype(np.int64),
+        'campaign_id': rng.integers(1000, 1100, size=n),
+        'campaign_channel': _categorical(codes['campaign_channel'], CATEGORIES['campaign_channel'][0]),
+        'leads_generated': leads,
+        'conversions': conversions,
+        'conversion_rate': (conversions / leads).round(3),
+        'campaign_cost': campaign_cost,
+        'roi': (conversions * aov - campaign_cost) / campaign_cost,
+        'customer_acquisition_cost': (campaign_cost / conversions).round(2),
+        'delivery_status': _categorical(status_codes, DELIVERY_STATUSES),
+        'actual_delivery_time_hrs': actual,
+        'estimated_delivery_time_hrs': estimated.round(1),
+        'delay_reason': _categorical(reason_codes, DELAY_REASONS),
+        'courier_partner': _categorical(codes['courier_partner'], CATEGORIES['courier_partner'][0]),
+        'competitor_name': _categorical(codes['competitor_name'], CATEGORIES['competitor_name'][0]),
+        'market_share_estimate': rng.uniform(10, 50, size=n).round(2),
+        'pricing_index': rng.uniform(80, 120, size=n).round(2),
+        'customer_churn_rate': np.clip(
+            TIER_CHURN[codes['customer_tier']] + 0.01 * delayed + rng.normal(0, 0.01, size=n), 0, 0.1
+        ).round(3),
+        'customer_feedback_score': np.clip(satisfaction * 0.4 + 3 + rng.normal(0, 0.2, size=n), 3, 5).round(2),
+        'complaint_id': rng.integers(20000, 21000, size=n),
+        'complaint_type': _categorical(codes['complaint_type'], CATEGORIES['complaint_type'][0]),
+        'resolution_time_hrs': rng.uniform(1, 48, size=n).round(1),
+        'customer_satisfaction_score': satisfaction,
+        'media_channel': _categorical(codes['media_channel'], CATEGORIES['media_channel'][0]),
+        'mentions_count': rng.integers(100, 1000, size=n),
+        'sentiment_score': np.clip((satisfaction - 3) / 2 + rng.normal(0, 0.3, size=n), -1, 1).round(2),
+        'engagement_rate': rng.uniform(0.01, 0.2, size=n).round(3),
+        'incident_id': rng.integers(30000, 30100, size=n),
+        'incident_type': _categorical(codes['incident_type'], CATEGORIES['incident_type'][0]),
+        'impact_duration_hrs': rng.uniform(0, 24, size=n).round(1),
+        'shipment_affected_count': rng.integers(0, 500, size=n),
+        'delivery_mode': _categorical(codes['delivery_mode'], CATEGORIES['delivery_mode'][0]),
+        'package_weight_class': _categorical(codes['package_weight_class'], CATEGORIES['package_weight_class'][0]),
+        'service_channel': _categorical(codes['service_channel'], CATEGORIES['service_channel'][0]),
+        'account_type': _categorical(account_codes, ACCOUNT_TYPES),
+        'customer_tier': _categorical(codes['customer_tier'], CATEGORIES['customer_tier'][0]),
+    }
+    for col in COLUMNS:
+        if col not in columns:
+            columns[col] = drivers[col][week_idx]
+    return pd.DataFrame({col: columns[col] for col in COLUMNS})
+
+
+def _chunk_bounds(rows, chunk_size):
+    return [(i, start, min(start + chunk_size, rows)) for i, start in enumerate(range(0, rows, chunk_size))]
+
+
+def _generate_chunk(args):
+    return generate_chunk(*args)
+
+
+def _generate_csv_chunk(args):
+    # CSV formatting is the slow part of writing, so it happens in the worker too
+    chunk_index = args[-1]
+    return generate_chunk(*args).to_csv(index=False, header=(chunk_index == 0)).encode('utf-8')
+
+
+def iter_chunks(rows, weeks=DEFAULT_WEEKS, seed=42, start=DEFAULT_START,
+                chunk_size=DEFAULT_CHUNK_SIZE, workers=1, as_csv=False):
+    task = _generate_csv_chunk if as_csv else _generate_chunk
+    jobs = [
+        (rows, start_row, stop_row, weeks, seed, start, index)
+        for index, start_row, stop_row in _chunk_bounds(rows, chunk_size)
+    ]
+    if workers <= 1:
+        for job in jobs:
+            yield task(job)
+        return
+    # Keep a bounded window of chunks in flight and yield them in row order
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = [executor.submit(task, job) for job in jobs[:window]]
+        next_job = len(pending)
+        while pending:
+            chunk = pending.pop(0).result()
+            if next_job < len(jobs):
+                pending.append(executor.submit(task, jobs[next_job]))
+                next_job += 1
+            yield chunk
+
+
+def generate(rows, weeks=DEFAULT_WEEKS, seed=42, start=DEFAULT_START, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    chunks = list(iter_chunks(rows, weeks, seed, start, chunk_size, workers))
+    df = pd.concat(chunks, ignore_index=True)
+    # Concatenated categoricals keep their categories; match the CSV's object columns
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def write_dataset(path, rows, weeks=DEFAULT_WEEKS, seed=42, start=DEFAULT_START,
+                  chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    if str(path).endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in iter_chunks(rows, weeks, seed, start, chunk_size, workers):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    # Categoricals are stored as plain strings (Parquet dictionary-encodes them anyway)
+                    schema = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_dictionary(field.type) else field
+                        for field in table.schema
+                    ])
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(table.cast(schema))
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "wb") as f:
+            for chunk in iter_chunks(rows, weeks, seed, start, chunk_size, workers, as_csv=True):
+                f.write(chunk)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic logistics MMM data.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_WEEKS)
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS)
+    parser.add_argument("--start", default=DEFAULT_START)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", required=True, help="target .csv or .parquet file")
+    args = parser.parse_args(argv)
+    write_dataset(args.output, args.rows, args.weeks, args.seed, args.start, args.chunk_size, args.workers)
+    print(f"✅ Wrote {args.rows:,} rows over {args.weeks} weeks to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
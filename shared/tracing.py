@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+from collections import deque
+
+# --- Rerun tracing ---
+# Every rerun of main_app.py becomes one trace: a root "rerun" span plus one
+# child span per profiling stage (load, filter, each show_*_tab, each chart
+# aggregation, exports). Spans follow the OpenTelemetry field names and go
+# to an in-process collector and, when DASHBOARD_TRACE_FILE names one, a
+# local JSONL file rotated by size. Usernames are left out of the spans
+# unless DASHBOARD_TRACE_USERS=1.
+TRACE_FILE = os.environ.get("DASHBOARD_TRACE_FILE")
+TRACE_FILE_MAX_BYTES = int(os.environ.get("DASHBOARD_TRACE_FILE_MAX_BYTES", 50 * 1024 * 1024))
+TRACE_USERS = os.environ.get("DASHBOARD_TRACE_USERS") == "1"
+TRACING_ENABLED = os.environ.get("DASHBOARD_TRACING", "1") != "0"
+
+
+class InMemoryCollector:
+    def __init__(self, max_spans=20_000):
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            self.spans.extend(spans)
+
+    def traces(self, session_id=None):
+        with self._lock:
+            spans = list(self.spans)
+        grouped = {}
+        for span in spans:
+            if session_id and span["attributes"].get("session.id") != session_id:
+                continue
+            grouped.setdefault(span["trace_id"], []).append(span)
+        return grouped
+
+
+class JsonlExporter:
+    def __init__(self, path, max_bytes=TRACE_FILE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            # A full file moves to <path>.1, replacing the previous one
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(lines) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+COLLECTOR = InMemoryCollector()
+EXPORTERS = [COLLECTOR]
+if TRACING_ENABLED and TRACE_FILE:
+    EXPORTERS.append(JsonlExporter(TRACE_FILE))
+
+
+def _stage_attributes(record):
+    attributes = {
+        key: record[key] for key in ("rows_in", "rows_out", "payload_bytes") if record[key] is not None
+    }
+    attributes.update(record["attributes"])
+    return attributes
+
+
+def build_spans(profiler, attributes):
+    trace_id = os.urandom(16).hex()
+    start_ns = profiler.started_unix_ns
+    root = {
+        "trace_id": trace_id,
+        "span_id": profiler.span_id,
+        "parent_span_id": None,
+        "name": "rerun",
+        "start_time_unix_nano": start_ns,
+        "end_time_unix_nano": start_ns + int(profiler.total_ms * 1e6),
+        "duration_ms": profiler.total_ms,
+        "status": "OK",
+        "attributes": attributes,
+    }
+    spans = [root]
+    for record in profiler.stages:
+        if record["duration_ms"] is None:
+            continue
+        span_start = start_ns + int(record["start_ms"] * 1e6)
+        spans.append({
+            "trace_id": trace_id,
+            "span_id": record["span_id"],
+            "parent_span_id": record["parent_id"],
+            "name": record["stage"],
+            "start_time_unix_nano": span_start,
+            "end_time_unix_nano": span_start + int(record["duration_ms"] * 1e6),
+            "duration_ms": record["duration_ms"],
+            "status": record["status"],
+            "attributes": _stage_attributes(record),
+        })
+    return spans
+
+
+def export_rerun(profiler, attributes):
+    if not TRACING_ENABLED:
+        return []
+    if not TRACE_USERS:
+        attributes = {key: value for key, value in attributes.items() if key != "user"}
+    spans = build_spans(profiler, attributes)
+    for exporter in EXPORTERS:
+        exporter.export(spans)
+    return spans
@@ -0,0 +1,60 @@
+import numpy as np
+
+# --- Media transforms ---
+# Adstock (carry-over) and saturation curves for the media mix model,
+# batched: spend is (weeks x channels), parameters are arrays of shape (P,)
+# shared by every channel or (P, channels) per channel, and every transform
+# returns (P x weeks x channels) at once. Adstock is the convolution of
+# spend with a lag kernel along the weeks axis, computed through one real
+# FFT for all parameters and channels, so nothing loops over weeks.
+def _per_channel(params):
+    # (P,) -> (P, 1) broadcasting over channels; (P, channels) as it is
+    params = np.asarray(params, dtype=float)
+    return params[:, None] if params.ndim == 1 else params
+
+
+def convolve_weeks(spend, kernels):
+    """Spend (weeks x channels) convolved with kernels (P x channels|1 x lags): (P x weeks x channels)."""
+    spend = np.asarray(spend, dtype=float)
+    weeks = spend.shape[0]
+    # Zero-padded to a power of two: weeks + lags - 1 can be a slow (e.g. prime) FFT length
+    n = 1 << (weeks + kernels.shape[-1] - 2).bit_length()
+    spectrum = np.fft.rfft(spend.T, n) * np.fft.rfft(kernels, n)
+    return np.swapaxes(np.fft.irfft(spectrum, n)[..., :weeks], -1, -2)
+
+
+def geometric_kernel(decays, lags):
+    return _per_channel(decays)[..., None] ** np.arange(lags)
+
+
+def weibull_kernel(shapes, scales, lags, kind="cdf"):
+    """Weibull lag weights, as in Robyn: "cdf" decays from 1, "pdf" can peak after the spend week."""
+    shapes, scales = _per_channel(shapes)[..., None], _per_channel(scales)[..., None]
+    lag = np.arange(lags, dtype=float)
+    if kind == "cdf":
+        return np.exp(-(lag / scales) ** shapes)
+    lag = lag + 1
+    pdf = shapes / scales * (lag / scales) ** (shapes - 1) * np.exp(-(lag / scales) ** shapes)
+    peak = pdf.max(axis=-1, keepdims=True)
+    return np.divide(pdf, peak, out=np.zeros_like(pdf), where=peak > 0)
+
+
+def geometric_adstock(spend, decays, max_lag=None):
+    """a[t] = x[t] + decay * a[t-1], exact over all weeks unless max_lag truncates the carry-over."""
+    lags = np.asarray(spend).shape[0] if max_lag is None else max_lag + 1
+    return convolve_weeks(spend, geometric_kernel(decays, lags))
+
+
+def weibull_adstock(spend, shapes, scales, max_lag, kind="cdf"):
+    return convolve_weeks(spend, weibull_kernel(shapes, scales, max_lag + 1, kind))
+
+
+def hill(x, half, shape):
+    x = np.maximum(x, 0)
+    return x ** shape / (x ** shape + half ** shape)
+
+
+def logistic(x, lam):
+    # Rises from 0 towards 1; lam sets how fast (1 - e^-lam x) / (1 + e^-lam x)
+    decay = np.exp(-lam * np.maximum(x, 0))
+    return (1 - decay) / (1 + decay)
@@ -1,20 +1,31 @@
 import streamlit as st
 import plotly.express as px
 
+from shared.profiling import plotly_chart, profile_stage
+from shared.query_engine import Aggregate, as_selection
+
+BRAND_AGGREGATES = {
+    "media_channel": Aggregate(
+        "media_channel", {col: (col, "mean") for col in ["mentions_count", "sentiment_score", "engagement_rate"]}
+    ),
+    "incident_type": Aggregate("incident_type", {"shipment_affected_count": ("shipment_affected_count", "sum")}),
+}
+
 def show_brand_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
     QUALITATIVE_DARK, QUALITATIVE_BOLD, SEQ_VIRIDIS = palettes
+    selection = as_selection(filtered_df)
+    with profile_stage("brand.aggregates", rows_in=selection.row_count):
+        aggregates = selection.aggregate_many(BRAND_AGGREGATES)
 
     st.header("📣 Brand Visibility & Incidents")
     if show_kpi_cards_with_yoy:
-        show_kpi_cards_with_yoy(filtered_df, palettes)
+        show_kpi_cards_with_yoy(selection, palettes)
     st.write("")
 
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Mentions & Sentiment by Channel")
-        brand_df = filtered_df.groupby("media_channel")[
-            ["mentions_count", "sentiment_score", "engagement_rate"]
-        ].mean(numeric_only=True).reset_index()
+        brand_df = aggregates["media_channel"]
         if not brand_df.empty:
             fig = px.bar(
                 brand_df,
@@ -25,14 +36,14 @@ def show_brand_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
                 title="Average Mentions per Channel by Sentiment"
             )
             fig.update_layout(template="plotly_white", xaxis_title="Media Channel", yaxis_title="Avg Mentions")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, "brand.media_channel", use_container_width=True)
             st.dataframe(brand_df, use_container_width=True)
         else:
             st.info("No brand/channel data for selected filters.")
 
     with col2:
         st.subheader("Shipment Affected by Incident Type")
-        inc_df = filtered_df.groupby("incident_type")["shipment_affected_count"].sum().reset_index()
+        inc_df = aggregates["incident_type"]
         if not inc_df.empty:
             fig = px.bar(
                 inc_df,
@@ -43,7 +54,7 @@ def show_brand_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
                 title="Shipments Impacted per Incident Type"
             )
             fig.update_layout(template="plotly_white", xaxis_title="Incident Type", yaxis_title="Total Shipments Affected", showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, "brand.incident_type", use_container_width=True)
             st.dataframe(inc_df, use_container_width=True)
         else:
             st.info("No incident data for selected filters.")
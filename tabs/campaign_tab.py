@@ -1,25 +1,26 @@
 import streamlit as st
 import plotly.express as px
 
-def show_campaign_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
-    QUALITATIVE_DARK, QUALITATIVE_BOLD, _ = palettes
+from shared.fragments import fragment
+from shared.profiling import plotly_chart, profile_stage
+from shared.query_engine import Aggregate, as_selection
 
-    st.header("🎯 Campaign Performance Overview")
-    if show_kpi_cards_with_yoy:
-        show_kpi_cards_with_yoy(filtered_df, palettes)
-    st.write("")
+CHANNEL_METRICS = ["leads_generated", "conversions", "campaign_cost", "cpc", "roas", "customer_acquisition_cost"]
+CAMPAIGN_AGGREGATES = {
+    "channel_summary": Aggregate("campaign_channel", {col: (col, "mean") for col in CHANNEL_METRICS}),
+}
 
+# Channel subtabs: controls added here rerun only this panel
+@fragment("campaign.channels")
+def show_channel_panel(conv_df, palette):
     tab1, tab2 = st.tabs(["📊 Channel Summary", "📈 ROAS vs CAC"])
 
     with tab1:
         st.subheader("Lead-to-Conversion by Channel")
-        conv_df = filtered_df.groupby("campaign_channel")[
-            ["leads_generated", "conversions", "campaign_cost", "cpc", "roas", "customer_acquisition_cost"]
-        ].mean(numeric_only=True).reset_index()
         st.dataframe(conv_df.round(2), use_container_width=True)
 
     with tab2:
-        if not filtered_df.empty:
+        if not conv_df.empty:
             fig = px.scatter(
                 conv_df,
                 x="customer_acquisition_cost",
@@ -27,18 +28,31 @@ def show_campaign_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
                 color="campaign_channel",
                 size="conversions",
                 hover_name="campaign_channel",
-                color_discrete_sequence=QUALITATIVE_BOLD,
+                color_discrete_sequence=palette,
                 title="ROAS vs Customer Acquisition Cost"
             )
             fig.update_layout(template="plotly_white")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, "campaign.roas_vs_cac", use_container_width=True)
         else:
             st.info("No campaign data for current filters.")
 
+def show_campaign_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
+    QUALITATIVE_DARK, QUALITATIVE_BOLD, _ = palettes
+    selection = as_selection(filtered_df)
+    with profile_stage("campaign.aggregates", rows_in=selection.row_count):
+        aggregates = selection.aggregate_many(CAMPAIGN_AGGREGATES)
+
+    st.header("🎯 Campaign Performance Overview")
+    if show_kpi_cards_with_yoy:
+        show_kpi_cards_with_yoy(selection, palettes)
+    st.write("")
+
+    show_channel_panel(aggregates["channel_summary"], QUALITATIVE_BOLD)
+
     st.subheader("Campaign Spend vs App Downloads")
-    if not filtered_df.empty:
+    if selection.row_count:
         fig = px.scatter(
-            filtered_df,
+            selection.to_pandas(["campaign_cost", "app_downloads", "campaign_channel", "conversions"]),
             x="campaign_cost",
             y="app_downloads",
             color="campaign_channel",
@@ -47,6 +61,6 @@ def show_campaign_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
             title="Campaign Spend vs App Downloads"
         )
         fig.update_layout(template="plotly_white")
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, "campaign.spend_vs_downloads", use_container_width=True)
     else:
         st.info("No campaign performance data for current filters.")
@@ -1,19 +1,35 @@
 import streamlit as st
 import plotly.express as px
 
+from shared.profiling import plotly_chart, profile_stage
+from shared.query_engine import Aggregate, as_selection
+
+DELIVERY_AGGREGATES = {
+    "status_counts": Aggregate(
+        "delivery_status", {"count": ("delivery_status", "count")},
+        sort_by="count", ascending=False
+    ),
+    "delay_counts": Aggregate(
+        "delay_reason", {"count": ("delay_reason", "count")},
+        where={"delivery_status": "Delayed"}, sort_by="count", ascending=False
+    ),
+}
+
 def show_delivery_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
     QUALITATIVE_DARK, QUALITATIVE_BOLD, _ = palettes
+    selection = as_selection(filtered_df)
+    with profile_stage("delivery.aggregates", rows_in=selection.row_count):
+        aggregates = selection.aggregate_many(DELIVERY_AGGREGATES)
 
     st.header("🚚 Delivery & Service Performance")
     if show_kpi_cards_with_yoy:
-        show_kpi_cards_with_yoy(filtered_df, palettes)
+        show_kpi_cards_with_yoy(selection, palettes)
     st.write("")
 
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Delivery Status Distribution")
-        status_counts = filtered_df["delivery_status"].value_counts().reset_index(name='count')
-        status_counts.columns = ['delivery_status', 'count']
+        status_counts = aggregates["status_counts"]
         if not status_counts.empty:
             fig = px.pie(
                 status_counts,
@@ -22,16 +38,14 @@ def show_delivery_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
                 color_discrete_sequence=QUALITATIVE_BOLD
             )
             fig.update_layout(template="plotly_white")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, "delivery.status", use_container_width=True)
             st.dataframe(status_counts, use_container_width=True)
         else:
             st.info("No delivery status data for current filters.")
 
     with col2:
         st.subheader("Delay Reasons")
-        delay_df = filtered_df[filtered_df["delivery_status"] == "Delayed"]
-        delay_counts = delay_df["delay_reason"].value_counts().reset_index(name='count')
-        delay_counts.columns = ['delay_reason', 'count']
+        delay_counts = aggregates["delay_counts"]
         if not delay_counts.empty:
             fig = px.bar(
                 delay_counts,
@@ -40,21 +54,21 @@ def show_delivery_tab(filtered_df, palettes, show_kpi_cards_with_yoy=None):
                 color_discrete_sequence=QUALITATIVE_DARK
             )
             fig.update_layout(template="plotly_white")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, "delivery.delay_reasons", use_container_width=True)
             st.dataframe(delay_counts, use_container_width=True)
         else:
             st.info("No delayed shipments for current filters.")
 
     st.subheader("Customer Satisfaction Trend")
-    if not filtered_df.empty:
+    if selection.row_count:
         fig = px.line(
-            filtered_df,
+            selection.to_pandas(["week", "customer_satisfaction_score", "region"]),
             x="week",
             y="customer_satisfaction_score",
             color="region",
             color_discrete_sequence=QUALITATIVE_BOLD
         )
         fig.update_layout(template="plotly_white")
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, "delivery.satisfaction_trend", use_container_width=True)
     else:
         st.info("No satisfaction data for current filters.")
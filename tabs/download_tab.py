@@ -1,12 +1,124 @@
+import time
+
 import streamlit as st
 import pandas as pd
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from io import BytesIO
 
-def show_download_tab(filtered_df):
+from shared.executor import run_in_process
+from shared.metrics import record_export
+from shared.prefix_sums import SEGMENT_TOTALS, PrefixSums
+from shared.profiling import profile_stage
+from shared.query_engine import as_selection
+
+PREVIEW_ROWS = 20
+PPT_PREVIEW_ROWS = 10
+
+# --- PowerPoint Export ---
+def generate_ppt(kpis, preview):
+    prs = Presentation()
+    slide_layout = prs.slide_layouts[5]
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    title = slide.shapes.title
+    subtitle = slide.placeholders[1]
+    title.text = "Mindmetric Logistics Dashboard"
+    subtitle.text = "Exported Report – Powered by Streamlit"
+
+    slide = prs.slides.add_slide(slide_layout)
+    shapes = slide.shapes
+    shapes.title.text = "Key Performance Indicators"
+    kpi_text = (
+        f"Total Revenue: ${kpis['revenue_total']/1_000_000:.2f} Mn\n"
+        f"Total Profit: ${kpis['profit']/1_000_000:.2f} Mn\n"
+        f"Repeat Rate: {kpis['repeat_purchase_flag'] * 100:.1f}%\n"
+        f"ROAS Avg: {kpis['roas']:.2f}"
+    )
+    textbox = shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
+    tf = textbox.text_frame
+    tf.text = kpi_text
+    for paragraph in tf.paragraphs:
+        paragraph.font.size = Pt(18)
+
+    slide = prs.slides.add_slide(slide_layout)
+    slide.shapes.title.text = "Sample Data Preview"
+    table_df = preview.head(PPT_PREVIEW_ROWS).reset_index(drop=True)
+    rows, cols = table_df.shape
+    table_shape = slide.shapes.add_table(rows + 1, cols, Inches(0.5), Inches(1.5), Inches(9), Inches(4))
+    table = table_shape.table
+    for i, col_name in enumerate(table_df.columns):
+        table.cell(0, i).text = str(col_name)
+    for row in range(rows):
+        for col in range(cols):
+            table.cell(row + 1, col).text = str(table_df.iloc[row, col])
+
+    ppt_bytes = BytesIO()
+    prs.save(ppt_bytes)
+    ppt_bytes.seek(0)
+    return ppt_bytes
+
+def csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+def ppt_bytes(kpis, preview):
+    # Process-pool entry point (shared.executor.run_in_process); bytes pickle, BytesIO does not
+    return generate_ppt(kpis, preview).getvalue()
+
+def export_kpis(selection, prefix_sums=None, filters=None):
+    # KPI slide figures from the prefix sums of the applied filters, or from
+    # the selection's own segment totals: never from its rows
+    if prefix_sums is None or filters is None:
+        prefix_sums, filters = PrefixSums(selection.aggregate(SEGMENT_TOTALS)), None
+    sums = prefix_sums.range_sums(filters)
+
+    def mean(col):
+        count = sums[f"{col}_count"]
+        return sums[f"{col}_sum"] / count if count else float("nan")
+
+    return {
+        "revenue_total": sums["revenue_total"],
+        "profit": sums["profit"],
+        "repeat_purchase_flag": mean("repeat_purchase_flag"),
+        "roas": mean("roas"),
+    }
+
+def selection_csv(selection):
+    start = time.perf_counter()
+    data = csv_bytes(selection.to_pandas())
+    record_export("csv", time.perf_counter() - start)
+    return data
+
+def selection_ppt(selection, prefix_sums=None, filters=None):
+    # Timed here, in the app process: the worker's metrics are never scraped
+    start = time.perf_counter()
+    kpis = export_kpis(selection, prefix_sums, filters)
+    data = run_in_process(ppt_bytes, kpis, selection.head(PPT_PREVIEW_ROWS)).result()[0]
+    record_export("ppt", time.perf_counter() - start)
+    return data
+
+# --- Exports on demand ---
+# An export reads the selection's rows (CSV) or builds a file (PowerPoint)
+# only when its button is clicked; the download button that follows serves
+# the bytes without another rerun.
+def export_button(label, stage_name, build, *args, file_name, mime, key):
+    if not st.button(label, key=f"prepare-{key}"):
+        return
+    with st.spinner("Preparing the export..."), profile_stage(stage_name) as stage:
+        data = build(*args)
+        stage["payload_bytes"] = len(data)
+    st.download_button(
+        f"💾 Save {file_name}",
+        data=data,
+        file_name=file_name,
+        mime=mime,
+        key=key,
+        on_click="ignore"
+    )
+
+def show_download_tab(filtered_df, prefix_sums=None, filters=None):
+    selection = as_selection(filtered_df)
     st.header("📤 Download Data")
-    preview_df = filtered_df.head(20).copy()
+    preview_df = selection.head(PREVIEW_ROWS).copy()
     num_cols = preview_df.select_dtypes(include=['number']).columns
     styler = preview_df.style.set_table_styles([
         {'selector': 'thead', 'props': [('background-color', '#003366'), ('color', 'white')]},
@@ -17,61 +129,14 @@ def show_download_tab(filtered_df):
     st.dataframe(styler, use_container_width=True)
 
     # --- Download CSV ---
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "Download CSV",
-        data=csv,
-        file_name="filtered_data.csv",
-        mime="text/csv",
-        key="download-csv-main"
+    export_button(
+        "Download CSV", "download.csv_export", selection_csv, selection,
+        file_name="filtered_data.csv", mime="text/csv", key="download-csv-main"
     )
 
     # --- PowerPoint Export ---
-    def generate_ppt(df):
-        prs = Presentation()
-        slide_layout = prs.slide_layouts[5]
-        slide = prs.slides.add_slide(prs.slide_layouts[0])
-        title = slide.shapes.title
-        subtitle = slide.placeholders[1]
-        title.text = "Mindmetric Logistics Dashboard"
-        subtitle.text = "Exported Report – Powered by Streamlit"
-
-        slide = prs.slides.add_slide(slide_layout)
-        shapes = slide.shapes
-        shapes.title.text = "Key Performance Indicators"
-        kpi_text = (
-            f"Total Revenue: ${df['revenue_total'].sum()/1_000_000:.2f} Mn\n"
-            f"Total Profit: ${df['profit'].sum()/1_000_000:.2f} Mn\n"
-            f"Repeat Rate: {df['repeat_purchase_flag'].mean() * 100:.1f}%\n"
-            f"ROAS Avg: {df['roas'].mean():.2f}"
-        )
-        textbox = shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
-        tf = textbox.text_frame
-        tf.text = kpi_text
-        for paragraph in tf.paragraphs:
-            paragraph.font.size = Pt(18)
-
-        slide = prs.slides.add_slide(slide_layout)
-        slide.shapes.title.text = "Sample Data Preview"
-        table_df = df.head(10).reset_index(drop=True)
-        rows, cols = table_df.shape
-        table_shape = slide.shapes.add_table(rows + 1, cols, Inches(0.5), Inches(1.5), Inches(9), Inches(4))
-        table = table_shape.table
-        for i, col_name in enumerate(table_df.columns):
-            table.cell(0, i).text = str(col_name)
-        for row in range(rows):
-            for col in range(cols):
-                table.cell(row + 1, col).text = str(table_df.iloc[row, col])
-
-        ppt_bytes = BytesIO()
-        prs.save(ppt_bytes)
-        ppt_bytes.seek(0)
-        return ppt_bytes
-
-    ppt_data = generate_ppt(filtered_df)
-    st.download_button(
-        "📥 Download PowerPoint",
-        data=ppt_data,
+    export_button(
+        "📥 Download PowerPoint", "download.generate_ppt", selection_ppt, selection, prefix_sums, filters,
         file_name="logistics_dashboard_report.pptx",
         mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
         key="download-ppt"
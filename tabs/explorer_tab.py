@@ -0,0 +1,62 @@
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from shared.data import SEGMENT_COLUMNS
+from shared.filters import build_filters
+from shared.fragments import fragment
+from shared.profiling import profile_stage
+from tabs.download_tab import selection_csv
+
+# --- Client-side cross-filter explorer ---
+# A custom component (components/cross_filter) loads the aggregate cube of
+# shared/cube.py once and does all filtering, cross-highlighting and KPI
+# recomputation in the browser. The server only hears back for raw-row
+# drill-downs and CSV exports of the explorer's selection.
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "components", "cross_filter")
+_cross_filter = components.declare_component("cross_filter", path=FRONTEND_DIR)
+
+DRILLDOWN_ROWS = 500
+
+def explorer_initial(filters, catalog):
+    # Start from the sidebar selection: the date range plus every narrowed dimension
+    start_date, end_date = filters["week"]
+    return {
+        "week": [start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")],
+        "filters": {
+            col: [str(value) for value in filters[col]]
+            for col in SEGMENT_COLUMNS if not catalog.is_complete(col, filters[col])
+        },
+    }
+
+@fragment("explorer")
+def show_explorer_tab(engine, cube, catalog, filters):
+    st.header("🔎 Cross-filter Explorer")
+    if cube is None:
+        st.info("The dataset is too large to explore in the browser; narrow it with the sidebar filters instead.")
+        return
+    st.caption(
+        f"Click bars to filter every other chart and the KPIs; all of it runs in your browser on a "
+        f"{cube['bytes'] / 1024:,.0f} KB cube of {cube['cells']:,} cells. Only drill-downs and exports reach the server."
+    )
+    event = _cross_filter(cube=cube, initial=explorer_initial(filters, catalog), key="cross_filter_explorer", default=None)
+    if not event:
+        return
+
+    segments = {col: event["filters"].get(col, catalog.domain(col)) for col in SEGMENT_COLUMNS}
+    with profile_stage("explorer.drilldown") as stage:
+        selection = engine.select(build_filters(event["week"], **segments))
+        frame = selection.head(DRILLDOWN_ROWS)
+        stage["rows_out"] = len(frame)
+    st.markdown(f"**Rows behind the explorer selection** ({selection.row_count:,})")
+    st.dataframe(frame, use_container_width=True)
+    if event["action"] == "export":
+        # The export click itself asked for the file: only now are all rows read
+        st.download_button(
+            label="📄 Download Explorer Selection (CSV)",
+            data=selection_csv(selection),
+            file_name="logistics_explorer_selection.csv",
+            mime="text/csv",
+            key="download-explorer"
+        )
@@ -0,0 +1,213 @@
+import time
+
+import numpy as np
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from shared.budget import optimize_budget, response_curves
+from shared.fragments import fragment
+from shared.profiling import plotly_chart, profile_stage
+
+# --- Media Mix ---
+# The model of shared/mmm.py is fitted once per data version in the process
+# pool and saved next to the app, so the tab normally only draws it. It
+# describes the whole dataset: the sidebar filters do not refit it.
+def channel_label(col):
+    return col.removesuffix("_spend").replace("_", " ").title()
+
+def resolved(future, waiting, failed, evict=None):
+    # Result of a background job, waiting for it under a spinner; None (with an error shown) if it failed.
+    # evict drops a failed job from its cache_resource loader, so the next rerun submits it again.
+    if not future.done():
+        with st.spinner(waiting):
+            future.exception()
+    if future.exception() is not None:
+        st.error(f"{failed}: {future.exception()}")
+        if evict is not None:
+            evict()
+        return None
+    return future.result()[0]
+
+def spend_change(current, optimized):
+    # Relative change per channel; channels without current spend have none
+    change = np.divide(optimized, current, out=np.full(len(current), np.nan), where=current > 0) - 1
+    return [
+        f"{value:+.1%}" if spent > 0 else ("new" if planned > 0 else "n/a")
+        for value, spent, planned in zip(change, current, optimized)
+    ]
+
+# Budget planner: moving a slider re-solves the allocation in this panel only
+@fragment("media_mix.budget")
+def show_budget_panel(model, palette):
+    curves = response_curves(model)
+    st.subheader("Budget Optimizer")
+    current_budget = float(curves.current.sum())
+    col1, col2 = st.columns(2)
+    budget = col1.slider(
+        "Weekly media budget", min_value=round(0.25 * current_budget, 1), max_value=round(curves.max_budget, 1),
+        value=round(current_budget, 1), step=0.1, key="media_mix_budget"
+    )
+    low, high = col2.slider(
+        "Channel bounds (% of current weekly spend)", min_value=0, max_value=300, value=(50, 200), step=5,
+        key="media_mix_bounds"
+    )
+    with profile_stage("media_mix.optimize") as stage:
+        start = time.perf_counter()
+        try:
+            plan = optimize_budget(curves, budget, curves.current * low / 100, curves.current * high / 100)
+        except ValueError as error:
+            st.warning(f"{error} Widen the channel bounds or change the budget.")
+            return
+        solve_ms = (time.perf_counter() - start) * 1000
+        stage["attributes"].update(budget=budget, solve_ms=round(solve_ms, 3))
+
+    current_revenue = float(curves.current_revenue.sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Current Media Revenue / Week", f"{current_revenue:,.0f}")
+    col2.metric(
+        "Optimized Media Revenue / Week", f"{plan['total_revenue']:,.0f}",
+        delta=f"{plan['total_revenue'] / current_revenue - 1:+.1%}" if current_revenue else None
+    )
+    col3.metric("Budget Change", f"{budget - current_budget:+,.1f}", delta=f"{budget / current_budget - 1:+.1%}" if current_budget else None)
+
+    labels = [channel_label(col) for col in curves.channels]
+    allocation = pd.DataFrame({
+        "channel": labels,
+        "current_spend": curves.current,
+        "optimized_spend": plan["spend"],
+        "change": spend_change(curves.current, plan["spend"]),
+        "optimized_revenue": plan["revenue"],
+        "marginal_roi": curves.marginal_roi[np.arange(len(labels)), curves.units(plan["spend"])],
+    })
+    fig = px.bar(
+        allocation.melt(id_vars="channel", value_vars=["current_spend", "optimized_spend"], var_name="allocation", value_name="weekly_spend"),
+        x="channel", y="weekly_spend", color="allocation", barmode="group",
+        color_discrete_sequence=palette,
+        title="Weekly Spend per Channel: Current vs Optimized"
+    )
+    fig.update_layout(template="plotly_white")
+    plotly_chart(fig, "media_mix.budget", use_container_width=True)
+    st.dataframe(allocation.round(3), use_container_width=True, hide_index=True)
+    st.caption(
+        f"Steady-state response curves of the fitted model; solved in {solve_ms:,.0f} ms. "
+        "Marginal ROI is the extra weekly revenue of one more unit of weekly spend at the optimized allocation."
+    )
+
+def show_media_mix_tab(media_mix, palettes, evict=None):
+    QUALITATIVE_DARK, QUALITATIVE_BOLD, _ = palettes
+    st.header("📺 Media Mix Model")
+    model = resolved(media_mix, "Fitting the media mix model...", "The media mix model could not be fitted", evict)
+    if model is None:
+        return
+
+    with profile_stage("media_mix.summary"):
+        summary = model.channel_summary()
+        summary["channel"] = summary["channel"].map(channel_label)
+        revenue = float(model.revenue.sum())
+        contribution = float(summary["contribution"].sum())
+    st.caption(
+        f"Ridge regression of weekly revenue on adstocked, Hill-saturated spend of {len(model.channels)} channels "
+        f"and {len(model.controls)} controls over {len(model.weeks)} weeks. "
+        f"R² {float(model.r2):.2f} · MAPE {float(model.mape):.1%} · holdout RMSE {float(model.holdout_rmse):,.0f}. "
+        "Covers the whole dataset; the sidebar filters do not apply."
+    )
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Media-driven Revenue", f"{contribution:,.0f}")
+    col2.metric("Share of Revenue", f"{contribution / revenue:.1%}" if revenue else "–")
+    col3.metric("Blended Media ROI", f"{contribution / summary['spend'].sum():,.0f}" if summary["spend"].sum() else "–")
+
+    fit = pd.DataFrame({"week": model.weeks, "Actual": model.revenue, "Model": model.fitted})
+    fig = px.line(
+        fit.melt(id_vars="week", var_name="series", value_name="revenue_total"),
+        x="week", y="revenue_total", color="series",
+        color_discrete_sequence=QUALITATIVE_DARK,
+        title="Weekly Revenue: Actual vs Model"
+    )
+    fig.update_layout(template="plotly_white")
+    plotly_chart(fig, "media_mix.fit", use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.bar(
+            summary.sort_values("contribution"), x="contribution", y="channel", orientation="h",
+            color="channel", color_discrete_sequence=QUALITATIVE_BOLD,
+            title="Revenue Contribution by Channel"
+        )
+        fig.update_layout(template="plotly_white", showlegend=False)
+        plotly_chart(fig, "media_mix.contribution", use_container_width=True)
+    with col2:
+        fig = px.bar(
+            summary.sort_values("roi"), x="roi", y="channel", orientation="h",
+            color="channel", color_discrete_sequence=QUALITATIVE_BOLD,
+            title="Revenue per Unit of Spend (ROI)"
+        )
+        fig.update_layout(template="plotly_white", showlegend=False)
+        plotly_chart(fig, "media_mix.roi", use_container_width=True)
+
+    st.subheader("Fitted Channel Parameters")
+    st.dataframe(summary.round(3), use_container_width=True, hide_index=True)
+
+    show_budget_panel(model, QUALITATIVE_BOLD)
+
+# --- Media Contribution ---
+# Precomputed per model and data version (shared/contribution.py); the
+# sidebar date range and regions slice it, the other filters do not apply.
+def show_contribution_tab(contributions, filters, palettes, evict=None):
+    QUALITATIVE_DARK, QUALITATIVE_BOLD, _ = palettes
+    st.header("🧩 Media Contribution")
+    contributions = resolved(
+        contributions, "Decomposing revenue by channel...", "The media contributions could not be computed", evict
+    )
+    if contributions is None:
+        return
+
+    with profile_stage("media_contribution.slice") as stage:
+        weekly = contributions.weekly(filters)
+        curves = contributions.curves(filters)
+        stage["rows_out"] = len(weekly)
+    st.caption(
+        "Weekly revenue split into base (trend, controls and everything the model does not attribute to media) "
+        "and the contribution of each channel. Only the date range and region filters apply."
+    )
+    parts = weekly.drop(columns="week")
+    if not parts.to_numpy().any():
+        st.info("No revenue in the selected weeks and regions.")
+        return
+    labels = {col: "Base" if col == "base" else channel_label(col) for col in parts.columns}
+    revenue = float(parts.to_numpy().sum())
+    media = float(parts.drop(columns="base").to_numpy().sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Revenue", f"{revenue:,.0f}")
+    col2.metric("Base Revenue", f"{revenue - media:,.0f}")
+    col3.metric("Media Contribution", f"{media:,.0f}", delta=f"{media / revenue:.1%} of revenue" if revenue else None, delta_color="off")
+
+    fig = px.area(
+        weekly.rename(columns=labels).melt(id_vars="week", var_name="component", value_name="revenue_total"),
+        x="week", y="revenue_total", color="component",
+        color_discrete_sequence=QUALITATIVE_DARK,
+        title="Weekly Revenue: Base + Channel Contributions"
+    )
+    fig.update_layout(template="plotly_white")
+    plotly_chart(fig, "media_contribution.weekly", use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        totals = parts.drop(columns="base").sum().rename(index=labels).sort_values()
+        fig = px.bar(
+            x=totals.to_numpy(), y=totals.index, orientation="h",
+            color=totals.index, color_discrete_sequence=QUALITATIVE_BOLD,
+            labels={"x": "contribution", "y": "channel"},
+            title="Contribution by Channel"
+        )
+        fig.update_layout(template="plotly_white", showlegend=False)
+        plotly_chart(fig, "media_contribution.channels", use_container_width=True)
+    with col2:
+        curves["channel"] = curves["channel"].map(channel_label)
+        fig = px.line(
+            curves, x="weekly_spend", y="weekly_revenue", color="channel",
+            color_discrete_sequence=QUALITATIVE_BOLD,
+            title="Response Curves (weekly revenue at a constant weekly spend)"
+        )
+        fig.update_layout(template="plotly_white")
+        plotly_chart(fig, "media_contribution.curves", use_container_width=True)
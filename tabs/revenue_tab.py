@@ -1,7 +1,18 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from shared.comparison import PeriodComparison
+from shared.cross_filter import cross_filter_aggregates
+from shared.data import SEGMENT_COLUMNS
+from shared.fragments import fragment
+from shared.prefix_sums import SEGMENT_TOTALS, PrefixSums
+from shared.profiling import plotly_chart, profile_stage
+from shared.query_engine import Aggregate, as_selection
+from shared.rollups import GRAIN_LABELS, GRAINS, auto_grain, rollup
+from tabs.download_tab import export_button, selection_csv
+
 # Muted, professional palettes
 MUTED_QUALITATIVE = [
     '#5478a6',  # steel blue
@@ -23,27 +34,64 @@ MUTED_SEQUENTIAL = [
     '#c6dbef'
 ]
 
-def show_kpi_cards_with_yoy(filtered_df, palettes=None):
-    current_year = filtered_df['week'].dt.year.max()
-    previous_year = current_year - 1
+def _revenue_by(group_by):
+    return Aggregate(group_by, {"revenue_total": ("revenue_total", "sum")})
+
+def _weekly_mean(col):
+    # Sum and count rather than mean, so the week grain can be rolled up exactly
+    return Aggregate("week", {f"{col}_sum": (col, "sum"), f"{col}_count": (col, "count")})
+
+def _mean_of(col):
+    return {col: (f"{col}_sum", f"{col}_count")}
 
-    curr_year_df = filtered_df[filtered_df['week'].dt.year == current_year]
-    prev_year_df = filtered_df[filtered_df['week'].dt.year == previous_year]
+# Chart breakdowns, served by whichever query engine backs the selection
+REVENUE_CHARTS = {
+    "trend_region": _revenue_by(("week", "region")),
+    "region": _revenue_by("region"),
+    "customer_type": _revenue_by("customer_type"),
+    "delivery_mode": _revenue_by("delivery_mode"),
+    "package_weight_class": _revenue_by("package_weight_class"),
+    "service_channel": _revenue_by("service_channel"),
+    "account_type": _revenue_by("account_type"),
+    "customer_tier": _revenue_by("customer_tier"),
+    "cac_trend": _weekly_mean("customer_acquisition_cost"),
+    "churn_trend": _weekly_mean("customer_churn_rate"),
+}
+
+# The auto insights and the correlation heatmap read aggregates too, never rows
+REVENUE_AGGREGATES = {
+    **REVENUE_CHARTS,
+    "insights_region": Aggregate("region", {
+        col: (col, "mean") for col in ("repeat_purchase_flag", "customer_churn_rate", "profit_margin")
+    }),
+    "insights_delivery_roas": Aggregate("delivery_mode", {"roas": ("roas", "mean")}),
+    "segment_combos": Aggregate(tuple(SEGMENT_COLUMNS), {"rows": ("week", "count")}),
+}
+
+def select_time_grain(weeks):
+    # Manual override next to the trend charts; "Auto" picks from the selected range
+    choice = st.radio(
+        "Time grain", ["Auto"] + [grain.title() for grain in GRAINS],
+        horizontal=True, key="revenue_time_grain"
+    )
+    if choice != "Auto":
+        return choice.lower()
+    if weeks.empty:
+        return "week"
+    return auto_grain(weeks.min(), weeks.max())
 
-    curr_vals = curr_year_df.agg({
-        'revenue_total': 'sum',
-        'profit': 'sum',
-        'repeat_purchase_flag': 'mean',
-        'roas': 'mean'
-    })
-    prev_vals = prev_year_df.agg({
-        'revenue_total': 'sum',
-        'profit': 'sum',
-        'repeat_purchase_flag': 'mean',
-        'roas': 'mean'
-    })
+def compute_kpis_yoy(filtered_df, comparison=None):
+    # Without a comparison built by main_app, compare the latest year of the
+    # selection itself with the year before it
+    if comparison is None:
+        prefix_sums = PrefixSums(as_selection(filtered_df).aggregate(SEGMENT_TOTALS))
+        weeks = pd.to_datetime(prefix_sums.weeks)
+        selected = (weeks[0], weeks[-1]) if len(weeks) else None
+        comparison = PeriodComparison(prefix_sums.weeks, *prefix_sums.collapse(), selected, iso_weeks=False)
+    return comparison.kpis()
 
-    kpi_yoy = ((curr_vals - prev_vals) / prev_vals) * 100
+def show_kpi_cards_with_yoy(filtered_df, palettes=None, comparison=None):
+    curr_vals, kpi_yoy = compute_kpis_yoy(filtered_df, comparison)
 
     total_revenue = curr_vals['revenue_total'] / 1_000_000
     total_profit = curr_vals['profit'] / 1_000_000
@@ -111,28 +159,43 @@ def show_kpi_cards_with_yoy(filtered_df, palettes=None):
                 <div class='kpi-label'>ROAS Avg</div>
                 <div class='kpi-delta'>{arrow(kpi_yoy['roas'])}</div></div>""",
             unsafe_allow_html=True)
+    if comparison is not None:
+        st.caption(f"Change vs {comparison.label}")
 
-def generate_auto_insights(filtered_df):
-    if filtered_df.empty:
+def _top(frame, col, largest=True):
+    # Row of frame with the largest (or smallest) col; None for an empty frame
+    values = frame[col].astype(float)
+    if values.isna().all():
+        return None
+    return frame.loc[values.idxmax() if largest else values.idxmin()]
+
+def generate_auto_insights(aggregates, comparison=None):
+    # Reads the REVENUE_AGGREGATES results of the selection, never its rows
+    by_region = aggregates["region"]
+    if by_region.empty:
         return "_No data available for current filters._"
 
     lines = []
     # Highest revenue region
-    top_region = filtered_df.groupby('region')['revenue_total'].sum().idxmax()
-    top_region_val = filtered_df.groupby('region')['revenue_total'].sum().max()
+    top_region = _top(by_region, 'revenue_total')
 
     # Segment leader by customer type
-    top_custtype = filtered_df.groupby('customer_type')['revenue_total'].sum().idxmax()
-    top_custtype_val = filtered_df.groupby('customer_type')['revenue_total'].sum().max()
+    top_custtype = _top(aggregates["customer_type"], 'revenue_total')
 
-    # Fastest growing market (by region, based on % growth from first to last week)
+    # Fastest growing market (by region, % revenue growth vs the comparison
+    # baseline, or from first to last week without one)
     growth = {}
-    for region in filtered_df['region'].unique():
-        region_weeks = filtered_df[filtered_df['region'] == region].sort_values('week')
-        week_sum = region_weeks.groupby('week')['revenue_total'].sum()
-        if len(week_sum) > 1 and week_sum.iloc[0] != 0:
-            pct_growth = (week_sum.iloc[-1] - week_sum.iloc[0]) / week_sum.iloc[0] * 100
-            growth[region] = pct_growth
+    if comparison is not None and comparison.baseline is not None:
+        for region in by_region['region']:
+            pct_growth = comparison.kpis(region)[1]['revenue_total']
+            if pct_growth == pct_growth:
+                growth[region] = pct_growth
+    else:
+        for region, region_weeks in aggregates["trend_region"].groupby('region', sort=False):
+            week_sum = region_weeks.sort_values('week')['revenue_total']
+            if len(week_sum) > 1 and week_sum.iloc[0] != 0:
+                pct_growth = (week_sum.iloc[-1] - week_sum.iloc[0]) / week_sum.iloc[0] * 100
+                growth[region] = pct_growth
     if growth:
         fastest_growing_region = max(growth, key=growth.get)
         fastest_growth_value = growth[fastest_growing_region]
@@ -141,108 +204,127 @@ def generate_auto_insights(filtered_df):
         fastest_growth_value = 0
 
     # Best ROAS delivery mode
-    deliv_group = filtered_df.groupby('delivery_mode')['roas'].mean()
-    if not deliv_group.empty:
-        top_roas_mode = deliv_group.idxmax()
-        top_roas_val = deliv_group.max()
-    else:
-        top_roas_mode = top_roas_val = None
+    top_roas = _top(aggregates["insights_delivery_roas"], 'roas')
 
     # --- Part 1: Highlights ---
-    lines.append(f"- **Highest Revenue Region:** {top_region} ({top_region_val:,.0f})")
-    lines.append(f"- **Segment Leader:** {top_custtype} customers generated {top_custtype_val:,.0f} in revenue")
+    lines.append(f"- **Highest Revenue Region:** {top_region['region']} ({top_region['revenue_total']:,.0f})")
+    if top_custtype is not None:
+        lines.append(
+            f"- **Segment Leader:** {top_custtype['customer_type']} customers generated "
+            f"{top_custtype['revenue_total']:,.0f} in revenue"
+        )
     if fastest_growing_region:
         lines.append(f"- **Fastest Growing Market:** {fastest_growing_region} ({fastest_growth_value:.1f}% growth)")
-    if top_roas_mode is not None:
-        lines.append(f"- **Best ROAS Delivery Mode:** {top_roas_mode} (Avg ROAS: {top_roas_val:.2f})")
+    if comparison is not None and comparison.baseline is not None:
+        revenue_change = comparison.kpis()[1]['revenue_total']
+        if revenue_change == revenue_change:
+            lines.append(f"- **Revenue Change:** {revenue_change:+.1f}% vs {comparison.label}")
+    if top_roas is not None:
+        lines.append(f"- **Best ROAS Delivery Mode:** {top_roas['delivery_mode']} (Avg ROAS: {top_roas['roas']:.2f})")
     else:
         lines.append("- Best ROAS Delivery Mode: Data not available")
 
     # --- Part 2: Critical Areas Requiring Attention ---
     critical_lines = []
+    region_means = aggregates["insights_region"]
     # Low repeat rate
-    if 'repeat_purchase_flag' in filtered_df.columns:
-        region_repeat = filtered_df.groupby('region')['repeat_purchase_flag'].mean() * 100
-        min_repeat_region = region_repeat.idxmin() if not region_repeat.empty else None
-        min_repeat_value = region_repeat.min() if not region_repeat.empty else None
-        if min_repeat_region and min_repeat_value is not None and min_repeat_value < 40:  # Example threshold
-            critical_lines.append(
-                f"- **Low Repeat Purchase Rate:** {min_repeat_region} region ({min_repeat_value:.1f}%)"
-            )
+    low_repeat = _top(region_means, 'repeat_purchase_flag', largest=False)
+    if low_repeat is not None and low_repeat['repeat_purchase_flag'] * 100 < 40:  # Example threshold
+        critical_lines.append(
+            f"- **Low Repeat Purchase Rate:** {low_repeat['region']} region ({low_repeat['repeat_purchase_flag'] * 100:.1f}%)"
+        )
     # High churn rate
-    if 'customer_churn_rate' in filtered_df.columns:
-        churn = filtered_df.groupby('region')['customer_churn_rate'].mean() * 100
-        max_churn_region = churn.idxmax() if not churn.empty else None
-        max_churn_value = churn.max() if not churn.empty else None
-        if max_churn_region and max_churn_value is not None and max_churn_value > 25:  # Example threshold
-            critical_lines.append(
-                f"- **High Churn Rate:** {max_churn_region} region ({max_churn_value:.1f}%)"
-            )
+    high_churn = _top(region_means, 'customer_churn_rate')
+    if high_churn is not None and high_churn['customer_churn_rate'] * 100 > 25:  # Example threshold
+        critical_lines.append(
+            f"- **High Churn Rate:** {high_churn['region']} region ({high_churn['customer_churn_rate'] * 100:.1f}%)"
+        )
     # Low profit margin
-    if 'profit_margin' in filtered_df.columns:
-        profit_margins = filtered_df.groupby('region')['profit_margin'].mean()
-        low_margin_region = profit_margins.idxmin() if not profit_margins.empty else None
-        low_margin_value = profit_margins.min() if not profit_margins.empty else None
-        if low_margin_region and low_margin_value is not None and low_margin_value < 10:
-            critical_lines.append(
-                f"- **Low Profit Margin:** {low_margin_region} region ({low_margin_value:.1f}%)"
-            )
+    low_margin = _top(region_means, 'profit_margin', largest=False)
+    if low_margin is not None and low_margin['profit_margin'] < 10:
+        critical_lines.append(
+            f"- **Low Profit Margin:** {low_margin['region']} region ({low_margin['profit_margin']:.1f}%)"
+        )
     # Add "Critical Areas" headline if any insights found
     if critical_lines:
         lines.append("\n**🔴 Critical Areas Needing Attention:**\n" + "\n".join(critical_lines))
 
     return "\n".join(lines)
 
-def show_revenue_tab(filtered_df, palettes=None, show_kpi_cards_with_yoy_func=None):
-    # Prepare CSV for download
-    csv_data = filtered_df.to_csv(index=False).encode('utf-8')
+def compute_correlation_matrix(segment_combos):
+    # Correlation of the segment columns' one-hot indicators, weighted by the
+    # rows of each segment combination: the same matrix as
+    # pd.get_dummies(rows).corr(), from at most a few thousand combinations
+    weights = segment_combos["rows"].to_numpy(dtype=float)
+    encoded = pd.get_dummies(segment_combos[SEGMENT_COLUMNS].astype(object), prefix_sep=": ", dtype=float)
+    indicators = encoded.to_numpy()
+    share = weights @ indicators / weights.sum()
+    covariance = (indicators * weights[:, None]).T @ indicators / weights.sum() - np.outer(share, share)
+    # Indicator variances are exactly share * (1 - share); a constant column has no correlation
+    std = np.sqrt(share * (1 - share))
+    std[std == 0] = np.nan
+    return pd.DataFrame(covariance / np.outer(std, std), index=encoded.columns, columns=encoded.columns)
 
-    # Right-aligned Download CSV button at top of tab content
-    st.markdown(
-        """
-        <div class="download-btn-container">
-        """, unsafe_allow_html=True
-    )
-    st.download_button(
-        label="📄 Download Filtered Data (CSV)",
-        data=csv_data,
-        file_name="logistics_revenue_filtered_data.csv",
-        mime="text/csv"
-    )
-    st.markdown("</div>", unsafe_allow_html=True)
+CROSS_FILTER_KEYS = {"region": "revenue_cross_region", "customer_tier": "revenue_cross_tier"}
 
-    # --- Auto Insights Section (always at top!) ---
-    with st.expander("📌 Auto Insights", expanded=True):
-        st.markdown(generate_auto_insights(filtered_df))
+def revenue_cross_filter(filters=None):
+    # Region clicked in the "Revenue by Region" bars and tier picked under the tier pie
+    # (Plotly pie slices do not report selections to Streamlit)
+    cross = {}
+    region_event = st.session_state.get("revenue_cross_region") or {}
+    points = region_event.get("selection", {}).get("points", [])
+    if points:
+        cross["region"] = points[0]["x"]
+    if st.session_state.get("revenue_cross_tier", "All") != "All":
+        cross["customer_tier"] = st.session_state["revenue_cross_tier"]
+    # A value the sidebar no longer selects is dropped and its control reset
+    for col, value in list(cross.items()):
+        if filters is not None and value not in filters[col]:
+            del cross[col]
+            del st.session_state[CROSS_FILTER_KEYS[col]]
+    return cross
 
-    st.markdown("### Executive Summary")
-    show_kpi_cards_with_yoy(filtered_df, palettes)
-    st.write("")
+# Time grain control, cross-filter clicks and the charts they drive: both
+# rerun only this panel, from the aggregates of the last full run
+@fragment("revenue.charts")
+def show_revenue_charts(aggregates, selection, prefix_sums=None, filters=None):
+    cross = revenue_cross_filter(filters)
+    if cross:
+        with profile_stage("revenue.cross_filter", rows_in=selection.row_count):
+            aggregates = cross_filter_aggregates(aggregates, REVENUE_CHARTS, cross, selection, prefix_sums, filters)
+        st.caption("Cross-filtered by " + ", ".join(f"{col.replace('_', ' ')} = {value}" for col, value in cross.items())
+                   + ". Click the bar again or pick All tiers to reset.")
+
+    grain = select_time_grain(aggregates["trend_region"]["week"])
+    grain_label = GRAIN_LABELS[grain]
 
     st.markdown("**Revenue Trend by Region**")
-    rev_trend_region = filtered_df.groupby(['week', 'region'])['revenue_total'].sum().reset_index()
+    rev_trend_region = rollup(aggregates["trend_region"], grain, by=["region"], sums=["revenue_total"])
     fig_trend_region = px.line(
         rev_trend_region, x='week', y='revenue_total', color='region',
         color_discrete_sequence=MUTED_SEQUENTIAL,
-        labels={"week": "Week", "revenue_total": "Revenue"}
+        labels={"week": grain.title(), "revenue_total": "Revenue"}
     )
     fig_trend_region.update_layout(template="plotly_white")
-    st.plotly_chart(fig_trend_region, use_container_width=True)
+    plotly_chart(fig_trend_region, "revenue.trend_region", use_container_width=True)
 
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("**Revenue by Region**")
-        rev_by_region = filtered_df.groupby('region')['revenue_total'].sum().reset_index()
+        rev_by_region = aggregates["region"]
         fig_region = px.bar(
             rev_by_region, x='region', y='revenue_total', color='region',
             color_discrete_sequence=MUTED_QUALITATIVE,
             labels={"region": "Region", "revenue_total": "Total Revenue"}
         )
         fig_region.update_layout(template="plotly_white")
-        st.plotly_chart(fig_region, use_container_width=True)
+        plotly_chart(
+            fig_region, "revenue.region", use_container_width=True,
+            on_select="rerun", selection_mode="points", key="revenue_cross_region"
+        )
     with col2:
         st.markdown("**Revenue by Customer Type (B2B vs B2C)**")
-        rev_by_custtype = filtered_df.groupby('customer_type')['revenue_total'].sum().reset_index()
+        rev_by_custtype = aggregates["customer_type"]
         fig_custtype_pie = px.pie(
             rev_by_custtype,
             names='customer_type',
@@ -251,93 +333,124 @@ def show_revenue_tab(filtered_df, palettes=None, show_kpi_cards_with_yoy_func=No
             color_discrete_sequence=MUTED_QUALITATIVE
         )
         fig_custtype_pie.update_traces(textinfo='percent+label')
-        st.plotly_chart(fig_custtype_pie, use_container_width=True)
+        plotly_chart(fig_custtype_pie, "revenue.customer_type", use_container_width=True)
 
     col3, col4 = st.columns(2)
     with col3:
         st.markdown("**Revenue by Delivery Mode**")
-        rev_by_mode = filtered_df.groupby('delivery_mode')['revenue_total'].sum().reset_index()
+        rev_by_mode = aggregates["delivery_mode"]
         fig_mode = px.bar(
             rev_by_mode, x='delivery_mode', y='revenue_total', color='delivery_mode',
             color_discrete_sequence=MUTED_QUALITATIVE,
             labels={"delivery_mode": "Delivery Mode", "revenue_total": "Revenue"}
         )
         fig_mode.update_layout(template="plotly_white")
-        st.plotly_chart(fig_mode, use_container_width=True)
+        plotly_chart(fig_mode, "revenue.delivery_mode", use_container_width=True)
     with col4:
         st.markdown("**Revenue by Package Weight Class**")
-        rev_by_pkg = filtered_df.groupby('package_weight_class')['revenue_total'].sum().reset_index()
+        rev_by_pkg = aggregates["package_weight_class"]
         fig_pkg = px.bar(
             rev_by_pkg, x='package_weight_class', y='revenue_total', color='package_weight_class',
             color_discrete_sequence=MUTED_QUALITATIVE,
             labels={"package_weight_class": "Weight Class", "revenue_total": "Revenue"}
         )
         fig_pkg.update_layout(template="plotly_white")
-        st.plotly_chart(fig_pkg, use_container_width=True)
+        plotly_chart(fig_pkg, "revenue.package_weight_class", use_container_width=True)
 
     col5, col6, col7 = st.columns(3)
     with col5:
         st.markdown("**Revenue by Service Channel**")
-        pie_service = filtered_df.groupby('service_channel')['revenue_total'].sum().reset_index()
+        pie_service = aggregates["service_channel"]
         fig_service = px.pie(
             pie_service, names='service_channel', values='revenue_total',
             hole=0.4,
             color_discrete_sequence=MUTED_QUALITATIVE
         )
         fig_service.update_traces(textinfo='percent+label')
-        st.plotly_chart(fig_service, use_container_width=True)
+        plotly_chart(fig_service, "revenue.service_channel", use_container_width=True)
     with col6:
         st.markdown("**Revenue by Account Type**")
-        pie_account = filtered_df.groupby('account_type')['revenue_total'].sum().reset_index()
+        pie_account = aggregates["account_type"]
         fig_account = px.pie(
             pie_account, names='account_type', values='revenue_total',
             hole=0.4,
             color_discrete_sequence=MUTED_QUALITATIVE
         )
         fig_account.update_traces(textinfo='percent+label')
-        st.plotly_chart(fig_account, use_container_width=True)
+        plotly_chart(fig_account, "revenue.account_type", use_container_width=True)
     with col7:
         st.markdown("**Revenue by Customer Tier**")
-        pie_tier = filtered_df.groupby('customer_tier')['revenue_total'].sum().reset_index()
+        pie_tier = aggregates["customer_tier"]
         fig_tier = px.pie(
             pie_tier, names='customer_tier', values='revenue_total',
             hole=0.4,
             color_discrete_sequence=MUTED_QUALITATIVE
         )
         fig_tier.update_traces(textinfo='percent+label')
-        st.plotly_chart(fig_tier, use_container_width=True)
+        plotly_chart(fig_tier, "revenue.customer_tier", use_container_width=True)
+        tiers = filters["customer_tier"] if filters else list(pie_tier["customer_tier"])
+        st.radio("Cross-filter by tier", ["All", *tiers], horizontal=True, key="revenue_cross_tier")
 
     st.markdown("---")
-    st.subheader("Customer Metrics Trends (Weekly)")
+    st.subheader(f"Customer Metrics Trends ({grain_label})")
 
-    st.markdown("**Weekly Customer Acquisition Cost**")
-    cac_trend = filtered_df.groupby('week')['customer_acquisition_cost'].mean().reset_index()
+    st.markdown(f"**{grain_label} Customer Acquisition Cost**")
+    cac_trend = rollup(aggregates["cac_trend"], grain, means=_mean_of("customer_acquisition_cost"))
     fig_cac = px.line(
         cac_trend, x='week', y='customer_acquisition_cost',
-        color_discrete_sequence=MUTED_SEQUENTIAL, labels={"customer_acquisition_cost": "Avg Acquisition Cost"}
+        color_discrete_sequence=MUTED_SEQUENTIAL,
+        labels={"week": grain.title(), "customer_acquisition_cost": "Avg Acquisition Cost"}
     )
     fig_cac.update_layout(template="plotly_white")
-    st.plotly_chart(fig_cac, use_container_width=True)
+    plotly_chart(fig_cac, "revenue.cac_trend", use_container_width=True)
 
-    st.markdown("**Weekly Customer Churn Rate**")
-    churn_trend = filtered_df.groupby('week')['customer_churn_rate'].mean().reset_index()
+    st.markdown(f"**{grain_label} Customer Churn Rate**")
+    churn_trend = rollup(aggregates["churn_trend"], grain, means=_mean_of("customer_churn_rate"))
     fig_churn = px.line(
         churn_trend, x='week', y='customer_churn_rate',
-        color_discrete_sequence=MUTED_SEQUENTIAL, labels={"customer_churn_rate": "Avg Churn Rate"}
+        color_discrete_sequence=MUTED_SEQUENTIAL,
+        labels={"week": grain.title(), "customer_churn_rate": "Avg Churn Rate"}
     )
     fig_churn.update_layout(template="plotly_white")
-    st.plotly_chart(fig_churn, use_container_width=True)
+    plotly_chart(fig_churn, "revenue.churn_trend", use_container_width=True)
+
+def show_revenue_tab(filtered_df, palettes=None, show_kpi_cards_with_yoy_func=None, comparison=None, prefix_sums=None, filters=None):
+    selection = as_selection(filtered_df)
+    with profile_stage("revenue.aggregates", rows_in=selection.row_count):
+        aggregates = selection.aggregate_many(REVENUE_AGGREGATES)
+
+    # Right-aligned Download CSV button at top of tab content; the rows are
+    # only fetched once it is clicked
+    st.markdown(
+        """
+        <div class="download-btn-container">
+        """, unsafe_allow_html=True
+    )
+    export_button(
+        "📄 Download Filtered Data (CSV)", "revenue.csv_export", selection_csv, selection,
+        file_name="logistics_revenue_filtered_data.csv", mime="text/csv", key="download-csv-revenue"
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # --- Auto Insights Section (always at top!) ---
+    with st.expander("📌 Auto Insights", expanded=True):
+        with profile_stage("revenue.insights", rows_in=selection.row_count):
+            st.markdown(generate_auto_insights(aggregates, comparison))
+
+    st.markdown("### Executive Summary")
+    with profile_stage("revenue.kpi", rows_in=selection.row_count):
+        show_kpi_cards_with_yoy(selection, palettes, comparison)
+    st.write("")
+
+    show_revenue_charts(aggregates, selection, prefix_sums, filters)
 
     # --- One Combined Correlation Matrix Heatmap for Segment Variables ---
     st.markdown("---")
     st.markdown("### Correlation Heatmap: Across All Segments")
-    cols = [
-        'region', 'customer_type', 'delivery_mode', 'package_weight_class',
-        'service_channel', 'account_type', 'customer_tier'
-    ]
-    if not filtered_df.empty:
-        encoded = pd.get_dummies(filtered_df[cols], prefix_sep=": ")
-        corr_matrix = encoded.corr()
+    segment_combos = aggregates["segment_combos"]
+    if not segment_combos.empty:
+        with profile_stage("revenue.correlation", rows_in=len(segment_combos)):
+            corr_matrix = compute_correlation_matrix(segment_combos)
         fig_corr = px.imshow(
             corr_matrix,
             labels=dict(color="Correlation"),
@@ -347,7 +460,7 @@ def show_revenue_tab(filtered_df, palettes=None, show_kpi_cards_with_yoy_func=No
             title="Correlation Heatmap: All Segments"
         )
         fig_corr.update_layout(margin=dict(l=40, r=40, t=60, b=40))
-        st.plotly_chart(fig_corr, use_container_width=True)
+        plotly_chart(fig_corr, "revenue.correlation", use_container_width=True)
     else:
         st.info("No data available to calculate correlation matrix for this filter selection.")
 
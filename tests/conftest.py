@@ -0,0 +1,29 @@
+import pytest
+
+from shared.prefix_sums import build_prefix_sums
+from shared.query_engine import PandasEngine
+from shared.synthetic_data import write_dataset
+
+# A few thousand synthetic rows over three years: every segment value and
+# week occurs, so the kernels are compared against the rows they summarize.
+ROWS = 4000
+
+
+@pytest.fixture(scope="session")
+def data_path(tmp_path_factory):
+    return str(write_dataset(tmp_path_factory.mktemp("data") / "logistics.csv", ROWS, seed=7))
+
+
+@pytest.fixture(scope="session")
+def engine(data_path):
+    return PandasEngine(data_path)
+
+
+@pytest.fixture(scope="session")
+def frame(engine):
+    return engine.df
+
+
+@pytest.fixture(scope="session")
+def prefix_sums(engine):
+    return build_prefix_sums(engine)
@@ -0,0 +1,77 @@
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from shared.budget import ResponseCurves, optimize_budget, steady_state_response
+from tabs.media_mix_tab import spend_change
+
+# Small grid: 20 spend units make up the current weekly budget, so every
+# allocation can be enumerated
+POINTS = 61
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(11)
+    return SimpleNamespace(
+        channels=["tv_spend", "meta_spend", "youtube_spend"],
+        spend=rng.gamma(4.0, [300.0, 150.0, 80.0], size=(52, 3)),
+        media_coef=np.array([9000.0, 4000.0, 2500.0]),
+        decay=np.array([0.6, 0.3, 0.4]),
+        half_saturation=np.array([1500.0, 300.0, 200.0]),
+        # S-shaped curves: a greedy climb from one start can stall on them
+        shape=np.array([2.5, 1.2, 3.0]),
+    )
+
+
+@pytest.fixture
+def curves(model):
+    return ResponseCurves(model, points=POINTS)
+
+
+def brute_force(curves, total, lower, upper):
+    best = -np.inf
+    for alloc in itertools.product(*(range(lo, hi + 1) for lo, hi in zip(lower, upper))):
+        if sum(alloc) == total:
+            best = max(best, curves.revenue[np.arange(len(alloc)), alloc].sum())
+    return best
+
+
+@pytest.mark.parametrize("budget_share, low, high", [(1.0, 0.5, 2.0), (0.6, 0.0, 3.0), (1.2, 0.8, 2.0), (0.5, 0.0, 1.0)])
+def test_plan_meets_the_budget_within_bounds(curves, budget_share, low, high):
+    budget = budget_share * curves.current.sum()
+    lower, upper = curves.current * low, curves.current * high
+    plan = optimize_budget(curves, budget, lower, upper)
+    assert plan["spend"].sum() == pytest.approx(curves.units(budget) * curves.step)
+    assert (plan["spend"] >= curves.units(lower, np.ceil) * curves.step - 1e-9).all()
+    assert (plan["spend"] <= curves.units(upper, np.floor) * curves.step + 1e-9).all()
+    assert plan["total_revenue"] == pytest.approx(plan["revenue"].sum())
+
+
+@pytest.mark.parametrize("budget_share, low, high", [(1.0, 0.5, 2.0), (0.6, 0.0, 3.0), (1.3, 0.0, 3.0)])
+def test_plan_is_the_best_allocation_on_the_grid(curves, budget_share, low, high):
+    budget = budget_share * curves.current.sum()
+    lower, upper = curves.current * low, curves.current * high
+    plan = optimize_budget(curves, budget, lower, upper)
+    expected = brute_force(curves, int(curves.units(budget)), curves.units(lower, np.ceil), curves.units(upper, np.floor))
+    assert plan["total_revenue"] == pytest.approx(expected)
+
+
+def test_curves_are_the_steady_state_response(model, curves):
+    np.testing.assert_allclose(curves.revenue[:, 0], 0.0)
+    np.testing.assert_allclose(curves.revenue[:, 7], steady_state_response(model, np.full(3, 7 * curves.step)))
+    np.testing.assert_allclose(curves.current_revenue, steady_state_response(model, model.spend.mean(axis=0)))
+
+
+def test_bounds_that_cannot_meet_the_budget_are_rejected(curves):
+    with pytest.raises(ValueError, match="cannot add up"):
+        optimize_budget(curves, curves.current.sum(), curves.current * 0.1, curves.current * 0.5)
+    with pytest.raises(ValueError, match="cannot add up"):
+        optimize_budget(curves, curves.current.sum(), curves.current * 1.5, curves.current * 3.0)
+
+
+def test_spend_change_of_channels_without_current_spend():
+    change = spend_change(np.array([10.0, 0.0, 0.0, 4.0]), np.array([12.0, 5.0, 0.0, 0.0]))
+    assert change == ["+20.0%", "new", "n/a", "-100.0%"]
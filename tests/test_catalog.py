@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from shared import catalog as catalog_module
+from shared.catalog import build_catalog, refresh_catalog
+from shared.data import SEGMENT_COLUMNS
+from shared.query_engine import PandasEngine
+from shared.synthetic_data import generate, write_dataset
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    return str(write_dataset(tmp_path / "logistics.csv", 1500, seed=1))
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+
+    def counting_build(engine):
+        calls.append(engine)
+        return build_catalog(engine)
+
+    monkeypatch.setattr(catalog_module, "build_catalog", counting_build)
+    return calls
+
+
+def more_rows(rows, seed, start="2025-01-05"):
+    frame = generate(rows, weeks=10, seed=seed, start=start)
+    # A region and a tier the file has not seen yet
+    frame.loc[::7, "region"] = "Northeast"
+    frame.loc[::11, "customer_tier"] = "Diamond"
+    return frame
+
+
+def assert_same_catalog(catalog, expected):
+    assert catalog.row_count == expected.row_count
+    assert tuple(map(pd.Timestamp, catalog.week_bounds)) == tuple(map(pd.Timestamp, expected.week_bounds))
+    for col in SEGMENT_COLUMNS:
+        pd.testing.assert_series_equal(catalog.counts[col], expected.counts[col], check_names=False, check_index_type=False)
+        assert catalog.domain(col) == expected.domain(col)
+
+
+def test_appended_rows_extend_the_previous_catalog(csv_path, rebuilds):
+    refresh_catalog(PandasEngine(csv_path), csv_path)
+    for seed in (2, 3):
+        more_rows(300, seed).to_csv(csv_path, mode="a", header=False, index=False)
+        engine = PandasEngine(csv_path)
+        catalog = refresh_catalog(engine, csv_path)
+        assert_same_catalog(catalog, build_catalog(engine))
+    # Only the first refresh scanned the data
+    assert len(rebuilds) == 1
+    assert "Northeast" in catalog.domain("region")
+
+
+def test_rewritten_file_is_rebuilt(csv_path, rebuilds):
+    refresh_catalog(PandasEngine(csv_path), csv_path)
+    original = pd.read_csv(csv_path)
+    # Larger, but the earlier rows changed: not an append
+    pd.concat([original.sample(frac=1, random_state=0), original.head(100)]).to_csv(csv_path, index=False)
+    engine = PandasEngine(csv_path)
+    assert_same_catalog(refresh_catalog(engine, csv_path), build_catalog(engine))
+    assert len(rebuilds) == 2
+
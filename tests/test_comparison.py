@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared.comparison import build_comparison, shift_year, year_start
+from shared.filters import apply_filters
+
+from tests.test_prefix_sums import make_filters
+
+
+def naive_kpis(rows, window):
+    if window is None:
+        return None
+    start, end = window
+    rows = rows[(rows["week"] >= start) & (rows["week"] <= end)]
+    return pd.Series({
+        "revenue_total": rows["revenue_total"].sum(),
+        "profit": rows["profit"].sum(),
+        "conversions": rows["conversions"].sum(),
+        "campaign_cost": rows["campaign_cost"].sum(),
+        "repeat_purchase_flag": rows["repeat_purchase_flag"].mean(),
+        "roas": rows["roas"].mean(),
+    })
+
+
+def assert_kpis(comparison, rows, region=None):
+    if region is not None:
+        rows = rows[rows["region"] == region]
+    current, change = comparison.kpis(region)
+    expected = naive_kpis(rows, comparison.current)
+    baseline = naive_kpis(rows, comparison.baseline)
+    np.testing.assert_allclose(current.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+    if baseline is None:
+        assert change.isna().all()
+    else:
+        np.testing.assert_allclose(change.to_numpy(dtype=float), ((expected - baseline) / baseline * 100).to_numpy(dtype=float))
+
+
+def test_prior_period_is_the_same_number_of_weeks_just_before(frame, prefix_sums):
+    weeks = np.sort(frame["week"].unique())
+    filters = make_filters(frame, week=(weeks[60], weeks[79]), region=["North", "South"])
+    comparison = build_comparison(prefix_sums, filters, "prior_period")
+    assert comparison.baseline == (pd.Timestamp(weeks[40]), pd.Timestamp(weeks[59]))
+    rows = apply_filters(frame, {**filters, "week": (weeks[0], weeks[-1])})
+    assert_kpis(comparison, rows)
+    assert_kpis(comparison, rows, region="North")
+
+
+def test_prior_period_at_the_first_week_has_no_baseline(frame, prefix_sums):
+    weeks = np.sort(frame["week"].unique())
+    filters = make_filters(frame, week=(weeks[0], weeks[9]))
+    comparison = build_comparison(prefix_sums, filters, "prior_period")
+    assert comparison.baseline is None
+    assert_kpis(comparison, frame)
+
+
+def test_yoy_starts_at_the_selected_year_and_shifts_by_iso_week(frame, prefix_sums):
+    filters = make_filters(frame, week=("2023-06-01", "2024-03-31"))
+    comparison = build_comparison(prefix_sums, filters, "yoy")
+    start, end = comparison.current
+    assert start == year_start("2024-03-31") == pd.Timestamp("2024-01-01")
+    assert comparison.baseline == (shift_year(start), shift_year(end))
+    for current, baseline in zip(comparison.current, comparison.baseline):
+        assert baseline.isocalendar()[1:] == current.isocalendar()[1:]
+        assert baseline.isocalendar()[0] == current.isocalendar()[0] - 1
+    assert_kpis(comparison, frame)
+
+
+def test_same_period_last_year_by_calendar_date(frame, prefix_sums):
+    filters = make_filters(frame, week=("2023-02-01", "2023-08-31"))
+    comparison = build_comparison(prefix_sums, filters, "same_period_last_year", iso_weeks=False)
+    assert comparison.baseline == (pd.Timestamp("2022-02-01"), pd.Timestamp("2022-08-31"))
+    assert_kpis(comparison, frame)
+
+
+def test_custom_baseline(frame, prefix_sums):
+    filters = make_filters(frame, week=("2024-01-01", "2024-06-30"), customer_type=["B2B"])
+    comparison = build_comparison(prefix_sums, filters, "custom", baseline=("2022-03-01", "2022-05-31"))
+    assert comparison.baseline == (pd.Timestamp("2022-03-01"), pd.Timestamp("2022-05-31"))
+    assert_kpis(comparison, apply_filters(frame, {**filters, "week": (frame["week"].min(), frame["week"].max())}))
+
+
+def test_unknown_mode_is_rejected(frame, prefix_sums):
+    with pytest.raises(ValueError, match="Unknown comparison"):
+        build_comparison(prefix_sums, make_filters(frame), "quarterly")
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared.data import SEGMENT_COLUMNS
+from shared.filters import apply_filters, build_filters
+from shared.prefix_sums import PREFIX_COLUMNS
+
+
+def make_filters(frame, week=None, **segments):
+    week = week or (frame["week"].min(), frame["week"].max())
+    domains = {col: sorted(frame[col].dropna().unique()) for col in SEGMENT_COLUMNS}
+    return build_filters(week, **{**domains, **segments})
+
+
+def naive_sums(rows):
+    return pd.Series({
+        "rows": len(rows),
+        "revenue_total": rows["revenue_total"].sum(),
+        "profit": rows["profit"].sum(),
+        "conversions": rows["conversions"].sum(),
+        "campaign_cost": rows["campaign_cost"].sum(),
+        "repeat_purchase_flag_sum": rows["repeat_purchase_flag"].sum(),
+        "repeat_purchase_flag_count": rows["repeat_purchase_flag"].count(),
+        "roas_sum": rows["roas"].sum(),
+        "roas_count": rows["roas"].count(),
+    })[PREFIX_COLUMNS]
+
+
+FILTER_CASES = {
+    "everything": {},
+    "date_range": {"week": ("2022-06-01", "2023-03-31")},
+    "segments": {"region": ["North", "West"], "customer_tier": ["Gold", "Silver"]},
+    "dates_and_segments": {"week": ("2023-01-01", "2024-06-30"), "delivery_mode": ["Express"], "region": ["East"]},
+    "single_week": {"week": ("2023-05-01", "2023-05-07")},
+    "no_rows": {"region": []},
+}
+
+
+@pytest.mark.parametrize("case", FILTER_CASES)
+def test_range_sums_match_filtered_rows(frame, prefix_sums, case):
+    filters = make_filters(frame, **FILTER_CASES[case])
+    expected = naive_sums(apply_filters(frame, filters))
+    pd.testing.assert_series_equal(prefix_sums.range_sums(filters), expected.astype(float), check_names=False)
+
+
+def test_range_sums_without_filters_cover_every_row(frame, prefix_sums):
+    pd.testing.assert_series_equal(prefix_sums.range_sums(), naive_sums(frame).astype(float), check_names=False)
+
+
+@pytest.mark.parametrize("case", FILTER_CASES)
+def test_collapse_by_region_matches_rows_per_region(frame, prefix_sums, case):
+    filters = make_filters(frame, **FILTER_CASES[case])
+    regions, collapsed = prefix_sums.collapse(filters, by="region")
+    lo, hi = prefix_sums.bounds(*filters["week"])
+    rows = apply_filters(frame, filters)
+    # Regions come from the segment filters alone: one without rows in the date range sums to zero
+    assert set(rows["region"]) <= set(regions)
+    for region, prefix in zip(regions, collapsed):
+        expected = naive_sums(rows[rows["region"] == region])
+        np.testing.assert_allclose(prefix[hi] - prefix[lo], expected.to_numpy(dtype=float))
+
+
+@pytest.mark.parametrize("case", FILTER_CASES)
+def test_facets_count_each_value_under_the_other_filters(frame, prefix_sums, case):
+    filters = make_filters(frame, **FILTER_CASES[case])
+    facets = prefix_sums.facets(filters)
+    for col in SEGMENT_COLUMNS:
+        others = {**filters, col: prefix_sums.domains[col]}
+        rows = apply_filters(frame, others)
+        for value in prefix_sums.domains[col]:
+            kept = rows[rows[col] == value]
+            assert facets[col].at[value, "rows"] == len(kept)
+            assert facets[col].at[value, "revenue_total"] == pytest.approx(kept["revenue_total"].sum())
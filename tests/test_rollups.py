@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared.rollups import GRAINS, auto_grain, period_count, rollup
+
+
+def weekly_totals(frame):
+    # The week-grain aggregate the trend charts get from the query engine
+    return frame.groupby(["week", "region"], as_index=False).agg(
+        revenue_total=("revenue_total", "sum"),
+        customer_churn_rate_sum=("customer_churn_rate", "sum"),
+        customer_churn_rate_count=("customer_churn_rate", "count"),
+    )
+
+
+@pytest.mark.parametrize("grain", GRAINS)
+def test_rollup_matches_grouping_the_rows_by_period(frame, grain):
+    rolled = rollup(
+        weekly_totals(frame), grain, by=["region"], sums=["revenue_total"],
+        means={"customer_churn_rate": ("customer_churn_rate_sum", "customer_churn_rate_count")},
+    )
+    period = frame["week"] if grain == "week" else frame["week"].dt.to_period(GRAINS[grain]).dt.start_time
+    expected = (
+        frame.assign(week=period)
+        .groupby(["week", "region"], as_index=False)
+        .agg(revenue_total=("revenue_total", "sum"), customer_churn_rate=("customer_churn_rate", "mean"))
+    )
+    pd.testing.assert_frame_equal(
+        rolled[["week", "region", "revenue_total", "customer_churn_rate"]], expected, check_dtype=False
+    )
+
+
+def test_rollup_means_are_row_weighted(frame):
+    # Averaging the weekly means would weigh a sparse week like a full one
+    rolled = rollup(
+        weekly_totals(frame), "year",
+        means={"customer_churn_rate": ("customer_churn_rate_sum", "customer_churn_rate_count")},
+    )
+    expected = frame.groupby(frame["week"].dt.year)["customer_churn_rate"].mean()
+    np.testing.assert_allclose(rolled["customer_churn_rate"], expected.to_numpy())
+
+
+def test_period_count():
+    assert period_count("2022-01-02", "2022-12-25", "week") == 52
+    assert period_count("2022-01-02", "2022-12-25", "month") == 12
+    assert period_count("2022-01-02", "2024-12-22", "quarter") == 12
+    assert period_count("2022-01-02", "2024-12-22", "year") == 3
+
+
+def test_auto_grain_is_the_coarsest_with_enough_points():
+    assert auto_grain("2022-01-02", "2024-12-22") == "month"
+    assert auto_grain("2022-01-02", "2022-12-25") == "week"
+    assert auto_grain("2000-01-01", "2024-12-31") == "year"
+    assert auto_grain("2022-01-02", "2024-12-22", min_points=10) == "quarter"
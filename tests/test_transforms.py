@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from shared.transforms import geometric_adstock, hill, logistic, weibull_adstock, weibull_kernel
+
+# scipy is not an app dependency; it only provides the reference filter here
+lfilter = pytest.importorskip("scipy.signal").lfilter
+
+WEEKS, CHANNELS = 157, 5
+
+
+@pytest.fixture
+def spend():
+    return np.random.default_rng(3).gamma(2.0, 100.0, size=(WEEKS, CHANNELS))
+
+
+def test_geometric_adstock_is_the_recursive_filter(spend):
+    # a[t] = x[t] + decay * a[t-1]
+    decays = np.array([0.0, 0.3, 0.7, 0.95])
+    expected = np.stack([lfilter([1.0], [1.0, -decay], spend, axis=0) for decay in decays])
+    np.testing.assert_allclose(geometric_adstock(spend, decays), expected, rtol=1e-9, atol=1e-6)
+
+
+def test_geometric_adstock_per_channel_decays(spend):
+    decays = np.random.default_rng(4).uniform(0.1, 0.9, size=(3, CHANNELS))
+    expected = np.stack([
+        np.column_stack([lfilter([1.0], [1.0, -decay], spend[:, c]) for c, decay in enumerate(row)])
+        for row in decays
+    ])
+    np.testing.assert_allclose(geometric_adstock(spend, decays), expected, rtol=1e-9, atol=1e-6)
+
+
+def test_geometric_adstock_truncated_carry_over(spend):
+    decays, max_lag = np.array([0.5, 0.9]), 8
+    expected = np.stack([lfilter(decay ** np.arange(max_lag + 1), [1.0], spend, axis=0) for decay in decays])
+    np.testing.assert_allclose(geometric_adstock(spend, decays, max_lag), expected, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("kind", ["cdf", "pdf"])
+def test_weibull_adstock_is_the_lag_weighted_sum(spend, kind):
+    shapes, scales, max_lag = np.array([0.8, 1.5, 3.0]), np.array([2.0, 4.0, 6.0]), 12
+    kernels = weibull_kernel(shapes, scales, max_lag + 1, kind)
+    expected = np.stack([lfilter(kernel[0], [1.0], spend, axis=0) for kernel in kernels])
+    np.testing.assert_allclose(weibull_adstock(spend, shapes, scales, max_lag, kind), expected, rtol=1e-9, atol=1e-6)
+
+
+def test_weibull_kernel_shapes():
+    lags = np.arange(10, dtype=float)
+    cdf = weibull_kernel(np.array([2.0]), np.array([3.0]), 10, "cdf")[0, 0]
+    np.testing.assert_allclose(cdf, np.exp(-(lags / 3.0) ** 2.0))
+    pdf = weibull_kernel(np.array([2.0]), np.array([3.0]), 10, "pdf")[0, 0]
+    assert pdf.max() == pytest.approx(1.0)
+    assert pdf.argmax() > 0
+
+
+def test_saturation_curves():
+    x = np.array([-1.0, 0.0, 50.0, 100.0, 1e9])
+    np.testing.assert_allclose(hill(x, 100.0, 2.0), [0.0, 0.0, 0.2, 0.5, 1.0])
+    np.testing.assert_allclose(logistic(x, 0.01), np.tanh(0.01 * np.maximum(x, 0) / 2))